@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent SQLite index of the scraped articles, for incremental scheduled runs.
+
+Each article is stored per query (search phrase and category) with its analysis
+and image, so a later run of the same query can stop paginating as soon as it
+reaches an article already indexed and reuse the stored rows.
+"""
+
+import os
+import hashlib
+import logging
+import sqlite3
+
+from datetime import datetime
+
+from news_result import NewsResult
+
+
+class ArticleIndex:
+    def __init__(self, path):
+        """
+        Initialize the ArticleIndex class, creating the database if needed.
+
+        Args:
+            path (str): Path of the SQLite file.
+        """
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                query TEXT NOT NULL,
+                article_key TEXT NOT NULL,
+                url TEXT,
+                title TEXT,
+                date TEXT,
+                description TEXT,
+                picture_filename TEXT,
+                search_count INTEGER,
+                contains_money INTEGER,
+                image_url TEXT,
+                image_path TEXT,
+                indexed_at TEXT,
+                PRIMARY KEY (query, article_key)
+            )
+        """)
+        self.connection.commit()
+
+        logging.info(f"Article index opened: {path}")
+
+
+    def query_key(self, site, search_phrase, news_category):
+        """
+        Get the key identifying a query in the index. The site is part of it, like in the
+        checkpoint journal, so the searches of a multi-site run don't share their rows.
+
+        Args:
+            site (str): Name of the site searched.
+            search_phrase (str): The phrase searched.
+            news_category (str): The category filtered, empty for all.
+
+        Returns:
+            str: The query key.
+        """
+        return f"{site}|{search_phrase.lower().strip()}|{(news_category or '').lower().strip()}"
+
+
+    @staticmethod
+    def article_key(article):
+        """
+        Get the key identifying an article: its URL, or a hash of its title when there is no URL.
+        It also identifies the articles found by several searches of a run, without an index.
+
+        Args:
+            article (dict): The raw title, description, date, image URL and article URL.
+
+        Returns:
+            str: The article key.
+        """
+        if article.get("url"):
+            return article["url"]
+        return "title:" + hashlib.sha1((article.get("title") or "").encode("utf-8")).hexdigest()
+
+
+    def contains(self, query, article):
+        """
+        Check if an article is already indexed for a query.
+
+        Args:
+            query (str): The query key.
+            article (dict): The raw title, description, date, image URL and article URL.
+
+        Returns:
+            bool: True if the article is indexed, otherwise False.
+        """
+        cursor = self.connection.execute("SELECT 1 FROM articles WHERE query = ? AND article_key = ?",
+                                         (query, self.article_key(article)))
+        return cursor.fetchone() is not None
+
+
+    def add(self, query, article, result, image_path):
+        """
+        Index an article with its analysis.
+
+        Args:
+            query (str): The query key.
+            article (dict): The raw title, description, date, image URL and article URL.
+            result (NewsResult): The result row of the article.
+            image_path (str): Path where the image was saved.
+        """
+        self.connection.execute("""
+            INSERT OR REPLACE INTO articles
+            (query, article_key, url, title, date, description, picture_filename, search_count, contains_money, image_url, image_path, indexed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (query, self.article_key(article), article.get("url"),
+              result.title, result.date, result.description, result.picture_filename, result.search_count,
+              int(bool(result.contains_money)),
+              article.get("image_url"), image_path, datetime.now().isoformat()))
+        self.connection.commit()
+
+
+    def get_results(self, query, start_date_str):
+        """
+        Get the indexed articles of a query newer than a date.
+
+        Args:
+            query (str): The query key.
+            start_date_str (str): The oldest date accepted, formatted as '%Y-%m-%d'.
+
+        Returns:
+            list: Tuples of (article key, result row, image URL, image path), the newest first.
+        """
+        cursor = self.connection.execute("""
+            SELECT article_key, title, date, description, picture_filename, search_count, contains_money, image_url, image_path
+            FROM articles WHERE query = ? AND date > ? ORDER BY date DESC
+        """, (query, start_date_str))
+
+        indexed = []
+        for key, title, date, description, picture_filename, search_count, contains_money, image_url, image_path in cursor:
+            result = NewsResult(title, date, description, picture_filename, search_count, bool(contains_money))
+            indexed.append((key, result, image_url, image_path))
+
+        return indexed
+
+
+    def close(self):
+        """
+        Close the database.
+        """
+        self.connection.close()
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Batch mode: process every input work item, spread across a pool of browser sessions.
+
+Each worker thread owns a NewsScraper (and so its own browser, kept open from
+one item to the next), and pulls the next input work item until the queue is empty. The work items are reserved,
+saved and released through one shared adapter behind a lock, because the
+WorkItems library only tracks a single "current" input item. Each item gets its
+own output folder, Excel file and output work item, and is released as DONE or
+FAILED on its own.
+"""
+
+import os
+import logging
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from RPA.Robocorp.WorkItems import WorkItems, WorkItem, State, Error, EmptyQueue
+
+from scraper import NewsScraper, run_search
+
+
+class BatchRunner:
+    def __init__(self, workers=2, output_path='./output/'):
+        """
+        Initialize the BatchRunner class.
+
+        Args:
+            workers (int): Number of browser sessions scraping at the same time.
+            output_path (str): Folder where a subfolder is created for each work item.
+        """
+        self.workers = max(1, int(workers))
+        self.output_path = output_path
+
+        self.work_items = WorkItems()
+        self.lock = threading.Lock()
+        self.report = []
+
+
+    def reserve_input(self):
+        """
+        Reserve and load the next input work item.
+
+        Returns:
+            WorkItem: The input work item, or None if the queue is empty.
+        """
+        with self.lock:
+            try:
+                item_id = self.work_items.adapter.reserve_input()
+            except EmptyQueue:
+                return None
+
+            item = WorkItem(item_id=item_id, parent_id=None, adapter=self.work_items.adapter)
+            item.load()
+            return item
+
+
+    def save_output(self, input_item, payload, files):
+        """
+        Create the output work item of an input work item.
+
+        Args:
+            input_item (WorkItem): The input work item.
+            payload (dict): The payload of the output.
+            files (list): Paths of the files attached to the output.
+        """
+        with self.lock:
+            output_item = WorkItem(item_id=None, parent_id=input_item.id, adapter=self.work_items.adapter)
+            output_item.payload = payload
+            for path in files:
+                output_item.add_file(path)
+            output_item.save()
+
+
+    def release_input(self, input_item, error=None):
+        """
+        Release an input work item as DONE, or as FAILED with the error.
+
+        Args:
+            input_item (WorkItem): The input work item.
+            error (Exception): The error of a failed item, None if it succeeded.
+        """
+        with self.lock:
+            if error is None:
+                self.work_items.adapter.release_input(input_item.id, State.DONE)
+            else:
+                exception = {"type": Error.APPLICATION.value, "code": type(error).__name__, "message": str(error)}
+                self.work_items.adapter.release_input(input_item.id, State.FAILED, exception=exception)
+
+
+    def process_item(self, scraper, input_item):
+        """
+        Run the search of one input work item and report it.
+
+        Args:
+            scraper (NewsScraper): The scraper of the worker.
+            input_item (WorkItem): The input work item.
+
+        Returns:
+            dict: The report of the item.
+        """
+        logging.info(f"Processing work item {input_item.id}")
+        scraper.reset_search(os.path.join(self.output_path, scraper.make_valid_filename(str(input_item.id)), ''))
+
+        try:
+            search_phrase, months, news_category = scraper.read_workitem_payload(input_item.payload)
+            run_search(scraper, search_phrase, months, news_category)
+
+            # The streamed rows aren't kept, only counted; the header-only row of an empty search isn't counted
+            count = scraper.result_count
+            self.save_output(input_item, {"search_phrase": search_phrase, "news_category": news_category, "months": months, "results": count}, [scraper.excel_output_file])
+            self.release_input(input_item)
+
+            logging.info(f"Work item {input_item.id} done with {count} results")
+            return {"item_id": input_item.id, "state": "DONE", "results": count}
+
+        except Exception as e:
+            logging.error(f"Work item {input_item.id} failed: {e}")
+            self.release_input(input_item, e)
+            return {"item_id": input_item.id, "state": "FAILED", "error": str(e)}
+
+        finally:
+            # The browser stays open for the next item, unless it stopped answering
+            if scraper.browser_open and not scraper.is_browser_alive():
+                try:
+                    scraper.close_browser()
+                except Exception:
+                    pass
+
+
+    def worker(self, number):
+        """
+        Pull and process input work items until the queue is empty.
+
+        Args:
+            number (int): Number of the worker, for the logging.
+        """
+        scraper = NewsScraper()
+        try:
+            while True:
+                input_item = self.reserve_input()
+                if input_item is None:
+                    logging.info(f"Worker {number}: no more work items")
+                    break
+
+                report = self.process_item(scraper, input_item)
+                with self.lock:
+                    self.report.append(report)
+        finally:
+            scraper.close()
+
+
+    def run(self):
+        """
+        Process every input work item.
+
+        Returns:
+            list: The report of each item, with its state and number of results or error.
+        """
+        logging.info(f"Batch started with {self.workers} workers")
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch-worker") as executor:
+            futures = [executor.submit(self.worker, number) for number in range(1, self.workers + 1)]
+            for future in futures:
+                future.result()
+
+        failed = len([report for report in self.report if report["state"] == "FAILED"])
+        logging.info(f"Batch finished: {len(self.report) - failed} done, {failed} failed")
+        return self.report
+
+
+def scrape_news_batch(workers=None):
+    """
+    Process every input work item with a pool of browser sessions.
+
+    Args:
+        workers (int): Number of browser sessions, read from the NEWS_SCRAPER_WORKERS environment variable if None, 2 by default.
+
+    Returns:
+        list: The report of each item, with its state and number of results or error.
+    """
+    if workers == None:
+        workers = int(os.environ.get("NEWS_SCRAPER_WORKERS", 2))
+
+    return BatchRunner(workers).run()
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Launch profile of the scraping browser.
+
+The default profile is built for a fast cold start: Chrome runs headless with a
+fixed viewport, without GPU, extensions, background networking and the other
+services of a first run, and it reuses a user data dir kept between runs, so
+the cookies, the consent choices and the HTTP cache of the sites are already
+there ("prewarmed") from the second launch on. Chrome locks its user data dir,
+so each browser of the process takes a numbered slot of the profile folder,
+held by a file lock that the system releases even if the process dies.
+
+The legacy profile is the browser of the first versions of the robot: headed,
+maximized and with a fresh profile each time. Both only use explicit waits.
+"""
+
+import os
+import logging
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+
+# Folder of the prewarmed user data dirs, NEWS_SCRAPER_BROWSER_PROFILE if set
+default_user_data_dir = os.environ.get("NEWS_SCRAPER_BROWSER_PROFILE") or os.path.join(tempfile.gettempdir(), "news-scraper-browser")
+
+
+def lock_file(file):
+    """
+    Take an exclusive lock on an open file without waiting, released when the file is closed or the process ends.
+
+    Args:
+        file (file): The file, open for writing.
+
+    Raises:
+        OSError: If another file object holds the lock.
+    """
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+
+
+class BrowserProfile:
+    # The browser presents itself as a desktop Chrome, headless Chrome would say HeadlessChrome
+    user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+    # Arguments of every profile, against the robot detection and the small /dev/shm of the containers
+    base_arguments = ["--disable-blink-features=AutomationControlled", "--no-sandbox", "--disable-dev-shm-usage"]
+
+    # Arguments of the fast profile: nothing starts that the scraping doesn't use
+    fast_arguments = [
+        "--disable-gpu",
+        "--disable-extensions",
+        "--disable-background-networking",
+        "--disable-component-update",
+        "--disable-default-apps",
+        "--disable-sync",
+        "--no-first-run",
+        "--no-default-browser-check",
+        "--disable-background-timer-throttling",
+        "--disable-renderer-backgrounding",
+        "--disable-backgrounding-occluded-windows",
+        "--hide-crash-restore-bubble",
+        "--metrics-recording-only",
+        "--password-store=basic",
+        "--mute-audio"
+    ]
+
+    def __init__(self, headless=True, window_size=(1920, 1080), user_data_dir=default_user_data_dir, fast=True, max_slots=16):
+        """
+        Initialize the BrowserProfile class.
+
+        Args:
+            headless (bool): Run the browser without a window.
+            window_size (tuple): Width and height of the viewport, or None to maximize the window.
+            user_data_dir (str): Folder of the user data dirs kept between runs, or None for a fresh profile each launch.
+            fast (bool): Disable the GPU, the extensions, the background networking and the first run services.
+            max_slots (int): Maximum number of browsers of the folder running at once, the next ones get a fresh profile.
+        """
+        self.headless = bool(headless)
+        self.window_size = tuple(window_size) if window_size else None
+        self.user_data_dir = user_data_dir
+        self.fast = bool(fast)
+        self.max_slots = max(1, int(max_slots))
+
+        # Slot of the user data dir taken by the open browser, the file holding its lock,
+        # and whether a previous launch left a profile in it
+        self.slot_path = None
+        self.slot_lock = None
+        self.prewarmed = False
+
+
+    @classmethod
+    def from_settings(cls, settings=True):
+        """
+        Create the profile asked by the "browser_profile" setting of a work item.
+
+        Args:
+            settings (bool or dict): True for the fast profile, False for the legacy one,
+                                     or a dictionary changing the fast profile ("headless", "window_size",
+                                     "user_data_dir", "fast" and "max_slots").
+
+        Returns:
+            BrowserProfile: The profile.
+
+        Raises:
+            ValueError: If a setting doesn't exist.
+        """
+        if settings is False:
+            return cls.legacy()
+        if not isinstance(settings, dict):
+            return cls()
+
+        names = {"headless", "window_size", "user_data_dir", "fast", "max_slots"}
+        unknown = set(settings) - names
+        if unknown:
+            raise ValueError(f"Unknown browser profile settings: {', '.join(sorted(unknown))}")
+        return cls(**settings)
+
+
+    @classmethod
+    def legacy(cls):
+        """
+        Create the profile of the first versions: headed, maximized and with a fresh profile each launch.
+
+        Returns:
+            BrowserProfile: The profile.
+        """
+        return cls(headless=False, window_size=None, user_data_dir=None, fast=False)
+
+
+    @property
+    def name(self):
+        """
+        str: "fast", "legacy" or "custom", for the logs and the trace.
+        """
+        if self.headless and self.fast and self.user_data_dir:
+            return "fast"
+        if not self.headless and not self.fast and not self.user_data_dir and self.window_size is None:
+            return "legacy"
+        return "custom"
+
+
+    def acquire_slot(self):
+        """
+        Take the first free slot of the user data dir folder.
+
+        Returns:
+            str: Path of the user data dir of the slot, or None for a fresh profile
+                 (no folder set, or every slot is taken).
+        """
+        if not self.user_data_dir:
+            return None
+        if self.slot_path is not None:
+            return self.slot_path
+
+        os.makedirs(self.user_data_dir, exist_ok=True)
+        for number in range(self.max_slots):
+            lock = open(os.path.join(self.user_data_dir, f"slot-{number}.lock"), "a")
+            try:
+                lock_file(lock)
+            except OSError:
+                lock.close()
+                continue
+
+            self.slot_lock = lock
+            self.slot_path = os.path.join(self.user_data_dir, f"slot-{number}")
+            self.prewarmed = os.path.isdir(os.path.join(self.slot_path, "Default"))
+            os.makedirs(self.slot_path, exist_ok=True)
+            return self.slot_path
+
+        logging.warning(f"All the {self.max_slots} browser profiles of {self.user_data_dir} are in use, using a fresh one")
+        return None
+
+
+    def release_slot(self):
+        """
+        Release the slot of the closed browser, the next launch of the process can take it again.
+        """
+        if self.slot_lock is not None:
+            self.slot_lock.close()
+        self.slot_lock = None
+        self.slot_path = None
+        self.prewarmed = False
+
+
+    def arguments(self):
+        """
+        Get the command line arguments of Chrome, taking a slot of the user data dir.
+
+        Returns:
+            list: The arguments.
+        """
+        arguments = list(self.base_arguments)
+        if self.headless:
+            arguments += ["--headless=new", f"--user-agent={self.user_agent}"]
+        if self.window_size is not None:
+            arguments.append(f"--window-size={self.window_size[0]},{self.window_size[1]}")
+        if self.fast:
+            arguments += self.fast_arguments
+
+        slot_path = self.acquire_slot()
+        if slot_path is not None:
+            arguments += [f"--user-data-dir={slot_path}", f"--disk-cache-dir={os.path.join(slot_path, 'cache')}"]
+        return arguments
+
+
+    def options(self, performance_log=False):
+        """
+        Get the options of open_available_browser.
+
+        Args:
+            performance_log (bool): True to record the performance log, which tells which requests were blocked.
+                                    Chrome records every network event in it, so it is only enabled with a blocker.
+
+        Returns:
+            dict: The arguments and the capabilities of the browser.
+        """
+        options = {"arguments": self.arguments()}
+        if performance_log:
+            options["capabilities"] = {"goog:loggingPrefs": {"performance": "ALL"}}
+        return options
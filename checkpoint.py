@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Page-level checkpoint journal of a search, to resume it after a crash.
+
+The journal is an append-only JSONL file in the output folder. Its first line
+identifies the search (site, phrase and category); then each results page
+analysed adds a line with its raw articles and its position, written and
+fsynced before the next page is loaded. A line marks the end of the
+pagination, and another one the end of the run, once the Excel file is saved.
+
+A run of the same search that finds an unfinished journal replays its pages
+instead of loading them again, and continues from the page after the last one.
+A finished journal, or one of another search, is started again.
+"""
+
+import os
+import json
+import hashlib
+import logging
+
+from datetime import datetime
+
+
+class CheckpointJournal:
+    def __init__(self, path, key):
+        """
+        Initialize the CheckpointJournal class, reading the journal left by a previous run.
+
+        Args:
+            path (str): Path of the JSONL file.
+            key (str): Key of the search, see search_key.
+        """
+        self.path = path
+        self.key = key
+
+        # Pages of the previous run: tuples of (page number, raw articles, position)
+        self.pages = []
+        self.ended = False
+
+        self.file = None
+        if self.load():
+            self.file = open(path, "a", encoding="utf-8")
+            logging.info(f"Resuming the search from the journal {path}: {len(self.pages)} pages done")
+        else:
+            self.restart()
+
+
+    def restart(self):
+        """
+        Start the journal again, forgetting the pages of the previous run.
+        """
+        self.close()
+        self.pages = []
+        self.ended = False
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.file = open(self.path, "w", encoding="utf-8")
+        self.write({"type": "search", "key": self.key, "started": datetime.now().isoformat()})
+
+
+    @staticmethod
+    def search_key(site, search_phrase, news_category):
+        """
+        Get the key of a search, the same for every run of the same work item.
+
+        Args:
+            site (str): Name of the site.
+            search_phrase (str): The phrase searched.
+            news_category (str): The category filtered, empty for all.
+
+        Returns:
+            str: The key.
+        """
+        text = "\n".join([site, (search_phrase or "").strip().lower(), (news_category or "").strip().lower()])
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+    def load(self):
+        """
+        Read the journal of a previous run. A line cut by a crash is removed from the file.
+
+        Returns:
+            bool: True if the journal belongs to this search and is unfinished, so it can be resumed.
+        """
+        if not os.path.exists(self.path):
+            return False
+
+        records = []
+        valid_bytes = 0
+        with open(self.path, "rb") as file:
+            for line in file:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    records.pop()
+                    break
+                valid_bytes += len(line)
+
+        if not records or records[0].get("type") != "search" or records[0].get("key") != self.key:
+            return False
+        if any(record.get("type") == "done" for record in records):
+            return False
+
+        # Keep only the complete lines, so the next ones start on a new line
+        if valid_bytes < os.path.getsize(self.path):
+            os.truncate(self.path, valid_bytes)
+
+        for record in records[1:]:
+            if record.get("type") == "page":
+                self.pages.append((record["page"], record["articles"], record.get("position")))
+            elif record.get("type") == "end":
+                self.ended = True
+        return True
+
+
+    def write(self, record):
+        """
+        Append a record and flush it to the disk.
+
+        Args:
+            record (dict): The record.
+        """
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+
+    def next_page(self):
+        """
+        Get the number of the first page not in the journal.
+
+        Returns:
+            int: The page number, 1 if there are no pages.
+        """
+        return self.pages[-1][0] + 1 if self.pages else 1
+
+
+    def add_page(self, page, articles, position=None):
+        """
+        Record an analysed page.
+
+        Args:
+            page (int): Number of the page.
+            articles (list): The raw articles of the page.
+            position (str): URL of the page, to know where the pagination was.
+        """
+        self.write({"type": "page", "page": page, "position": position, "articles": articles})
+
+
+    def end(self):
+        """
+        Record the end of the pagination: the start date or the last page was reached.
+        """
+        self.ended = True
+        self.write({"type": "end"})
+
+
+    def finish(self):
+        """
+        Record the end of the run and close the journal, the next run starts a new one.
+        """
+        self.write({"type": "done", "finished": datetime.now().isoformat()})
+        self.close()
+
+
+    def close(self):
+        """
+        Close the file, the journal can still be resumed.
+        """
+        if self.file is not None and not self.file.closed:
+            self.file.close()
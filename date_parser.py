@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Date parsing engine for the news timestamps.
+
+Each date string is classified by its shape (runs of letters and digits and the
+separators between them) and only the formats with the same shape are tried.
+Results are memoized per distinct string.
+"""
+
+import re
+
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+
+class DateParser:
+    # Directives replaced by a run of digits or a run of letters in the shape
+    numeric_directives = re.compile(r'%[dmYyHMSIjf]')
+    text_directives = re.compile(r'%[BbAap]')
+
+    # Shape of a date string: letters -> 'A', digits -> 'D', whitespace collapsed
+    letters = re.compile(r'[^\W\d_]+')
+    digits = re.compile(r'\d+')
+    spaces = re.compile(r'\s+')
+
+    # "5 minutes ago", "an hour ago", "3 days ago", "yesterday"...
+    relative = re.compile(r'^(\d+|an?|one)\s+(sec|second|min|minute|hr|hour|day|week)s?\s+ago$', re.IGNORECASE)
+    relative_units = {"sec": "seconds", "second": "seconds", "min": "minutes", "minute": "minutes",
+                      "hr": "hours", "hour": "hours", "day": "days", "week": "weeks"}
+    relative_days = {"just now": 0, "today": 0, "yesterday": 1}
+
+    def __init__(self, date_formats, cache_size=1024):
+        """
+        Initialize the DateParser class.
+
+        Args:
+            date_formats (list): The accepted strptime formats. When several formats match,
+                                 the last one in the list wins.
+            cache_size (int): Maximum number of distinct date strings kept in the cache.
+        """
+        self.date_formats = list(date_formats)
+
+        # Group the formats by shape, in reverse order, so the first success is the last matching format
+        self.formats_by_shape = {}
+        for date_format in reversed(self.date_formats):
+            formats = self.formats_by_shape.setdefault(self.format_shape(date_format), [])
+            if date_format not in formats:
+                formats.append(date_format)
+
+        self.parse_cached = lru_cache(maxsize=cache_size)(self.parse_uncached)
+
+
+    def format_shape(self, date_format):
+        """
+        Get the shape of a strptime format.
+
+        Args:
+            date_format (str): The strptime format.
+
+        Returns:
+            str: The shape, e.g. "A D, D" for "%B %d, %Y".
+        """
+        shape = self.numeric_directives.sub('D', date_format)
+        shape = self.text_directives.sub('A', shape)
+        shape = shape.replace('%%', '%')
+        return self.spaces.sub(' ', shape).strip()
+
+
+    def classify(self, date_str):
+        """
+        Get the shape of a date string.
+
+        Args:
+            date_str (str): The date string.
+
+        Returns:
+            str: The shape, e.g. "A D, D" for "July 29, 2024".
+        """
+        shape = self.letters.sub('A', date_str)
+        shape = self.digits.sub('D', shape)
+        return self.spaces.sub(' ', shape).strip()
+
+
+    def parse_uncached(self, date_str):
+        """
+        Parse a date string trying only the formats with the same shape.
+
+        Args:
+            date_str (str): The date string.
+
+        Returns:
+            datetime: The parsed date, or None if no format matches.
+        """
+        date_str = date_str.strip()
+        for date_format in self.formats_by_shape.get(self.classify(date_str), ()):
+            try:
+                return datetime.strptime(date_str, date_format)
+            except ValueError:
+                continue
+        return None
+
+
+    def parse(self, date_str):
+        """
+        Parse a date string, memoizing the result.
+
+        Args:
+            date_str (str): The date string.
+
+        Returns:
+            datetime: The parsed date, or None if no format matches.
+        """
+        return self.parse_cached(date_str)
+
+
+    def resolve_relative(self, date_str, now=None):
+        """
+        Convert a relative time like "5 minutes ago", "3 days ago" or "yesterday" to a date.
+
+        Args:
+            date_str (str): The date string.
+            now (datetime): The reference time, the current time if None.
+
+        Returns:
+            datetime: The date, or None if the string isn't a relative time.
+        """
+        text = self.spaces.sub(' ', date_str).strip().lower()
+        now = now or datetime.now()
+
+        if text in self.relative_days:
+            return now - timedelta(days=self.relative_days[text])
+
+        match = self.relative.match(text)
+        if match is None:
+            return None
+
+        amount = 1 if match.group(1) in ("a", "an", "one") else int(match.group(1))
+        return now - timedelta(**{self.relative_units[match.group(2)]: amount})
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Concurrent image download stage for the news scraper.
+
+Downloads are submitted while the browser keeps scraping, run on a bounded
+thread pool that shares one keep-alive connection pool per host, and are
+joined before the Excel file is written. The number of downloads in flight is
+bounded too: when the pool falls behind, submit blocks the scraping until a
+download finishes, instead of queueing every image of the search.
+"""
+
+import os
+import logging
+import threading
+
+from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class ImageDownloader:
+    def __init__(self, max_workers=8, timeout=30, chunk_size=64 * 1024, max_pending=None):
+        """
+        Initialize the ImageDownloader class.
+
+        Args:
+            max_workers (int): Maximum number of concurrent downloads.
+            timeout (int): Timeout in seconds for each HTTP request.
+            chunk_size (int): Size in bytes of each chunk written to disk.
+            max_pending (int): Maximum number of downloads submitted and not finished, 4 per worker if None.
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(1, int(max_pending or self.max_workers * 4))
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+
+        # One session shared by all workers, the adapter keeps the connections
+        # alive and pools them per host, so each host pays the TLS handshake once
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="image-download")
+        self.slots = threading.BoundedSemaphore(self.max_pending)
+        self.lock = threading.Lock()
+
+        # Only the downloads in flight are kept, the finished ones are counted
+        self.pending = set()
+        self.succeeded = 0
+        self.failed = []
+
+        # Optional ImageCache, when set the images are revalidated instead of downloaded again
+        self.cache = None
+
+        # Optional Tracer, when set each download is timed with its size
+        self.tracer = None
+
+        # Optional RequestScheduler, when set the downloads are rate limited per host and retried
+        self.scheduler = None
+
+
+    def submit(self, url, filepath):
+        """
+        Schedule the download of an image. It returns immediately, unless max_pending
+        downloads are already in flight: then it waits until one of them finishes.
+
+        Args:
+            url (str): The URL of the image.
+            filepath (str): The path where the image will be saved.
+
+        Returns:
+            concurrent.futures.Future: Future resolving to the saved file path.
+        """
+        self.slots.acquire()
+        try:
+            future = self.executor.submit(self.download, url, filepath)
+        except Exception:
+            self.slots.release()
+            raise
+
+        with self.lock:
+            self.pending.add(future)
+        future.add_done_callback(lambda done: self.finished(url, done))
+        return future
+
+
+    def finished(self, url, future):
+        """
+        Count a finished download and free its slot.
+
+        Args:
+            url (str): The URL of the image.
+            future (concurrent.futures.Future): The future of the download.
+        """
+        error = future.exception()
+        with self.lock:
+            self.pending.discard(future)
+            if error is None:
+                self.succeeded += 1
+            else:
+                self.failed.append((url, error))
+        if error is not None:
+            logging.error(f"Failed to download image {url}: {error}")
+        self.slots.release()
+
+
+    def download(self, url, filepath):
+        """
+        Download an image, timed in a span when there is a tracer.
+
+        Args:
+            url (str): The URL of the image.
+            filepath (str): The path where the image will be saved.
+
+        Returns:
+            str: The path of the saved file.
+
+        Raises:
+            requests.RequestException: If the request fails or returns an error status.
+        """
+        if self.tracer is None:
+            return self.fetch(url, filepath)
+
+        with self.tracer.span("image_download", url=url, cached=self.cache is not None) as span:
+            self.fetch(url, filepath)
+            span["args"]["bytes"] = os.path.getsize(filepath)
+            self.tracer.count("image_bytes", span["args"]["bytes"])
+        return filepath
+
+
+    def fetch(self, url, filepath):
+        """
+        Download an image, within the limits of the scheduler when there is one.
+
+        Args:
+            url (str): The URL of the image.
+            filepath (str): The path where the image will be saved.
+
+        Returns:
+            str: The path of the saved file.
+
+        Raises:
+            requests.RequestException: If the request fails or returns an error status.
+            CircuitOpenError: If the host failed too many times recently.
+        """
+        if self.scheduler is None:
+            return self.transfer(url, filepath)
+        return self.scheduler.call(url, lambda: self.transfer(url, filepath))
+
+
+    def transfer(self, url, filepath):
+        """
+        Download an image and stream it to disk, through the cache when there is one.
+
+        Args:
+            url (str): The URL of the image.
+            filepath (str): The path where the image will be saved.
+
+        Returns:
+            str: The path of the saved file.
+
+        Raises:
+            requests.RequestException: If the request fails or returns an error status.
+        """
+        if self.cache is not None:
+            return self.cache.fetch(self.session, url, filepath, timeout=self.timeout)
+
+        # Written under another name first, so a crash never leaves a partial image a resumed run would keep
+        partial_path = filepath + ".part"
+        try:
+            with self.session.get(url, stream=True, timeout=self.timeout) as response:
+                response.raise_for_status()
+                with open(partial_path, 'wb') as file:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        file.write(chunk)
+            os.replace(partial_path, filepath)
+        except Exception:
+            # A download cut in the middle leaves nothing behind
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+
+        logging.info("Downloaded image %s", url, extra={"event": "downloaded", "url": url})
+        return filepath
+
+
+    def wait(self):
+        """
+        Wait for every scheduled download to finish.
+
+        Returns:
+            tuple: Number of successful downloads and a list of (url, error) for the failed ones.
+        """
+        while True:
+            with self.lock:
+                pending = list(self.pending)
+            if not pending:
+                break
+            futures.wait(pending)
+
+        with self.lock:
+            succeeded, failed = self.succeeded, self.failed
+            self.succeeded, self.failed = 0, []
+
+        logging.info(f"Image downloads finished: {succeeded} succeeded, {len(failed)} failed")
+        return succeeded, failed
+
+
+    def close(self):
+        """
+        Shut down the worker pool and close the pooled connections.
+        """
+        self.executor.shutdown(wait=True)
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
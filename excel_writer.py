@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming Excel writer for the scraped news.
+
+It uses a write-only openpyxl workbook: each row is serialized to a temporary
+file as soon as it is appended, so the memory stays flat whatever the number
+of rows, and the workbook is assembled when it is closed.
+
+An xlsx file can only be saved whole, once: nothing is written to the output
+file before close(). If the process is killed before it, the Excel isn't
+created and the streamed rows are lost; the checkpoint journal is what lets a
+retry continue the search.
+"""
+
+import logging
+
+
+class StreamingExcelWriter:
+    def __init__(self, output_file, header, sheet_name="Sheet"):
+        """
+        Initialize the StreamingExcelWriter class and write the header.
+
+        Args:
+            output_file (str): Path of the Excel file.
+            header (list): The header row.
+            sheet_name (str): Name of the worksheet.
+        """
+        self.output_file = output_file
+        # openpyxl is imported on first use, so the runs that don't write an Excel don't load it
+        from openpyxl import Workbook
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(sheet_name)
+        self.sheet.append(header)
+        self.rows = 0
+        self.closed = False
+
+        logging.info(f"Streaming Excel opened: {output_file}")
+
+
+    def append(self, result):
+        """
+        Append a result as a row of the temporary file, in the order of the columns of the header.
+        It only reaches the output file when the writer is closed.
+
+        Args:
+            result (NewsResult): The scraped news, its values() follow the header.
+        """
+        self.sheet.append(list(result.values()))
+        self.rows += 1
+
+
+    def close(self):
+        """
+        Assemble and save the workbook. It can be called more than once.
+        """
+        if self.closed:
+            return
+
+        self.workbook.save(self.output_file)
+        self.workbook.close()
+        self.closed = True
+
+        logging.info(f"Streaming Excel saved with {self.rows} rows: {self.output_file}")
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+Content-addressed on-disk cache for the downloaded images.
+
+Each normalized URL points to a blob named by the SHA-256 of its content, with
+the ETag and Last-Modified of the last response, so repeated fetches are
+conditional and usually answered with a 304. Blobs are hardlinked (or copied)
+into the run's output folder, and the least recently used entries are evicted
+when the cache grows past its size cap. A blob is pinned from the moment a
+download finds or stores it until it is linked, so the eviction run by another
+download thread never deletes it in between.
+"""
+
+import os
+import time
+import shutil
+import hashlib
+import logging
+import sqlite3
+import tempfile
+import threading
+
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+class ImageCache:
+    def __init__(self, folder, max_bytes=500 * 1024 * 1024, chunk_size=64 * 1024):
+        """
+        Initialize the ImageCache class, creating the cache folder if needed.
+
+        Args:
+            folder (str): Folder of the cache.
+            max_bytes (int): Maximum size of the cached blobs, the least recently used are evicted above it.
+            chunk_size (int): Size in bytes of each chunk written to disk.
+        """
+        self.folder = folder
+        self.blobs_path = os.path.join(folder, "blobs")
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        os.makedirs(self.blobs_path, exist_ok=True)
+
+        # The downloads run in several threads, they share the connection behind a lock
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(os.path.join(folder, "cache.sqlite"), check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.connection.commit()
+
+        # Number of downloads about to link each blob, the eviction skips them
+        self.pinned = {}
+
+        self.hits = 0
+        self.misses = 0
+
+
+    def normalize_url(self, url):
+        """
+        Normalize a URL so the same image is found under equivalent URLs.
+        The scheme and host are lowercased, the fragment is dropped and the query parameters are sorted.
+
+        Args:
+            url (str): The URL.
+
+        Returns:
+            str: The normalized URL.
+        """
+        parts = urlsplit(url.strip())
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
+
+
+    def blob_path(self, content_hash):
+        """
+        Get the path of a blob.
+
+        Args:
+            content_hash (str): The SHA-256 of the content.
+
+        Returns:
+            str: The path of the blob.
+        """
+        return os.path.join(self.blobs_path, content_hash[:2], content_hash)
+
+
+    def get_entry(self, url, pin=False):
+        """
+        Get the cache entry of a normalized URL, if its blob is still on disk.
+
+        Args:
+            url (str): The normalized URL.
+            pin (bool): If True, the blob isn't evicted until it is released (see release).
+
+        Returns:
+            tuple: The content hash, ETag and Last-Modified, or None if the URL isn't cached.
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT content_hash, etag, last_modified FROM entries WHERE url = ?", (url,)).fetchone()
+            if row is None or not os.path.exists(self.blob_path(row[0])):
+                return None
+            if pin:
+                self.pinned[row[0]] = self.pinned.get(row[0], 0) + 1
+        return row
+
+
+    def release(self, content_hashes):
+        """
+        Unpin blobs pinned by get_entry or store, the eviction can delete them again.
+
+        Args:
+            content_hashes (list): The SHA-256 of the blobs, once for each time they were pinned.
+        """
+        with self.lock:
+            for content_hash in content_hashes:
+                self.pinned[content_hash] -= 1
+                if self.pinned[content_hash] == 0:
+                    del self.pinned[content_hash]
+
+
+    def fetch(self, session, url, filepath, timeout=30):
+        """
+        Get an image through the cache and place it at the given path.
+
+        Args:
+            session (requests.Session): The session used for the request.
+            url (str): The URL of the image.
+            filepath (str): The path where the image will be saved.
+            timeout (int): Timeout in seconds for the request.
+
+        Returns:
+            str: The path of the saved file.
+
+        Raises:
+            requests.RequestException: If the request fails or returns an error status.
+        """
+        key = self.normalize_url(url)
+        entry = self.get_entry(key, pin=True)
+        pinned = [entry[0]] if entry is not None else []
+
+        try:
+            # Revalidate the cached copy instead of downloading it again
+            headers = {}
+            if entry is not None:
+                content_hash, etag, last_modified = entry
+                if etag:
+                    headers["If-None-Match"] = etag
+                if last_modified:
+                    headers["If-Modified-Since"] = last_modified
+
+            with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+                if entry is not None and response.status_code == 304:
+                    with self.lock:
+                        self.hits += 1
+                    self.touch(key)
+                    logging.info("Image not modified, using the cache: %s", url, extra={"event": "cache_hit", "url": url})
+                else:
+                    response.raise_for_status()
+                    with self.lock:
+                        self.misses += 1
+                    content_hash = self.store(key, response)
+                    pinned.append(content_hash)
+
+            self.link(content_hash, filepath)
+        finally:
+            self.release(pinned)
+        return filepath
+
+
+    def store(self, url, response):
+        """
+        Stream a response into a blob and record it for the URL.
+        The blob is pinned for the caller, which releases it once linked.
+
+        Args:
+            url (str): The normalized URL.
+            response (requests.Response): The streamed response.
+
+        Returns:
+            str: The SHA-256 of the content.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.blobs_path, suffix=".part")
+        try:
+            with os.fdopen(file_descriptor, 'wb') as file:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    digest.update(chunk)
+                    size += len(chunk)
+                    file.write(chunk)
+
+            # The same content under another URL is stored only once, pinned before it is in place
+            # so the eviction of the other URL doesn't delete it
+            content_hash = digest.hexdigest()
+            with self.lock:
+                self.pinned[content_hash] = self.pinned.get(content_hash, 0) + 1
+        except Exception:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+        try:
+            blob_path = self.blob_path(content_hash)
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            os.replace(temporary_path, blob_path)
+        except Exception:
+            self.release([content_hash])
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+        with self.lock:
+            self.connection.execute("""
+                INSERT OR REPLACE INTO entries (url, content_hash, size, etag, last_modified, last_used)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (url, content_hash, size, response.headers.get("ETag"), response.headers.get("Last-Modified"), time.time()))
+            self.connection.commit()
+
+        self.evict()
+        return content_hash
+
+
+    def touch(self, url):
+        """
+        Mark an entry as recently used.
+
+        Args:
+            url (str): The normalized URL.
+        """
+        with self.lock:
+            self.connection.execute("UPDATE entries SET last_used = ? WHERE url = ?", (time.time(), url))
+            self.connection.commit()
+
+
+    def link(self, content_hash, filepath):
+        """
+        Place a blob at the given path, with a hardlink when possible, otherwise with a copy.
+
+        Args:
+            content_hash (str): The SHA-256 of the content.
+            filepath (str): The destination path.
+        """
+        if os.path.lexists(filepath):
+            os.remove(filepath)
+        try:
+            os.link(self.blob_path(content_hash), filepath)
+        except OSError:
+            shutil.copyfile(self.blob_path(content_hash), filepath)
+
+
+    def size(self):
+        """
+        Get the total size of the cached blobs.
+
+        Returns:
+            int: The size in bytes.
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT SUM(size) FROM (SELECT content_hash, MAX(size) AS size FROM entries GROUP BY content_hash)").fetchone()
+        return row[0] or 0
+
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits its size cap.
+        A blob is deleted when no entry points to it anymore, the pinned blobs are kept.
+        """
+        total = self.size()
+        if total <= self.max_bytes:
+            return
+
+        with self.lock:
+            entries = self.connection.execute("SELECT url, content_hash, size FROM entries ORDER BY last_used").fetchall()
+            for url, content_hash, size in entries:
+                if total <= self.max_bytes:
+                    break
+                if content_hash in self.pinned:
+                    continue
+
+                self.connection.execute("DELETE FROM entries WHERE url = ?", (url,))
+                shared = self.connection.execute("SELECT 1 FROM entries WHERE content_hash = ?", (content_hash,)).fetchone()
+                if shared is None:
+                    if os.path.exists(self.blob_path(content_hash)):
+                        os.remove(self.blob_path(content_hash))
+                    total -= size
+                    logging.info(f"Evicted image from the cache: {url}")
+
+            self.connection.commit()
+
+
+    def close(self):
+        """
+        Close the cache database.
+        """
+        logging.info(f"Image cache: {self.hits} revalidated, {self.misses} downloaded")
+        self.connection.close()
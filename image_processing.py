@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+"""
+Post-processing of the downloaded images, in a process pool.
+
+For each image of the results the real format is read from its first bytes
+(the extension guessed from the URL is often wrong), the extension is fixed,
+a bounded-size derivative (WebP by default) is written to a new file, and a
+perceptual hash (DCT pHash) is computed. Images whose hashes are close are the
+same photo served under different crop or size URLs, and are stored once.
+
+The originals are never modified in place: they can be hardlinks to the blobs
+of the image cache, so they are only renamed or unlinked, and the derivatives
+are always new files. Pillow is needed for the derivatives and the hashes;
+without it only the formats and extensions are fixed.
+"""
+
+import os
+import math
+import logging
+
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Extension of each format sniffed
+format_extensions = {
+    "jpeg": ".jpg", "png": ".png", "gif": ".gif", "webp": ".webp", "bmp": ".bmp", "tiff": ".tif",
+    "avif": ".avif", "heic": ".heic", "svg": ".svg", "ico": ".ico"
+}
+
+# Other extensions accepted for a format
+extension_aliases = {"jpeg": [".jpeg", ".jpe"], "tiff": [".tiff"], "heic": [".heif"]}
+
+
+def sniff_format(header):
+    """
+    Get the format of an image from its first bytes.
+
+    Args:
+        header (bytes): The first bytes of the file, 32 are enough.
+
+    Returns:
+        str: The format, as in format_extensions, or None if it isn't recognized.
+    """
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    if header[:4] in (b"II*\x00", b"MM\x00*"):
+        return "tiff"
+    if header.startswith(b"BM"):
+        return "bmp"
+    if header.startswith(b"\x00\x00\x01\x00"):
+        return "ico"
+    if header[4:8] == b"ftyp":
+        brand = header[8:12]
+        if brand in (b"avif", b"avis"):
+            return "avif"
+        if brand in (b"heic", b"heix", b"hevc", b"hevx", b"mif1", b"msf1"):
+            return "heic"
+
+    text = header.lstrip().lower()
+    if text.startswith(b"<svg") or (text.startswith(b"<?xml") and b"<svg" in text):
+        return "svg"
+    return None
+
+
+def fix_extension(filename, image_format):
+    """
+    Replace the extension of a filename by the one of its real format.
+
+    Args:
+        filename (str): The filename.
+        image_format (str): The format sniffed, None to keep the filename.
+
+    Returns:
+        str: The filename with the right extension.
+    """
+    if image_format is None:
+        return filename
+
+    stem, extension = os.path.splitext(filename)
+    if extension.lower() in [format_extensions[image_format]] + extension_aliases.get(image_format, []):
+        return filename
+    return stem + format_extensions[image_format]
+
+
+# Cosines of the 32-point DCT-II, computed once per process
+dct_size = 32
+dct_cosines = [[math.cos(math.pi * (2 * x + 1) * u / (2 * dct_size)) for x in range(dct_size)] for u in range(dct_size)]
+
+
+def perceptual_hash(image):
+    """
+    Compute the DCT perceptual hash of an image: the 8x8 lowest frequencies of its
+    32x32 grayscale version, each bit set when the frequency is above their median.
+
+    Args:
+        image (PIL.Image.Image): The image.
+
+    Returns:
+        str: The 64-bit hash, as 16 hexadecimal digits.
+    """
+    from PIL import Image
+
+    pixels = list(image.convert("L").resize((dct_size, dct_size), Image.LANCZOS).getdata())
+    rows = [pixels[y * dct_size:(y + 1) * dct_size] for y in range(dct_size)]
+
+    # Separable 2D DCT, only the 8 lowest frequencies of each axis are needed
+    row_frequencies = [[sum(cosines[x] * row[x] for x in range(dct_size)) for cosines in dct_cosines[:8]] for row in rows]
+    frequencies = [sum(dct_cosines[v][y] * row_frequencies[y][u] for y in range(dct_size)) for v in range(8) for u in range(8)]
+
+    # The first frequency is the mean brightness, it is left out of the median
+    median = sorted(frequencies[1:])[len(frequencies[1:]) // 2]
+    bits = 0
+    for frequency in frequencies:
+        bits = (bits << 1) | (frequency > median)
+    return f"{bits:016x}"
+
+
+def hash_distance(first, second):
+    """
+    Get the number of different bits between two perceptual hashes.
+
+    Args:
+        first (str): A hash.
+        second (str): Another hash.
+
+    Returns:
+        int: The Hamming distance.
+    """
+    return bin(int(first, 16) ^ int(second, 16)).count("1")
+
+
+def process_image(path, derivative_path=None, max_size=320, derivative_format="webp", quality=80):
+    """
+    Sniff the format of an image, hash it and write its derivative. It runs in the workers of the pool.
+
+    Args:
+        path (str): Path of the image, it is only read.
+        derivative_path (str): Path of the derivative, None to skip it.
+        max_size (int): Maximum width and height of the derivative.
+        derivative_format (str): Format of the derivative, as accepted by Pillow.
+        quality (int): Quality of the derivative.
+
+    Returns:
+        dict: The format, the perceptual hash, the size of the image and the path of the derivative,
+              None for what couldn't be done, and the error if the image couldn't be read.
+    """
+    processed = {"format": None, "hash": None, "width": None, "height": None, "derivative": None, "error": None}
+
+    with open(path, "rb") as file:
+        processed["format"] = sniff_format(file.read(32))
+
+    if processed["format"] in (None, "svg"):
+        return processed
+
+    try:
+        from PIL import Image
+    except ImportError:
+        processed["error"] = "Pillow is not installed"
+        return processed
+
+    try:
+        with Image.open(path) as image:
+            image.load()
+            processed["width"], processed["height"] = image.size
+            processed["hash"] = perceptual_hash(image)
+
+            if derivative_path is not None:
+                derivative = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+                derivative.thumbnail((max_size, max_size))
+                derivative.save(derivative_path, derivative_format.upper(), quality=quality)
+                processed["derivative"] = derivative_path
+    except Exception as e:
+        processed["error"] = str(e)
+
+    return processed
+
+
+class ImagePostProcessor:
+    def __init__(self, workers=None, max_size=320, derivative_format="webp", quality=80,
+                 dedup_distance=4, replace_originals=False):
+        """
+        Initialize the ImagePostProcessor class.
+
+        Args:
+            workers (int): Number of worker processes, the number of CPUs if None.
+            max_size (int): Maximum width and height of the derivatives.
+            derivative_format (str): Format of the derivatives, "webp" or "jpeg"; None to skip them.
+            quality (int): Quality of the derivatives.
+            dedup_distance (int): Maximum number of different bits between the hashes of the same photo, -1 to keep duplicates.
+            replace_originals (bool): If True, the results point to the derivatives and the originals are removed.
+        """
+        self.workers = workers
+        self.max_size = max_size
+        self.derivative_format = derivative_format
+        self.quality = quality
+        self.dedup_distance = dedup_distance
+        self.replace_originals = replace_originals
+
+        self.duplicates = 0
+        self.renamed = 0
+        self.derivatives = 0
+
+
+    def derivative_path(self, folder, filename, used):
+        """
+        Get a path for the derivative of an image, not used by another one.
+
+        Args:
+            folder (str): Folder of the derivatives.
+            filename (str): Filename of the image.
+            used (set): The paths already given, the new one is added to it.
+
+        Returns:
+            str: The path.
+        """
+        stem = os.path.splitext(filename)[0]
+        extension = format_extensions.get(self.derivative_format.lower(), "." + self.derivative_format.lower())
+        path = os.path.join(folder, stem + extension)
+        number = 1
+        while path in used:
+            number += 1
+            path = os.path.join(folder, f"{stem}-{number}{extension}")
+        used.add(path)
+        return path
+
+
+    def rename(self, output_path, filename, new_filename):
+        """
+        Rename an image, without overwriting another one.
+
+        Args:
+            output_path (str): Folder of the images.
+            filename (str): The current filename.
+            new_filename (str): The filename wanted.
+
+        Returns:
+            str: The new filename.
+        """
+        stem, extension = os.path.splitext(new_filename)
+        number = 1
+        while os.path.exists(os.path.join(output_path, new_filename)):
+            number += 1
+            new_filename = f"{stem}-{number}{extension}"
+
+        # Renaming a hardlink doesn't touch the cached blob
+        os.rename(os.path.join(output_path, filename), os.path.join(output_path, new_filename))
+        self.renamed += 1
+        return new_filename
+
+
+    def process_results(self, results, output_path):
+        """
+        Post-process the images of the results and update their rows: the picture filename
+        gets the right extension (or the derivative, or the kept copy of a duplicate), and
+        the image hash is set to the perceptual hash.
+
+        Args:
+            results (list): The NewsResult records, updated in place.
+            output_path (str): Folder of the images.
+
+        Returns:
+            list: The results.
+        """
+        derivatives_path = os.path.join(output_path, "derivatives")
+        if self.derivative_format:
+            os.makedirs(derivatives_path, exist_ok=True)
+
+        # Each image once, even if several rows point to it
+        jobs = {}
+        used = set()
+        for result in results:
+            filename = result.picture_filename
+            if filename and filename not in jobs and os.path.isfile(os.path.join(output_path, filename)):
+                jobs[filename] = self.derivative_path(derivatives_path, filename, used) if self.derivative_format else None
+
+        processed = {}
+        if jobs:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = {filename: executor.submit(process_image, os.path.join(output_path, filename), derivative,
+                                                     self.max_size, self.derivative_format or "webp", self.quality)
+                           for filename, derivative in jobs.items()}
+                for filename, future in futures.items():
+                    try:
+                        processed[filename] = future.result()
+                    except Exception as e:
+                        logging.error(f"Failed to process image {filename}: {e}")
+
+        # Final filename of each image, the first row of a photo keeps it and its duplicates point to it
+        final_names = {}
+        kept_hashes = []
+        for filename, image in processed.items():
+            if image["error"]:
+                logging.warning(f"Image {filename} not processed: {image['error']}")
+
+            duplicate_of = None
+            if image["hash"] is not None and self.dedup_distance >= 0:
+                for kept_hash, kept_filename in kept_hashes:
+                    if hash_distance(image["hash"], kept_hash) <= self.dedup_distance:
+                        duplicate_of = kept_filename
+                        break
+
+            if duplicate_of is not None:
+                self.remove(output_path, filename, image["derivative"])
+                final_names[filename] = final_names[duplicate_of]
+                self.duplicates += 1
+                continue
+
+            final_name = filename
+            if image["derivative"] is not None:
+                self.derivatives += 1
+                if self.replace_originals:
+                    self.remove(output_path, filename, None)
+                    final_name = os.path.relpath(image["derivative"], output_path).replace(os.sep, "/")
+            if final_name == filename:
+                fixed_name = fix_extension(filename, image["format"])
+                if fixed_name != filename:
+                    final_name = self.rename(output_path, filename, fixed_name)
+
+            final_names[filename] = final_name
+            if image["hash"] is not None:
+                kept_hashes.append((image["hash"], filename))
+
+        for result in results:
+            filename = result.picture_filename
+            if filename in processed:
+                result.picture_filename = final_names[filename]
+                result.image_hash = processed[filename]["hash"] or ''
+            elif result.title:
+                result.image_hash = ''
+
+        logging.info(f"Processed {len(processed)} images: {self.renamed} renamed, {self.derivatives} derivatives, {self.duplicates} duplicates removed")
+        return results
+
+
+    def remove(self, output_path, filename, derivative):
+        """
+        Remove an image and its derivative. An image linked to the cache only loses its link.
+
+        Args:
+            output_path (str): Folder of the images.
+            filename (str): Filename of the image.
+            derivative (str): Path of the derivative, or None.
+        """
+        for path in [os.path.join(output_path, filename), derivative]:
+            if path and os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+Browserless client for the LA Times search.
+
+The search results are rendered by the server, so the pages are fetched with a
+pooled HTTP session and parsed with lxml using the same XPaths as the browser.
+"""
+
+import logging
+
+from urllib.parse import urlencode, urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class CategoryNotFoundError(ValueError):
+    """
+    Raised when none of the categories of a search exist in its results page.
+    """
+    pass
+
+
+class LATimesSearchClient:
+    def __init__(self, base_url="https://www.latimes.com/", timeout=30, pool_size=4):
+        """
+        Initialize the LATimesSearchClient class.
+
+        Args:
+            base_url (str): Root URL of the site, it can point to a local server for tests.
+            timeout (int): Timeout in seconds for each HTTP request.
+            pool_size (int): Number of keep-alive connections kept per host.
+        """
+        self.base_url = base_url
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+        })
+
+        # Optional RequestScheduler, when set the pages are fetched within its limits and retried
+        self.scheduler = None
+
+        # Categories of the first page of each query, read once even when a resumed search looks them up again
+        self.query_categories = {}
+
+        # XPaths shared with the browser engine
+        self.articles_xpath = "//ul[@class='search-results-module-results-menu']/li"
+        self.categories_xpath = "//ul[@class='search-filter-menu']/li"
+        self.next_page_xpath = "//div[@class='search-results-module-next-page']/a"
+
+
+    def build_search_url(self, query, facet=None, page=1):
+        """
+        Build the URL of a search results page, sorted by the newest.
+
+        Args:
+            query (str): The phrase to search.
+            facet (tuple or list): Name and value of the category filter, a list of them to filter
+                                   several categories at once, or None for all categories.
+            page (int): 1-based page number.
+
+        Returns:
+            str: The search URL.
+        """
+        params = [("q", query)]
+        if isinstance(facet, list):
+            params.extend(facet)
+        elif facet is not None:
+            params.append(facet)
+
+        # s=1 is the "Newest" option of the sort box
+        params.append(("s", 1))
+        if page > 1:
+            params.append(("p", page))
+
+        return urljoin(self.base_url, "search") + "?" + urlencode(params)
+
+
+    def fetch(self, url):
+        """
+        Fetch a page.
+
+        Args:
+            url (str): The URL to fetch.
+
+        Returns:
+            str: The HTML of the page.
+
+        Raises:
+            requests.RequestException: If the request fails or returns an error status.
+            CircuitOpenError: If the host failed too many times recently.
+        """
+        def request():
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            return response
+
+        response = request() if self.scheduler is None else self.scheduler.call(url, request)
+        logging.info("Fetched %s", url, extra={"url": url})
+        return response.text
+
+
+    def fetch_search_page(self, query, facet=None, page=1):
+        """
+        Fetch a search results page.
+
+        Args:
+            query (str): The phrase to search.
+            facet (tuple): Name and value of the category filter, or None for all categories.
+            page (int): 1-based page number.
+
+        Returns:
+            str: The HTML of the page.
+        """
+        return self.fetch(self.build_search_url(query, facet=facet, page=page))
+
+
+    def parse_html(self, html):
+        """
+        Parse a page. lxml is imported on first use, so the browser engine doesn't load it.
+
+        Args:
+            html (str or lxml.html.HtmlElement): The HTML of the page, or the page already parsed.
+
+        Returns:
+            lxml.html.HtmlElement: The root of the document.
+        """
+        if not isinstance(html, (str, bytes)):
+            return html
+
+        from lxml import html as lxml_html
+        return lxml_html.fromstring(html)
+
+
+    def text(self, element):
+        """
+        Get the visible text of an element with the whitespace collapsed.
+
+        Args:
+            element (lxml.html.HtmlElement): The element, or None.
+
+        Returns:
+            str: The text, or None if there is no element.
+        """
+        if element is None:
+            return None
+        return " ".join(element.text_content().split())
+
+
+    def first(self, element, xpath):
+        """
+        Find the first element matching a relative XPath.
+
+        Args:
+            element (lxml.html.HtmlElement): The element to search within.
+            xpath (str): The relative XPath.
+
+        Returns:
+            lxml.html.HtmlElement: The element found, or None.
+        """
+        found = element.xpath(xpath)
+        return found[0] if found else None
+
+
+    def parse_articles(self, html):
+        """
+        Extract every article of a search results page.
+
+        Args:
+            html (str or lxml.html.HtmlElement): The HTML of the page, or the page already parsed by parse_html.
+
+        Returns:
+            list: A list of dictionaries with the raw title, description, date, image URL and article URL,
+                  in the same shape returned by NewsScraper.extract_articles_la_times.
+        """
+        document = self.parse_html(html)
+
+        articles = []
+        for article in document.xpath(self.articles_xpath):
+            link = self.first(article, ".//h3[@class='promo-title']/a")
+            image = self.first(article, ".//div[@class='promo-media']//img[@class='image']")
+            image_src = image.get("src") if image is not None else None
+
+            articles.append({
+                "title": self.text(link),
+                "description": self.text(self.first(article, ".//p[@class='promo-description']")),
+                "date": self.text(self.first(article, ".//p[@class='promo-timestamp']")),
+                "image_url": urljoin(self.base_url, image_src) if image_src else None,
+                "url": urljoin(self.base_url, link.get("href")) if link is not None and link.get("href") else None
+            })
+
+        logging.info("Parsed %d articles", len(articles))
+        return articles
+
+
+    def parse_categories(self, html):
+        """
+        Extract the category filters of a search results page.
+
+        Args:
+            html (str or lxml.html.HtmlElement): The HTML of the page, or the page already parsed by parse_html.
+
+        Returns:
+            dict: Lowercase category name mapped to the (name, value) facet of its checkbox.
+        """
+        document = self.parse_html(html)
+
+        categories = {}
+        for category in document.xpath(self.categories_xpath):
+            label = self.text(self.first(category, ".//label/span"))
+            checkbox = self.first(category, ".//label//input[@type='checkbox']")
+            if label and checkbox is not None and checkbox.get("name"):
+                categories[label.lower().strip()] = (checkbox.get("name"), checkbox.get("value"))
+
+        return categories
+
+
+    def find_category(self, query, news_category):
+        """
+        Find the facet of a category for a search.
+
+        Args:
+            query (str): The phrase to search.
+            news_category (str): The category name, as shown in the page.
+
+        Returns:
+            tuple: Name and value of the category filter, or None if the category doesn't exist.
+        """
+        return self.find_categories(query, [news_category])[0]
+
+
+    def find_categories(self, query, news_categories):
+        """
+        Find the facets of several categories for a search. The first page of the search is fetched
+        the first time only, the next lookups for the same phrase reuse its categories.
+
+        Args:
+            query (str): The phrase to search.
+            news_categories (list): The category names, as shown in the page.
+
+        Returns:
+            list: Name and value of the filter of each category, None for a category that doesn't exist.
+        """
+        key = " ".join(query.split()).lower()
+        if key not in self.query_categories:
+            self.query_categories[key] = self.parse_categories(self.fetch_search_page(query))
+        categories = self.query_categories[key]
+
+        facets = []
+        for news_category in news_categories:
+            facet = categories.get(news_category.lower().strip())
+            if facet is not None:
+                logging.info(f"Found category: {news_category}")
+            facets.append(facet)
+        return facets
+
+
+    def has_next_page(self, html):
+        """
+        Check if a search results page links to a next page.
+
+        Args:
+            html (str or lxml.html.HtmlElement): The HTML of the page, or the page already parsed by parse_html.
+
+        Returns:
+            bool: True if there is a next page, otherwise False.
+        """
+        return len(self.parse_html(html).xpath(self.next_page_xpath)) > 0
+
+
+    def close(self):
+        """
+        Close the pooled connections.
+        """
+        self.session.close()
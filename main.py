@@ -1,36 +1,89 @@
-# -*- coding: utf-8 -*-
-"""
-Created on Mon Jul 22 14:25:46 2024
-
-@author: JoaoMurdiga
-"""
-
-import logging
-from scraper import scrape_news
-from robocorp.tasks import task
-
-def setup_logging():
-    log_path = './output/rpa_news_scraper.log'
-    
-    logging.basicConfig(
-        filename = log_path,
-        level = logging.INFO,
-        format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-
-
-@task
-def main():
-    setup_logging()
-    logging.info("RPA News Scraper started")
-    
-    try:
-        logging.debug("Starting scrape_news()")
-        scrape_news()
-    except Exception as e:
-        logging.error(f"An error occurred during the scraping process: {e}")
-    
-    logging.info("RPA News Scraper finished")
-    
-if __name__ == "__main__":
-    main()
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Jul 22 14:25:46 2024
+
+@author: JoaoMurdiga
+"""
+
+# Record the imports from here, the scraper and the RPA libraries are only imported by the task that needs them
+from startup_profile import StartupProfiler
+startup = StartupProfiler()
+startup.install()
+
+import os
+import logging
+import structured_logging
+from robocorp.tasks import task
+
+def setup_logging():
+    log_path = './output/rpa_news_scraper.log'
+    
+    # JSON lines written by a background thread, the scraping threads only queue the records
+    structured_logging.setup_logging(log_path, level = logging.INFO)
+    startup.mark("task started")
+
+
+def write_startup_profile(name):
+    startup.mark("task finished")
+    try:
+        startup.write(os.path.join('./output', f'startup-profile-{name}.txt'))
+    except Exception as e:
+        logging.error(f"Failed to write the startup profile: {e}")
+    finally:
+        # The imports after the report are no longer timed
+        startup.uninstall()
+
+
+@task
+def main():
+    setup_logging()
+    logging.info("RPA News Scraper started")
+    
+    try:
+        logging.debug("Starting scrape_news()")
+        from scraper import scrape_news
+        startup.mark("scraper imported")
+        scrape_news()
+    except Exception as e:
+        logging.error(f"An error occurred during the scraping process: {e}")
+    
+    write_startup_profile("main")
+    logging.info("RPA News Scraper finished")
+
+
+@task
+def batch():
+    setup_logging()
+    logging.info("RPA News Scraper batch started")
+    
+    try:
+        logging.debug("Starting scrape_news_batch()")
+        from batch import scrape_news_batch
+        startup.mark("batch imported")
+        scrape_news_batch()
+    except Exception as e:
+        logging.error(f"An error occurred during the batch scraping process: {e}")
+    
+    write_startup_profile("batch")
+    logging.info("RPA News Scraper batch finished")
+
+
+@task
+def service():
+    setup_logging()
+    logging.info("RPA News Scraper service started")
+    
+    try:
+        from service import run_service
+        startup.mark("service imported")
+        run_service()
+    except KeyboardInterrupt:
+        logging.info("RPA News Scraper service stopped")
+    except Exception as e:
+        logging.error(f"An error occurred in the scraper service: {e}")
+    
+    write_startup_profile("service")
+    logging.info("RPA News Scraper service finished")
+    
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Multi-source search: the same search on several news sites at the same time.
+
+Each site runs on its own NewsScraper (its own browser and its own adapter, see
+site_adapters.py), in its own thread, writing its images and Excel file to a
+subfolder named after the site. When every site is done, their results are
+merged into one Excel file, the newest first, so the wall time of the search is
+about the time of the slowest site instead of the sum of all of them. A site
+that fails doesn't stop the others.
+"""
+
+import os
+import logging
+
+from concurrent.futures import ThreadPoolExecutor
+
+from excel_writer import StreamingExcelWriter
+from news_result import NewsResult
+from scraper import NewsScraper, run_search
+
+
+class MultiSiteSearch:
+    def __init__(self, sites, output_path='./output/'):
+        """
+        Initialize the MultiSiteSearch class.
+
+        Args:
+            sites (list): Names of the sites, as in site_adapters.get_site_adapter.
+            output_path (str): Folder of the merged Excel file, with a subfolder for each site.
+        """
+        self.sites = list(dict.fromkeys(sites))
+        self.output_path = output_path
+        self.report = {}
+
+
+    def search_site(self, site, search_phrase, months, news_category, payload):
+        """
+        Run the search on one site, with its own scraper.
+
+        Args:
+            site (str): Name of the site.
+            search_phrase (str or list): The phrase to search, or several phrases (see run_search).
+            months (int): Number of months to go back, 0 or empty for no limit.
+            news_category (str or list): The category to filter, several categories, or empty for all.
+            payload (dict): The optional settings of the work item, shared by every site.
+
+        Returns:
+            list: The NewsResult records of the site, with the picture filenames relative to the merged output folder.
+        """
+        scraper = NewsScraper()
+        try:
+            scraper.reset_search(os.path.join(self.output_path, site, ''))
+            scraper.payload = dict(payload, site=site)
+
+            # The rows of every site are merged, so the streamed ones are kept too
+            results = run_search(scraper, search_phrase, months, news_category, records=True, keep_results=True)
+            results = [result for result in results if result.title != '']
+            for result in results:
+                if result.picture_filename:
+                    result.picture_filename = f"{site}/{result.picture_filename}"
+
+            self.report[site] = {"state": "DONE", "results": len(results)}
+            logging.info(f"{site}: {len(results)} results")
+            return results
+
+        except Exception as e:
+            logging.error(f"Search failed in {site}: {e}")
+            self.report[site] = {"state": "FAILED", "error": str(e)}
+            return []
+
+        finally:
+            scraper.close()
+
+
+    def run(self, search_phrase, months, news_category, payload=None):
+        """
+        Run the search on every site at the same time and merge their results.
+
+        Args:
+            search_phrase (str or list): The phrase to search, or several phrases (see run_search).
+            months (int): Number of months to go back, 0 or empty for no limit.
+            news_category (str or list): The category to filter, several categories, or empty for all.
+            payload (dict): The optional settings of the work item, shared by every site.
+
+        Returns:
+            list: The NewsResult records of every site, the newest first.
+        """
+        payload = payload or {}
+        logging.info(f"Searching {search_phrase} in {', '.join(self.sites)}")
+
+        with ThreadPoolExecutor(max_workers=len(self.sites), thread_name_prefix="site") as executor:
+            futures = [executor.submit(self.search_site, site, search_phrase, months, news_category, payload) for site in self.sites]
+            results = [result for future in futures for result in future.result()]
+
+        # The dates are formatted as '%Y-%m-%d', so the text order is the date order
+        results.sort(key=lambda result: result.date, reverse=True)
+        self.save(results)
+        return results
+
+
+    def save(self, results):
+        """
+        Write the merged results to an Excel file, with only the header if there are no results.
+
+        Args:
+            results (list): The merged results.
+        """
+        os.makedirs(self.output_path, exist_ok=True)
+        header = NewsScraper.excel_header
+        if any(result.image_hash is not None for result in results):
+            header = header + ["Image hash"]
+        phrase_counts = next((result.phrase_counts for result in results if result.phrase_counts is not None), None)
+        if phrase_counts is not None:
+            header = header + [NewsResult.phrase_column + phrase for phrase in phrase_counts]
+        writer = StreamingExcelWriter(os.path.join(self.output_path, "News.xlsx"), header)
+        try:
+            for result in results:
+                writer.append(result)
+        finally:
+            writer.close()
+
+        logging.info(f"Merged {len(results)} results from {len(self.sites)} sites")
+
+
+def scrape_news_sites(sites, search_phrase, months, news_category, payload=None, output_path='./output/'):
+    """
+    Run the same search on several sites at the same time.
+
+    Args:
+        sites (list): Names of the sites, as in site_adapters.get_site_adapter.
+        search_phrase (str or list): The phrase to search, or several phrases (see run_search).
+        months (int): Number of months to go back, 0 or empty for no limit.
+        news_category (str or list): The category to filter, several categories, or empty for all.
+        payload (dict): The optional settings of the work item, shared by every site.
+        output_path (str): Folder of the merged Excel file, with a subfolder for each site.
+
+    Returns:
+        list: The results of every site as dictionaries, the newest first.
+    """
+    results = MultiSiteSearch(sites, output_path).run(search_phrase, months, news_category, payload)
+    return [result.to_dict() for result in results]
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Compact record of a scraped news article.
+
+The results are kept as slotted records from the scraping to the writers:
+they have no per-instance dictionary and don't repeat the long column names of
+the output in every row. The searches of several phrases add a column counting
+each phrase ("Count of <phrase>") after the other columns. They are converted to the dictionaries of the Excel
+columns only when they leave the robot (run_search, the HTTP service).
+"""
+
+
+class NewsResult:
+    # Attributes of the record, in the order of the output columns
+    __slots__ = ("title", "date", "description", "picture_filename", "search_count", "contains_money", "image_hash", "phrase_counts")
+
+    # Keys of the dictionaries returned by run_search, for each attribute
+    legacy_keys = {
+        "title": "Title",
+        "date": "Date",
+        "description": "Description",
+        "picture_filename": "Picture filename",
+        "search_count": "Count of search phrases in the title and description",
+        "contains_money": "Title or description contains any amount of money",
+        "image_hash": "Image hash"
+    }
+
+    # Prefix of the columns counting each phrase
+    phrase_column = "Count of "
+
+    def __init__(self, title, date, description, picture_filename, search_count, contains_money, image_hash=None, phrase_counts=None):
+        """
+        Initialize the NewsResult class.
+
+        Args:
+            title (str): Title of the article.
+            date (str): Date of the article, formatted as '%Y-%m-%d'.
+            description (str): Description of the article.
+            picture_filename (str): Filename of the image, relative to the output folder.
+            search_count (int): Count of the search phrases in the title and description.
+            contains_money (bool): True if the title or description contains an amount of money.
+            image_hash (str): Perceptual hash of the image, None if the images aren't post-processed.
+            phrase_counts (dict): Occurrences of each phrase of a multi-phrase search, None for one phrase.
+        """
+        self.title = title
+        self.date = date
+        self.description = description
+        self.picture_filename = picture_filename
+        self.search_count = search_count
+        self.contains_money = contains_money
+        self.image_hash = image_hash
+        self.phrase_counts = phrase_counts
+
+
+    @classmethod
+    def empty(cls):
+        """
+        Get the empty row written when a search has no results.
+
+        Returns:
+            NewsResult: A record with every column empty.
+        """
+        return cls('', '', '', '', '', '')
+
+
+    @classmethod
+    def from_dict(cls, row):
+        """
+        Create a record from a dictionary returned by run_search.
+
+        Args:
+            row (dict): The dictionary, with the keys of legacy_keys.
+
+        Returns:
+            NewsResult: The record.
+        """
+        result = cls(*[row.get(key) for key in cls.legacy_keys.values()])
+
+        phrase_counts = {key[len(cls.phrase_column):]: value for key, value in row.items()
+                         if key.startswith(cls.phrase_column) and key not in cls.legacy_keys.values()}
+        if phrase_counts:
+            result.phrase_counts = phrase_counts
+        return result
+
+
+    def values(self):
+        """
+        Get the values of the output columns, the image hash only when the images were post-processed,
+        and the count of each phrase only for a multi-phrase search.
+
+        Returns:
+            list: The row.
+        """
+        row = [self.title, self.date, self.description, self.picture_filename, self.search_count, self.contains_money]
+        if self.image_hash is not None:
+            row.append(self.image_hash)
+        if self.phrase_counts is not None:
+            row.extend(self.phrase_counts.values())
+        return row
+
+
+    def to_dict(self):
+        """
+        Convert the record to the dictionary returned by run_search.
+
+        Returns:
+            dict: The columns of the output mapped to their values.
+        """
+        row = {self.legacy_keys[name]: getattr(self, name) for name in self.__slots__ if name in self.legacy_keys}
+        if self.image_hash is None:
+            del row["Image hash"]
+        for phrase, count in (self.phrase_counts or {}).items():
+            row[self.phrase_column + phrase] = count
+        return row
+
+
+    def __eq__(self, other):
+        if not isinstance(other, NewsResult):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+
+    def __repr__(self):
+        return f"NewsResult({', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)})"
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Multi-phrase counting engine for the news titles and descriptions.
+
+Every phrase and alias is compiled once into a single pattern, and a page's
+worth of texts is scanned in one pass. The counts keep the semantics of
+NewsScraper.count_string_in_text: word boundaries, case insensitive and
+non-overlapping occurrences, counted independently for each phrase.
+"""
+
+import re
+
+from bisect import bisect_right
+
+
+class PhraseMatcher:
+    # Joins the texts of a page, it isn't a word character so the word boundaries are kept
+    separator = "\n\x00\n"
+
+    def __init__(self, phrases):
+        """
+        Initialize the PhraseMatcher class.
+
+        Args:
+            phrases (list or dict): The phrases to count, or a dictionary mapping each phrase
+                                    to a list of aliases counted together with it.
+        """
+        if not isinstance(phrases, dict):
+            phrases = {phrase: [] for phrase in phrases}
+
+        # Aliases differing only in case would be counted twice
+        self.aliases = {}
+        for phrase, aliases in phrases.items():
+            unique = {}
+            for alias in [phrase] + list(aliases):
+                unique.setdefault(alias.lower(), alias)
+            self.aliases[phrase] = list(unique.values())
+
+        self.phrases = list(self.aliases)
+
+        # One group per alias, a phrase and its aliases can share a text but are counted apart
+        self.terms = []
+        for phrase, aliases in self.aliases.items():
+            for alias in aliases:
+                if alias:
+                    self.terms.append((phrase, r'\b' + re.escape(alias) + r'\b'))
+
+        # The first lookahead skips, inside the regex engine, the positions where no term starts,
+        # the optional lookaheads then capture every term starting at the position
+        if self.terms:
+            candidates = '|'.join(term for phrase, term in self.terms)
+            captures = ''.join(f'(?:(?=({term}))|)' for phrase, term in self.terms)
+            self.pattern = re.compile(f'(?={candidates}){captures}', re.IGNORECASE)
+        else:
+            self.pattern = None
+
+
+    def count_many(self, texts):
+        """
+        Count every phrase in several texts with a single scan.
+
+        Args:
+            texts (list): The texts to search within, None is handled as an empty text.
+
+        Returns:
+            list: One dictionary per text mapping each phrase to its number of occurrences.
+        """
+        counts = [dict.fromkeys(self.phrases, 0) for text in texts]
+        if self.pattern is None or not texts:
+            return counts
+
+        texts = [text or '' for text in texts]
+        joined = self.separator.join(texts)
+
+        # Start offset of each text in the joined string
+        offsets = []
+        offset = 0
+        for text in texts:
+            offsets.append(offset)
+            offset += len(text) + len(self.separator)
+
+        # End of the last occurrence counted for each term, to skip overlapping occurrences
+        last_end = [-1] * len(self.terms)
+        for match in self.pattern.finditer(joined):
+            start = match.start()
+            index = None
+            for term_index, occurrence in enumerate(match.groups()):
+                if occurrence is None or start < last_end[term_index]:
+                    continue
+                last_end[term_index] = start + len(occurrence)
+                if index is None:
+                    index = bisect_right(offsets, start) - 1
+                counts[index][self.terms[term_index][0]] += 1
+
+        return counts
+
+
+    def count(self, text):
+        """
+        Count every phrase in a text.
+
+        Args:
+            text (str): The text to search within.
+
+        Returns:
+            dict: Each phrase mapped to its number of occurrences.
+        """
+        return self.count_many([text])[0]
+
+
+    def count_articles(self, articles):
+        """
+        Count every phrase in the title and description of several articles with a single scan.
+
+        Args:
+            articles (list): Dictionaries with the "title" and "description" of each article.
+
+        Returns:
+            list: One dictionary per article mapping each phrase to its occurrences in the title and description.
+        """
+        texts = []
+        for article in articles:
+            texts.append(article.get("title"))
+            texts.append(article.get("description"))
+
+        counts = self.count_many(texts)
+        return [{phrase: title_counts[phrase] + description_counts[phrase] for phrase in self.phrases}
+                for title_counts, description_counts in zip(counts[0::2], counts[1::2])]
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Stages of the streaming search pipeline.
+
+The pages are produced by generators of the scraper (NewsScraper.iter_site_pages,
+iter_site_tab_pages and iter_la_times_http_pages): the next page is only loaded
+when the previous one was analysed, and closing the generator at the start date
+stops the pagination. The analysed results go to the image downloads, bounded
+by ImageDownloader.max_pending, and to the output writer, which runs in its own
+thread behind a bounded queue. When a stage falls behind, the scraping waits for
+it, so the pages, the image downloads and the rows waiting to be written are
+bounded, whatever the number of pages.
+
+The writer is the sink of the rows: once queued, a row is only counted
+(NewsScraper.result_count), unless the caller asks to keep the rows
+(run_search keep_results). An article is indexed as soon as its image is saved,
+and the tracer keeps a bounded number of spans per stage. What stays for the
+whole search is the key of each article (NewsScraper.scraped_keys, to skip it in
+the next searches of a plan) and its picture name (image_names, to keep the
+names unique). With the image post-processing the rows wait for the processed
+images, so they are kept and written at the end.
+"""
+
+import queue
+import logging
+import threading
+
+
+class WriterStage:
+    # Put in the queue to stop the thread
+    stop = object()
+
+    def __init__(self, writer, max_pending=64, name="excel-writer"):
+        """
+        Initialize the WriterStage class and start its thread.
+
+        Args:
+            writer (StreamingExcelWriter): The writer, with an append(result) method.
+            max_pending (int): Maximum number of results waiting to be written, put blocks above it.
+            name (str): Name of the thread.
+        """
+        self.writer = writer
+        self.queue = queue.Queue(maxsize=max(1, int(max_pending)))
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name=name, daemon=True)
+        self.thread.start()
+
+
+    def put(self, result):
+        """
+        Send a result to the writer, waiting if the queue is full.
+
+        Args:
+            result (NewsResult): The result.
+
+        Raises:
+            Exception: The error of the writer, if a previous result couldn't be written.
+        """
+        if self.error is not None:
+            raise self.error
+        self.queue.put(result)
+
+
+    def run(self):
+        """
+        Write the results of the queue until the stop mark. After an error the rest are dropped.
+        """
+        while True:
+            result = self.queue.get()
+            if result is self.stop:
+                return
+
+            if self.error is None:
+                try:
+                    self.writer.append(result)
+                except Exception as e:
+                    logging.error(f"Failed to write a result: {e}")
+                    self.error = e
+
+
+    def close(self):
+        """
+        Wait until every result sent is written and stop the thread.
+
+        Raises:
+            Exception: The error of the writer, if a result couldn't be written.
+        """
+        if self.thread.is_alive():
+            self.queue.put(self.stop)
+            self.thread.join()
+
+        if self.error is not None:
+            raise self.error
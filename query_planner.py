@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Query planner for the work items with several phrases and categories.
+
+A work item can give lists in "search_phrase" and "news_category". The planner
+turns them into the fewest site searches: the phrases and categories are
+deduplicated (ignoring case and spaces), an empty category means all of them,
+and a site that ticks several categories in the same search (LA Times) gets one
+search per phrase with every category ticked, instead of one per pair. A site
+without a category filter gets one search per phrase.
+
+The searches of a plan share one output: an article found by several of them
+is analysed, downloaded and written once (the scraper skips the article keys it
+already has, see NewsScraper.process_page), and every row counts each phrase of
+the plan in its own column.
+"""
+
+import logging
+
+
+def as_list(value):
+    """
+    Get the phrases or categories of a work item as a list.
+
+    Args:
+        value (str or list): One value, a list of them, or None.
+
+    Returns:
+        list: The values, without the empty ones.
+    """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = [value]
+    return [str(item).strip() for item in value if item is not None and str(item).strip() != ""]
+
+
+def unique(values):
+    """
+    Remove the values repeated with another case or spacing, keeping the first spelling.
+
+    Args:
+        values (list): The values.
+
+    Returns:
+        list: The unique values, in their order.
+    """
+    seen = {}
+    for value in values:
+        seen.setdefault(" ".join(value.split()).lower(), value)
+    return list(seen.values())
+
+
+class SearchQuery:
+    def __init__(self, phrase, categories):
+        """
+        Initialize the SearchQuery class.
+
+        Args:
+            phrase (str): The phrase searched.
+            categories (list): The categories ticked together, empty for all.
+        """
+        self.phrase = phrase
+        self.categories = categories
+
+
+    @property
+    def category(self):
+        """
+        str: The categories of the query as one text, the key of the index and the journal. Empty for all.
+        """
+        return ", ".join(sorted(self.categories, key=str.lower))
+
+
+    @property
+    def news_category(self):
+        """
+        str or list: The category argument of the scraping: one category, a list of them, or empty for all.
+        """
+        if len(self.categories) == 1:
+            return self.categories[0]
+        return list(self.categories) if self.categories else ""
+
+
+    def __repr__(self):
+        return f"SearchQuery(phrase={self.phrase!r}, categories={self.categories!r})"
+
+
+class QueryPlan:
+    def __init__(self, phrases, queries):
+        """
+        Initialize the QueryPlan class.
+
+        Args:
+            phrases (list): Every phrase of the work item, each one counted in the rows.
+            queries (list): The SearchQuery of each site search.
+        """
+        self.phrases = phrases
+        self.queries = queries
+
+
+    @classmethod
+    def create(cls, search_phrase, news_category, category_filter="multiple"):
+        """
+        Plan the site searches of a work item.
+
+        Args:
+            search_phrase (str or list): One phrase or a list of them.
+            news_category (str or list): One category, a list of them, or empty for all.
+            category_filter (str): How the site filters the categories, see SiteAdapter.category_filter:
+                                   None for no filter, "single" for one category per search,
+                                   or "multiple" for several categories ticked in the same search.
+
+        Returns:
+            QueryPlan: The plan.
+
+        Raises:
+            ValueError: If there is no phrase.
+        """
+        phrases = unique(as_list(search_phrase))
+        if not phrases:
+            raise ValueError("No phrase to search")
+
+        # An empty category among others means every category, which already includes them
+        categories = unique(as_list(news_category))
+        if isinstance(news_category, list) and len(as_list(news_category)) < len(news_category):
+            categories = []
+
+        if categories and category_filter is None:
+            logging.warning(f"The site doesn't filter by category, ignoring {', '.join(categories)}")
+            categories = []
+
+        if category_filter == "single" and len(categories) > 1:
+            queries = [SearchQuery(phrase, [category]) for phrase in phrases for category in categories]
+        else:
+            queries = [SearchQuery(phrase, categories) for phrase in phrases]
+
+        logging.info(f"Planned {len(queries)} searches for {len(phrases)} phrases and {len(categories) or 'all'} categories")
+        return cls(phrases, queries)
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Network request blocking for the scraping browser.
+
+The scraping only reads the DOM, so images, media, fonts and the ad and
+analytics scripts of the site are dropped before they are requested, with the
+DevTools command Network.setBlockedURLs. Each site has a profile with the
+resource types and domains to deny and the domains always allowed, and the
+profile can be changed by the work item. The article image URLs are still read
+from the `src` attribute of the DOM, only their download by the browser is
+blocked.
+
+The blocked requests are counted from the performance log of Chrome. The
+requests never reach the network, so their size is unknown: the bytes saved are
+estimated from an average size per resource type, while the bytes actually
+received are measured.
+"""
+
+import json
+import logging
+
+from fnmatch import fnmatch
+from urllib.parse import urlsplit
+
+
+class RequestBlocker:
+    # URL patterns of each resource type that can be blocked
+    type_patterns = {
+        "image": ["*.jpg", "*.jpg?*", "*.jpeg", "*.jpeg?*", "*.png", "*.png?*", "*.gif", "*.gif?*",
+                  "*.webp", "*.webp?*", "*.avif", "*.avif?*", "*.svg", "*.svg?*", "*.ico", "*.ico?*"],
+        "media": ["*.mp4", "*.mp4?*", "*.webm", "*.webm?*", "*.m3u8", "*.m3u8?*", "*.ts?*", "*.mp3", "*.mp3?*"],
+        "font": ["*.woff", "*.woff?*", "*.woff2", "*.woff2?*", "*.ttf", "*.ttf?*", "*.otf", "*.otf?*", "*.eot", "*.eot?*"]
+    }
+
+    # Average transfer size of each resource type, used to estimate the bytes saved
+    average_sizes = {
+        "Image": 60 * 1024,
+        "Media": 500 * 1024,
+        "Font": 30 * 1024,
+        "Script": 40 * 1024,
+        "Stylesheet": 20 * 1024,
+        "XHR": 5 * 1024,
+        "Fetch": 5 * 1024,
+        "Other": 5 * 1024
+    }
+
+    # Blocking profile of each site, matched against the host of the page
+    profiles = {
+        "latimes.com": {
+            "block_types": ["image", "media", "font"],
+            "deny": [
+                "doubleclick.net", "googlesyndication.com", "googletagservices.com", "googletagmanager.com",
+                "google-analytics.com", "adservice.google.com", "amazon-adsystem.com", "adnxs.com",
+                "criteo.com", "criteo.net", "taboola.com", "outbrain.com", "scorecardresearch.com",
+                "chartbeat.com", "chartbeat.net", "quantserve.com", "moatads.com", "krxd.net",
+                "facebook.net", "connect.facebook.net", "twitter.com", "tiktok.com", "pinterest.com",
+                "newrelic.com", "nr-data.net", "hotjar.com", "optimizely.com", "brightcove.net",
+                "jwplayer.com", "jwpcdn.com", "rubiconproject.com", "pubmatic.com", "openx.net",
+                "casalemedia.com", "bidswitch.net", "teads.tv", "permutive.com", "permutive.app"
+            ],
+            "allow": []
+        }
+    }
+
+    # Profile of the sites without their own
+    default_profile = {"block_types": ["image", "media", "font"], "deny": [], "allow": []}
+
+    def __init__(self, site, settings=None):
+        """
+        Initialize the RequestBlocker class.
+
+        Args:
+            site (str): URL or host of the site scraped, used to pick its profile.
+            settings (dict): Changes to the profile: "block_types" replaces the resource types blocked,
+                             "deny" and "allow" add domains or URL patterns to the lists.
+        """
+        profile = self.get_profile(site)
+        settings = settings or {}
+
+        self.block_types = list(settings.get("block_types", profile["block_types"]))
+        self.deny = list(profile["deny"]) + list(settings.get("deny", []))
+        self.allow = list(profile["allow"]) + list(settings.get("allow", []))
+
+        self.blocked_requests = 0
+        self.blocked_by_type = {}
+        self.estimated_bytes_saved = 0
+        self.received_requests = 0
+        self.bytes_received = 0
+
+
+    def get_profile(self, site):
+        """
+        Get the blocking profile of a site.
+
+        Args:
+            site (str): URL or host of the site.
+
+        Returns:
+            dict: The profile, the default one if the site has none.
+        """
+        host = urlsplit(site).hostname if "://" in site else site
+        host = (host or "").lower()
+
+        for domain, profile in self.profiles.items():
+            if host == domain or host.endswith("." + domain):
+                return profile
+        return self.default_profile
+
+
+    def pattern(self, entry):
+        """
+        Get the URL pattern of a deny or allow entry: domains match any URL of the domain and its subdomains.
+
+        Args:
+            entry (str): A domain, or a URL pattern with "*".
+
+        Returns:
+            str: The URL pattern.
+        """
+        if "*" in entry:
+            return entry
+        return f"*{entry}/*"
+
+
+    def is_allowed(self, pattern):
+        """
+        Check if a blocking pattern is overridden by the allow list.
+        Network.setBlockedURLs has no exceptions, so an allowed domain removes the deny entries
+        of the domain and its subdomains, and an allowed pattern (as "*.svg") removes the same pattern.
+
+        Args:
+            pattern (str): The blocking pattern.
+
+        Returns:
+            bool: True if an allow entry matches the pattern.
+        """
+        return any(fnmatch(pattern, self.pattern(entry)) for entry in self.allow)
+
+
+    def blocked_patterns(self):
+        """
+        Get the URL patterns blocked, for Network.setBlockedURLs.
+
+        Returns:
+            list: The URL patterns.
+        """
+        patterns = []
+        for block_type in self.block_types:
+            patterns.extend(self.type_patterns.get(block_type, []))
+        patterns.extend(self.pattern(entry) for entry in self.deny)
+
+        return [pattern for pattern in dict.fromkeys(patterns) if not self.is_allowed(pattern)]
+
+
+    def is_blocked(self, url):
+        """
+        Check if a URL is blocked.
+
+        Args:
+            url (str): The URL.
+
+        Returns:
+            bool: True if the URL matches a blocked pattern.
+        """
+        return any(fnmatch(url, pattern) for pattern in self.blocked_patterns())
+
+
+    def apply(self, driver):
+        """
+        Block the requests in a Chrome browser.
+
+        Args:
+            driver (selenium.webdriver.Chrome): The driver of the browser.
+        """
+        patterns = self.blocked_patterns()
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        logging.info(f"Blocking {len(patterns)} URL patterns")
+
+
+    def record_events(self, entries):
+        """
+        Count the blocked and received requests from entries of the Chrome performance log.
+
+        Args:
+            entries (list): The log entries, each with the DevTools event as a JSON "message".
+        """
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+
+            params = message.get("params", {})
+            if message.get("method") == "Network.loadingFailed" and params.get("blockedReason") == "inspector":
+                resource_type = params.get("type", "Other")
+                self.blocked_requests += 1
+                self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+                self.estimated_bytes_saved += self.average_sizes.get(resource_type, self.average_sizes["Other"])
+
+            elif message.get("method") == "Network.loadingFinished":
+                self.received_requests += 1
+                self.bytes_received += int(params.get("encodedDataLength", 0))
+
+
+    def collect(self, driver):
+        """
+        Read the new entries of the Chrome performance log and count them.
+
+        Args:
+            driver (selenium.webdriver.Chrome): The driver of the browser, with the performance log enabled.
+        """
+        try:
+            self.record_events(driver.get_log("performance"))
+        except Exception as e:
+            logging.warning(f"Couldn't read the performance log: {e}")
+
+
+    def report(self):
+        """
+        Get the counters of the blocking.
+
+        Returns:
+            dict: The blocked requests, in total and by resource type, the estimated bytes saved,
+                  and the requests and bytes actually received.
+        """
+        return {
+            "blocked_requests": self.blocked_requests,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "estimated_bytes_saved": self.estimated_bytes_saved,
+            "received_requests": self.received_requests,
+            "bytes_received": self.bytes_received
+        }
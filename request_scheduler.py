@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+Request scheduling shared by the image downloads, the HTTP search and the browser navigations.
+
+Each host gets a token bucket, so the requests to it never go faster than its
+rate, and a circuit breaker, so a host that keeps failing is left alone for a
+while instead of being hammered. The transient errors (429, 5xx, connection
+errors and timeouts) are retried with a jittered exponential backoff, and a 429
+also halves the rate of the host, which then grows back with each success: the
+scraping settles at the highest rate the site tolerates.
+
+One scheduler is shared by every scraper of the process (RequestScheduler.shared),
+so the concurrent searches of a batch respect the same limits.
+"""
+
+import time
+import random
+import logging
+import threading
+
+from urllib.parse import urlsplit
+
+
+# Status codes worth retrying: throttled, or a server error that may go away
+retry_statuses = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of sending a request to a host whose circuit is open.
+    """
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        """
+        Initialize the TokenBucket class, full.
+
+        Args:
+            rate (float): Tokens added per second, the maximum rate.
+            burst (int): Maximum number of tokens, the requests that can go at once.
+        """
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+
+    def acquire(self):
+        """
+        Take a token, waiting until there is one.
+
+        Returns:
+            float: Seconds waited.
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+            waited += wait
+
+
+    def throttle(self):
+        """
+        Halve the rate, down to 1/32 of the maximum, after the host asked to slow down.
+        """
+        with self.lock:
+            self.rate = max(self.max_rate / 32, self.rate / 2)
+
+
+    def recover(self):
+        """
+        Grow the rate back towards the maximum after a success.
+        """
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 16)
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        """
+        Initialize the CircuitBreaker class, closed.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit.
+            reset_timeout (float): Seconds the circuit stays open before a trial request is let through.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+        self.lock = threading.Lock()
+
+
+    @property
+    def state(self):
+        """
+        str: "closed", "open", or "half-open" when the reset timeout passed.
+        """
+        with self.lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return "open"
+            return "half-open"
+
+
+    def allow(self):
+        """
+        Check if a request can be sent. When half-open, only one trial request goes at a time.
+
+        Returns:
+            bool: True if the request can be sent.
+        """
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self.trial:
+                return False
+            self.trial = True
+            return True
+
+
+    def success(self):
+        """
+        Close the circuit after a successful request.
+        """
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial = False
+
+
+    def failure(self):
+        """
+        Count a failed request, opening the circuit at the threshold or when a trial fails.
+
+        Returns:
+            bool: True if the circuit was opened by this failure.
+        """
+        with self.lock:
+            self.failures += 1
+            if self.trial or (self.opened_at is None and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                self.trial = False
+                return True
+            return False
+
+
+class RequestScheduler:
+    # Scheduler shared by the scrapers of the process, created on first use
+    shared_instance = None
+    shared_lock = threading.Lock()
+
+    def __init__(self, rate=10, burst=10, retries=4, backoff=0.5, max_backoff=30, failure_threshold=5, reset_timeout=30):
+        """
+        Initialize the RequestScheduler class.
+
+        Args:
+            rate (float): Maximum requests per second to each host.
+            burst (int): Requests to a host that can go at once.
+            retries (int): Retries of a request after a transient error.
+            backoff (float): Base of the exponential backoff in seconds.
+            max_backoff (float): Maximum wait between two attempts in seconds.
+            failure_threshold (int): Consecutive failures of a host that open its circuit.
+            reset_timeout (float): Seconds a host is left alone once its circuit is open.
+        """
+        self.buckets = {}
+        self.breakers = {}
+        self.lock = threading.Lock()
+        self.configure(rate=rate, burst=burst, retries=retries, backoff=backoff, max_backoff=max_backoff,
+                       failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+
+        # Counters for the logs and the tests
+        self.retried = 0
+        self.throttled = 0
+
+
+    @classmethod
+    def shared(cls):
+        """
+        Get the scheduler shared by the scrapers of the process.
+
+        Returns:
+            RequestScheduler: The scheduler.
+        """
+        with cls.shared_lock:
+            if cls.shared_instance is None:
+                cls.shared_instance = cls()
+            return cls.shared_instance
+
+
+    def configure(self, **settings):
+        """
+        Change the settings. The buckets and breakers of the hosts start again with the new limits.
+
+        Args:
+            **settings: The arguments of RequestScheduler.
+
+        Raises:
+            ValueError: If a setting doesn't exist.
+        """
+        names = {"rate", "burst", "retries", "backoff", "max_backoff", "failure_threshold", "reset_timeout"}
+        unknown = set(settings) - names
+        if unknown:
+            raise ValueError(f"Unknown request scheduler settings: {', '.join(sorted(unknown))}")
+        with self.lock:
+            for name, value in settings.items():
+                setattr(self, name, value)
+            self.buckets.clear()
+            self.breakers.clear()
+
+
+    def host(self, url):
+        """
+        Get the host of a URL, the unit of the limits.
+
+        Args:
+            url (str): The URL.
+
+        Returns:
+            str: The host, with its port.
+        """
+        return urlsplit(url).netloc.lower()
+
+
+    def limits(self, url):
+        """
+        Get the token bucket and the circuit breaker of the host of a URL, creating them on first use.
+
+        Args:
+            url (str): The URL.
+
+        Returns:
+            tuple: The TokenBucket and the CircuitBreaker.
+        """
+        host = self.host(url)
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate, self.burst)
+                self.breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self.buckets[host], self.breakers[host]
+
+
+    def status_code(self, error):
+        """
+        Get the HTTP status of an error, if it comes from a response.
+
+        Args:
+            error (Exception): The error.
+
+        Returns:
+            int: The status code, or None.
+        """
+        response = getattr(error, "response", None)
+        return getattr(response, "status_code", None)
+
+
+    def is_retryable(self, error):
+        """
+        Check if an error is transient: a retryable status, a connection error or a timeout.
+
+        Args:
+            error (Exception): The error.
+
+        Returns:
+            bool: True if the request can be tried again.
+        """
+        status = self.status_code(error)
+        if status is not None:
+            return status in retry_statuses
+
+        # requests and Selenium errors, matched by name so neither has to be imported here
+        names = {cls.__name__ for cls in type(error).__mro__}
+        return bool(names & {"ConnectionError", "Timeout", "TimeoutException", "TimeoutError"})
+
+
+    def delay(self, attempt, error):
+        """
+        Get the wait before the next attempt: a random part of the exponential backoff ("full jitter"),
+        or the Retry-After asked by the server if it is longer.
+
+        Args:
+            attempt (int): Number of the attempt that failed, from 0.
+            error (Exception): The error of the attempt.
+
+        Returns:
+            float: Seconds to wait.
+        """
+        wait = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+        response = getattr(error, "response", None)
+        retry_after = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                wait = max(wait, min(self.max_backoff, float(retry_after)))
+            except ValueError:
+                pass
+        return wait
+
+
+    def call(self, url, request):
+        """
+        Send a request to the host of a URL within its limits, retrying the transient errors.
+
+        Args:
+            url (str): The URL requested, for its host.
+            request (callable): Sends the request, raising on failure (raise_for_status for a response).
+
+        Returns:
+            object: The return value of the request.
+
+        Raises:
+            CircuitOpenError: If the host is left alone after too many failures.
+            Exception: The error of the last attempt, or of the first one if it isn't transient.
+        """
+        bucket, breaker = self.limits(url)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(f"Too many failures from {self.host(url)}, not requesting {url}")
+
+            bucket.acquire()
+            try:
+                result = request()
+            except Exception as e:
+                if not self.is_retryable(e):
+                    breaker.success()
+                    raise
+
+                # A throttled host is alive: it only gets fewer requests, and a trial request that was throttled
+                # closes its circuit instead of leaving it half-open. The other errors count for its circuit
+                if self.status_code(e) == 429:
+                    breaker.success()
+                    bucket.throttle()
+                    self.throttled += 1
+                    logging.warning(f"Throttled by {self.host(url)}, slowing down to {bucket.rate:.2f} requests/s")
+                elif breaker.failure():
+                    logging.error(f"Opened the circuit of {self.host(url)} for {breaker.reset_timeout}s")
+                if attempt >= self.retries or breaker.state == "open":
+                    raise
+
+                wait = self.delay(attempt, e)
+                logging.info(f"Retrying {url} in {wait:.2f}s after: {e}")
+                self.retried += 1
+                attempt += 1
+                time.sleep(wait)
+                continue
+
+            breaker.success()
+            bucket.recover()
+            return result
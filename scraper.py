@@ -1,602 +1,1953 @@
-# -*- coding: utf-8 -*-
-"""
-Created on Mon Jul 22 14:25:46 2024
-
-@author: JoaoMurdiga
-"""
-
-
-import re
-import os
-import time
-import json
-import random
-import urllib
-import logging
-
-from datetime import datetime
-from dateutil.relativedelta import relativedelta
-
-from RPA.Excel.Files import Files
-from RPA.Browser.Selenium import Selenium
-from RPA.Robocorp.WorkItems import WorkItems
-
-
-class SeleniumError(Exception):
-    """
-    Custom exception for Selenium-related errors.
-    """
-    def __init__(self, message):
-        self.message = message
-        super().__init__(self.message)
-        
-        
-class NewsScraper:
-    def __init__(self):
-        """
-        Initialize the NewsScraper class.
-        """
-        
-        # Initialize instances
-        self.browser = Selenium()
-        self.excel = Files()
-        self.work_items = WorkItems()
-        
-        logging.info("Instances initialized")
-        
-        # Output folder
-        self.output_path = './output/'
-        
-        # Define accepted image formats and date formats
-        self.images_formats = ["*.jpg", "*.jpeg", "*.webp", "*.png", "*.gif", "*.bmp", "*.tiff", "*.tif", "*.svg", "*.heic", "*.heif"]
-        self.date_formats = ["%d/%m/%Y", "%d.%m.%Y", "%m/%d/%Y", "%Y-%m-%d", "%d-%m-%Y", "%B %d, %Y", "%b %d, %Y", "%d %B %Y", "%d %b %Y", "%Y/%m/%d", "%Y.%m.%d", "%Y %b %d", "%Y %B %d", "%A, %d %B %Y", "%a, %d %b %Y", "%A, %B %d, %Y", "%a, %b %d, %Y", "%d/%m/%y", "%m/%d/%y", "%y-%m-%d", "%d-%m-%y", "%Y.%m.%d %H:%M:%S", "%d.%m.%Y %H:%M", "%d/%m/%Y %H:%M", "%m-%d-%Y %H:%M", "%d %B %Y %H:%M", "%d %b %Y %H:%M", "%Y/%m/%d %H:%M:%S", "%Y %b %d %H:%M", "%d-%m-%Y %H:%M:%S", "%A, %d %B %Y %H:%M", "%a, %d %b %Y %H:%M", "%b. %d, %Y", "%b %d, %Y"]
-
-
-
-    def load_config(self, config_file):
-        """
-        Load and parse the JSON configuration file.
-
-        Args:
-            config_file (str): Path to the configuration file.
-
-        Returns:
-            dict: Parsed configuration.
-
-        Raises:
-            FileNotFoundError: If the config file is not found.
-            json.JSONDecodeError: If there is an error decoding the JSON.
-        """
-        try:
-            with open(config_file, 'r') as file:
-                config = json.load(file)
-            return config
-        except FileNotFoundError:
-            logging.error("Config file not found: %s", config_file)
-            raise
-        except json.JSONDecodeError as e:
-            logging.error("Error decoding JSON from file: %s", e)
-            raise
-
-
-    def get_workitem(self):
-        """
-        Load the input work item containing search parameters.
-
-        Returns:
-            tuple: Contains the search phrase, news category, and number of months.
-        """
-        logging.info("Loading work item")
-        input_data = self.work_items.get_input_work_item()
-        logging.info("Work Items Loaded Successfully")
-        
-        try:
-            return (input_data.payload["search_phrase"], 
-                    input_data.payload["months"], 
-                    input_data.payload["news_category"])
-        except KeyError:
-            logging.error("Error retrieving parameters from Cloud Robocorp. Configure the Payload in Cloud Robocorp.")
-            logging.error("Go to Unattendend -> Processes -> [PROCESS NAME] -> Configure -> Advanced Settings -> Start Process with input data -> Payload")
-
-            raise
-            
-
-    def open_browser(self, url):
-        """
-        Open a browser and navigate to the specified URL.
-        
-        Args:
-            url (str): The URL to open.
-        
-        Raises:
-            Exception: If there is an error opening the browser.
-        """
-        try:
-            self.browser.open_available_browser(url)
-            logging.info(f"Opened browser with URL: {url}")
-        except Exception as e:
-            logging.error(f"Failed to open browser with URL {url}: {e}")
-            raise
-
-
-    def open_browser_avoiding_robot_detection(self, url):
-        """
-        Open a browser and navigate to the specified URL while avoiding robot detection.
-
-        Args:
-            url (str): The URL to open.
-
-        Raises:
-            Exception: If there is an error opening the browser.
-        """
-        try:
-            options = {
-                "arguments": [
-                    "--disable-blink-features=AutomationControlled", 
-                    "--no-sandbox",
-                    "--disable-dev-shm-usage"
-                ]
-            }
-            user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            self.browser.open_available_browser(url, options=options)
-            
-            # Add a random  delay to mimic human behavior
-            self.browser.set_browser_implicit_wait(random.uniform(1, 2))
-            self.browser.execute_javascript(f"Object.defineProperty(navigator, 'webdriver', {{get: () => undefined}})")
-            self.browser.execute_javascript(f"navigator.__defineGetter__('userAgent', () => '{user_agent}')")
-            logging.info(f"Opened browser with URL: {url}")
-            
-        except Exception as e:
-            logging.error(f"Failed to open browser with URL {url}: {e}")
-            raise
-
-                
-    def count_string_in_text(self, text, search_string):
-        """
-        Count the number of occurrences of a specific string in a given text.
-
-        Args:
-            text (str): The text to search within.
-            search_string (str): The string to count.
-
-        Returns:
-            int: The number of occurrences of the search string in the text.
-        """
-        # Compile a regular expression pattern with word boundaries and case insensitivity
-        pattern = re.compile(r'\b' + re.escape(search_string) + r'\b', re.IGNORECASE)
-        
-        # Find all matches and return the count
-        matches = pattern.findall(text)
-        
-        return len(matches)
-
-
-    def make_valid_filename(self, filename):
-        """
-        Convert a given filename into a valid filename by replacing invalid characters.
-
-        Args:
-            filename (str): The original filename.
-
-        Returns:
-            str: The valid filename with invalid characters replaced by underscores.
-        """
-        return re.sub(r'[<>:"/\\|?*]', '_', filename)
-
-
-    def has_money_in_text(self, text):
-        """
-        Check if the given text contains any money-related strings.
-        
-        Args:
-            text (str): The text to search within.
-        
-        Returns:
-            bool: True if the text contains money-related strings, otherwise False.
-        """
-        # Define regular expression patterns for different money formats
-        patterns = [
-            # $11.1 or $111,111.11 -> '$' + '1-3 digits' + ',' + '1-3 digits' + '.' + '1-2 digits'
-            re.compile(r'\$\d{1,3}(,\d{3})*(\.\d{1,2})?', re.IGNORECASE),
-            # 11 dollars
-            re.compile(r'\d+ dollars', re.IGNORECASE),
-            # 11 USD
-            re.compile(r'\d+ USD', re.IGNORECASE)
-        ]
-        
-        # Check if any pattern matches
-        for pattern in patterns:
-            if pattern.search(text):
-                return True
-        
-        return False
-
-
-    def add_extension(self, filename):
-        """
-        Add the .jpg extension to a filename if it doesn't already have a common image extension.
-        As I saw, it is usually .JPG files in LA Times, but sometimes the URL doesn't show it.
-        
-        Args:
-            filename (str): The original filename.
-        
-        Returns:
-            str: The filename with the .jpg extension added if necessary.
-        """
-        
-        # Check if the filename has a valid image extension using a regular expression, add if it is needed
-        if not re.search(r'\.(?:jpg|jpeg|png|gif|webp|bmp|svg)$', filename, re.IGNORECASE):
-            return f'{filename}.jpg'
-        
-        return filename
-
-
-    def fix_date(self, date):
-        """
-        Fix common issues with date formats, including replacing "Sept" with "Sep" and converting relative times to the current date.
-        
-        Args:
-            date (str): The original date string.
-        
-        Returns:
-            str: The fixed date string.
-        """
-        # Replace 'Sept' with 'Sep' to standardize the month abbreviation
-        date = date.replace('Sept', 'Sep')
-        
-        # Convert relative times like "X minutes ago" or "X hour ago" to the current date
-        if ('minutes' in date or 'hour' in date):
-            date = datetime.now().strftime('%Y-%m-%d')
-            
-        return date
-
-
-    def parse_date(self, date_str):
-        """
-        Parse the date string using multiple formats.
-
-        Args:
-            date_str (str): The date string to parse.
-
-        Returns:
-            datetime: The parsed date.
-        """
-        
-        date = None
-        for date_format in self.date_formats:
-            try:
-                date = datetime.strptime(date_str, date_format)
-            except ValueError:
-                continue
-        if (date == None):
-            logging.warning(f"Unable to parse date: {date_str}")
-            date = datetime(1, 1, 1)
-    
-        else:
-            date_str = date.strftime('%Y-%m-%d')
-            logging.info(f"Parsed date: {date_str}")
-    
-        return date
-
-    
-    def open_la_times_and_search(self, search_phrase):
-        self.open_browser_avoiding_robot_detection(f"https://www.latimes.com/")
-        self.browser.maximize_browser_window()
-        logging.info(f"Performing the search for {search_phrase}")
-
-        # Wait to load the search button and click it
-        try:
-            self.browser.wait_until_element_is_visible("//button[@data-element='search-button']", timeout=60)
-            self.browser.click_element_when_visible("//button[@data-element='search-button']")
-        except AssertionError:
-            logging.error("Could't find Search Button after 60 seconds")
-            raise SeleniumError("Search Button not found")
-            
-        try:
-            self.browser.wait_until_element_is_visible("//input[@data-element='search-form-input']", timeout=60)
-            self.browser.input_text_when_element_is_visible("//input[@data-element='search-form-input']", search_phrase)
-        except AssertionError:
-            logging.error("Could't find Search Input after 60 seconds")
-            raise SeleniumError("Search Input not found")
-            
-        try:
-            self.browser.click_element_when_visible('//button[@data-element="search-submit-button"]')
-        except AssertionError:
-            logging.error("Could't submit the Search Form")
-            raise SeleniumError("Search Form submission failed")
-            
-        logging.info(f"Search for {search_phrase} complete")
-
-
-    def filter_la_times(self, news_category):
-        
-        if not(news_category == "" or news_category == None):
-            logging.info(f"Selecting category: {news_category}")
-            
-            # Expand to see all topics
-            try:
-                self.browser.wait_until_element_is_visible('//span[@class="see-all-text"]', timeout=60)
-                self.browser.click_element_when_visible('//span[@class="see-all-text"]')
-            except AssertionError:
-                logging.error("Could't find categories for this search")
-                raise SeleniumError("Search categories failed")
-            
-            try:
-                categories_xpath = "//ul[@class='search-filter-menu']/li"
-                categories = self.browser.find_elements(categories_xpath + "//label/span")
-                
-                found_category = False
-                for index, category in enumerate(categories):
-                    # Check for a flag to avoid error when the category was already checked
-                    if not(found_category):
-                        if category.text.lower().strip() == news_category.lower().strip():
-                            logging.info(f"Found category: {category}")
-                            i = index + 1
-                            self.browser.click_element_when_visible(f'{categories_xpath}[{i}]//label//input[@type="checkbox"]')
-                            found_category = True
-
-            except AssertionError:
-                logging.error("Could't find this category for this search")
-                raise SeleniumError("Category doesn't exists")  
-                
-        else:
-            logging.info(f"No news category to select")
-            
-            
-            
-    def order_la_times(self):
-        try:
-            self.browser.wait_until_element_is_visible('//div[@class="search-results-module-no-results"]', timeout=10)
-            logging.error("There is no results for the search")
-            raise SeleniumError("No news available")
-        except:
-            pass
-        
-        try:
-            self.browser.wait_until_element_is_visible('//select[@class="select-input"]', timeout=60)
-            select_element = self.browser.find_elements("//select[@class='select-input']")
-        except AssertionError:
-            logging.error("Could't find the order selection box")
-            raise SeleniumError("Order failed")
-            
-        try:
-            self.browser.select_from_list_by_label(select_element, "Newest")
-        except AssertionError:
-            logging.error("Impossible to filter by the Newest")
-            raise SeleniumError("Order failed")
-            
-        # When it changes the sorter, it will remove the page content and load again,
-        # wait a little for the page to load
-        time.sleep(5)
-
-
-    def scrape_news_la_times(self, search_phrase, months):
-        """
-        Scrape news articles from the LA Times website.
-        
-        Returns:
-            list: A list of dictionaries containing scraped news article data.
-        """
-        
-        results = []
-        try:
-            if (months == "" or months == 0):
-                start_date = datetime(1, 1, 1)
-            else:
-                start_date = datetime.now() - relativedelta(months=int(months))
-            
-            start_str = start_date.strftime('%Y-%m-%d')
-            logging.info(f"Limit for the news: {start_str}")
-            
-            # Flag to indicate whether the start date has been reached
-            reach_start_date = False 
-            
-            # A counter to help in the logging, it will tell me if there are no results for the search,
-            # or it reached the last news without reaching the start_date, or it reached page 10 (limit for LATimes)
-            count_pages = 1
-            
-            while not reach_start_date:
-                # XPath to locate articles on the page
-                articles_xpath = "//ul[@class='search-results-module-results-menu']/li"
-                articles = self.browser.find_elements(articles_xpath)
-                
-                
-                # Wait to load the first news
-                try:
-                    self.browser.wait_until_element_is_visible(f"{articles_xpath}[1]//h3[@class='promo-title']/a", timeout=60)
-                except AssertionError:
-                    logging.error("Could't load the news after 60 seconds")
-                    raise SeleniumError("News didn't load")                
-                
-                for index, article in enumerate(articles):
-                    try:
-                        i = index + 1
-                        
-                        # Locate elements for title, description, date, and image within each article
-                        title_element = self.browser.find_element(f"{articles_xpath}[{i}]//h3[@class='promo-title']/a")
-                        description_element = self.browser.find_element(f"{articles_xpath}[{i}]//p[@class='promo-description']")
-                        date_element = self.browser.find_element(f"{articles_xpath}[{i}]//p[@class='promo-timestamp']")
-                        image_element = self.browser.find_element(f"{articles_xpath}[{i}]//div[@class='promo-media']//img[@class='image']") 
-                        
-                        # Extract text from the located elements
-                        title = self.browser.get_text(title_element)
-                        description = self.browser.get_text(description_element)
-                        
-                        # Fix the date format, parse it and format as string
-                        date = self.browser.get_text(date_element)
-                        date = self.fix_date(date)
-                        date = self.parse_date(date)
-                        date_str = date.strftime('%Y-%m-%d')
-                        
-                        # Get the URL of the image from the 'src' attribute
-                        image_url = self.browser.get_element_attribute(image_element, 'src')
-                        
-                        # Extract the image name from the URL and make it a valid filename
-                        image_name = self.make_valid_filename(image_url.split('%2F')[-1])
-                        image_name = self.add_extension(image_name)
-                        
-                        # Count of search phrases in the title and description
-                        count_in_title = self.count_string_in_text(title, search_phrase)
-                        count_in_description = self.count_string_in_text(description, search_phrase)
-                        total_count = count_in_title + count_in_description
-                        
-                        # Check if the title or description contains any money-related terms
-                        money_in_title = self.has_money_in_text(title)
-                        money_in_description = self.has_money_in_text(description)
-                        money_in_text = money_in_title or money_in_description
-                        
-                        # If the article date is after the start date, add it to the results
-                        if date > start_date:
-                            
-                            # Download the image and save it in the path
-                            image_filepath = self.output_path + image_name
-                            urllib.request.urlretrieve(image_url, image_filepath)
-                            
-                            # Append the results
-                            results.append({
-                                "Title": title,
-                                "Date": date_str,
-                                "Description": description,
-                                "Picture filename": image_name,
-                                "Count of search phrases in the title and description": total_count,
-                                "Title or description contains any amount of money": money_in_text
-                            })
-                            logging.info(f"Scraped {title}")
-                        else:
-                            reach_start_date = True
-                            logging.info(f"{title} is out of range, not scraped")
-                    
-                    except Exception as e:
-                        logging.error(f"Failed to process article at index {index + 1}: {e}")
-                        continue
-                try:
-                    # Interact with the button to change the page
-                    # It would be easier to just change the URL, but for an RPA test, I choose to interact with the button 
-                    self.browser.find_element("//div[@class='search-results-module-next-page']/a").click()                
-                    count_pages += 1
-                except:
-                    logging.error(f"Can't load more news, reached page {count_pages}")
-                    return results
-            
-            
-            logging.info("Scraped all news articles that matches the constraints")
-            return results
-        except Exception as e:
-            logging.error(f"Failed to scrape news articles: {e}")
-            return results
-
-
-    def save_news_data_to_excel(self, results):
-        """
-        Save the scraped news data to an Excel file.
-        
-        Args:
-            results (list): A list of dictionaries containing scraped news data.
-        """
-        
-        logging.info("Saving data to Excel")
-        
-        # Define the output file path
-        output_file = os.path.join("output/", "News.xlsx")
-        
-        # Create a new workbook
-        self.excel.create_workbook(output_file)
-        
-        # Define and append the header for the Excel sheet
-        header = ["Title", "Date", "Description", "Picture filename", "Count of search", "Contains money"]
-        self.excel.append_rows_to_worksheet([header], header=False)
-        
-        # Append each result to the worksheet
-        for result in results:
-            self.excel.append_rows_to_worksheet([result], header=False)
-            
-        # Save and close the workbook
-        self.excel.save_workbook()
-        self.excel.close_workbook()
-
-
-    def close_browser(self):
-        """
-        Close the browser instance.
-        """
-        try:
-            self.browser.close_browser()
-            logging.info("Browser closed")
-        except Exception as e:
-            logging.error(f"Failed to close browser: {e}")
-            raise
-
-
-def scrape_news(Workitens = None):
-    """
-    Main function to scrape news articles based on a search term and configuration.
-
-    Args:
-
-    Returns:
-        list: A list of dictionaries containing scraped news article data.
-    """
-        
-    # Initialize the NewsScraper with the provided configuration
-    logging.debug("Init NewsScraper")
-    scraper = NewsScraper()
-    results = []
-    
-    try:
-        # Get all the variables: from the WorkItems, or from parameters
-        logging.debug("Getting workitens")
-        if Workitens == None:
-            search_phrase, months, news_category = scraper.get_workitem() 
-        else:
-            search_phrase, months, news_category = Workitens 
-            
-        # Open, filter and order LA Times
-        logging.info("Opening LA Times")
-        scraper.open_la_times_and_search(search_phrase)
-        
-        logging.info("Filtering categories in LA Times")
-        scraper.filter_la_times(news_category)
-        
-        logging.info("Ordering news in LA Times")
-        scraper.order_la_times()
-        
-        # Scrape news articles from the LA Times
-        results = scraper.scrape_news_la_times(search_phrase, months)
-        
-        # If there are no results, create an Excel file with only the header
-        if len(results) == 0: 
-            results.append({
-                "Title": '',
-                "Date": '',
-                "Description": '',
-                "Picture filename": '',
-                "Count of search phrases in the title and description": '',
-                "Title or description contains any amount of money": ''
-            })
-            
-        # Save the scraped news data to an Excel file
-        logging.debug("Saving Excel")
-        scraper.save_news_data_to_excel(results)
-        
-    except SeleniumError as e:
-        logging.error(f"Search operation failed: {e.message}")
-        
-    finally:
-        # Ensure the browser is closed even if an error occurs
-        scraper.close_browser()
-        
-    # Return the results of the scraping process
-    return results
-
-
-if __name__ == "__main__":
-    
-    log_path = './output/rpa_news_scraper.log'
-    
-    logging.basicConfig(
-        filename = log_path,
-        level = logging.INFO,
-        format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
-    scrape_news(['amazon', 1, 'Climate & Environment'])
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Jul 22 14:25:46 2024
+
+@author: JoaoMurdiga
+"""
+
+
+import re
+import os
+import json
+import shutil
+import hashlib
+import logging
+
+from datetime import datetime
+
+from article_index import ArticleIndex
+from browser_profile import BrowserProfile
+from date_parser import DateParser
+from downloader import ImageDownloader
+from image_cache import ImageCache
+from image_processing import ImagePostProcessor
+from news_result import NewsResult
+from pipeline import WriterStage
+from query_planner import QueryPlan, as_list
+from checkpoint import CheckpointJournal
+from excel_writer import StreamingExcelWriter
+from la_times_http import LATimesSearchClient, CategoryNotFoundError
+from phrase_matcher import PhraseMatcher
+from request_blocker import RequestBlocker
+from request_scheduler import RequestScheduler
+from site_adapters import LATimesAdapter, get_site_adapter
+from tracing import Tracer
+from waits import PageWaiter, WaitTimeout
+
+
+class SeleniumError(Exception):
+    """
+    Custom exception for Selenium-related errors.
+    """
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+        
+        
+class NewsScraper:
+    # Excel header, the output folder and file are set for each search by reset_search
+    excel_header = ["Title", "Date", "Description", "Picture filename", "Count of search", "Contains money"]
+    
+    def __init__(self, download_workers=8):
+        """
+        Initialize the NewsScraper class.
+
+        Args:
+            download_workers (int): Maximum number of images downloaded concurrently.
+        """
+        
+        # Initialize instances, the RPA libraries are imported and created on first use (see the properties below),
+        # so the HTTP engine, the tests and the benchmarks don't load Selenium, the Excel library or the work items
+        self.browser_library = None
+        self.excel_library = None
+        self.work_items_library = None
+        self.page_waiter = None
+        self.downloader = ImageDownloader(max_workers=download_workers)
+        self.search_client = LATimesSearchClient()
+        
+        # Rate limits, retries and circuit breakers per host, shared by the scrapers of the process
+        self.scheduler = RequestScheduler.shared()
+        self.downloader.scheduler = self.scheduler
+        self.search_client.scheduler = self.scheduler
+        
+        logging.info("Instances initialized")
+        
+        # Payload of the input work item, filled by get_workitem
+        self.payload = {}
+        
+        # Whether the browser is open, a warm browser is reused by the next search
+        self.browser_open = False
+        self.la_times_url = "https://www.latimes.com/"
+        
+        # Adapter of the site searched, set for each search by run_search
+        self.site_adapter = LATimesAdapter()
+        
+        # Headless browser with a prewarmed profile, applied at the next launch, the work item can change it
+        self.browser_profile = BrowserProfile()
+        
+        # Images, media, fonts and ads aren't loaded by the browser, the work item can change or disable it
+        self.request_blocker = RequestBlocker(self.la_times_url)
+        
+        # XPaths of the search results page
+        self.articles_xpath = "//ul[@class='search-results-module-results-menu']/li"
+        self.first_title_xpath = f"{self.articles_xpath}[1]//h3[@class='promo-title']/a"
+        self.no_results_xpath = '//div[@class="search-results-module-no-results"]'
+        
+        # Phrase matchers compiled for this run, by phrases
+        self.phrase_matchers = {}
+        
+        # State of the current search
+        self.reset_search()
+        
+        # Define accepted image formats and date formats
+        self.images_formats = ["*.jpg", "*.jpeg", "*.webp", "*.png", "*.gif", "*.bmp", "*.tiff", "*.tif", "*.svg", "*.heic", "*.heif"]
+        self.date_formats = ["%d/%m/%Y", "%d.%m.%Y", "%m/%d/%Y", "%Y-%m-%d", "%d-%m-%Y", "%B %d, %Y", "%b %d, %Y", "%d %B %Y", "%d %b %Y", "%Y/%m/%d", "%Y.%m.%d", "%Y %b %d", "%Y %B %d", "%A, %d %B %Y", "%a, %d %b %Y", "%A, %B %d, %Y", "%a, %b %d, %Y", "%d/%m/%y", "%m/%d/%y", "%y-%m-%d", "%d-%m-%y", "%Y.%m.%d %H:%M:%S", "%d.%m.%Y %H:%M", "%d/%m/%Y %H:%M", "%m-%d-%Y %H:%M", "%d %B %Y %H:%M", "%d %b %Y %H:%M", "%Y/%m/%d %H:%M:%S", "%Y %b %d %H:%M", "%d-%m-%Y %H:%M:%S", "%A, %d %B %Y %H:%M", "%a, %d %b %Y %H:%M", "%b. %d, %Y", "%b %d, %Y"]
+        self.date_parser = DateParser(self.date_formats)
+
+
+    @property
+    def browser(self):
+        """
+        RPA.Browser.Selenium.Selenium: The browser library, imported and created on first use.
+        """
+        if self.browser_library is None:
+            from RPA.Browser.Selenium import Selenium
+            self.browser_library = Selenium()
+        return self.browser_library
+
+
+    @property
+    def excel(self):
+        """
+        RPA.Excel.Files.Files: The Excel library, imported and created on first use.
+        """
+        if self.excel_library is None:
+            from RPA.Excel.Files import Files
+            self.excel_library = Files()
+        return self.excel_library
+
+
+    @property
+    def work_items(self):
+        """
+        RPA.Robocorp.WorkItems.WorkItems: The work items library, imported and created on first use.
+        """
+        if self.work_items_library is None:
+            from RPA.Robocorp.WorkItems import WorkItems
+            self.work_items_library = WorkItems()
+        return self.work_items_library
+
+
+    @property
+    def waiter(self):
+        """
+        PageWaiter: The waits of the browser, created on first use.
+        """
+        if self.page_waiter is None:
+            self.page_waiter = PageWaiter(self.browser)
+        return self.page_waiter
+
+
+    def reset_search(self, output_path='./output/'):
+        """
+        Reset the state kept for a search, so the same scraper can run another one.
+        
+        Args:
+            output_path (str): Folder of the images and the Excel file of the search.
+        """
+        self.output_path = output_path
+        self.excel_output_file = os.path.join(output_path, "News.xlsx")
+        self.excel_stream = None
+        self.excel_stage = None
+        
+        # The categories read by the http engine are only reused within a search
+        self.search_client.query_categories.clear()
+        
+        # Index of the articles scraped in previous runs, only opened for incremental runs,
+        # and the keys of the articles of this search, found once even by several queries
+        self.article_index = None
+        self.index_query = None
+        self.scraped_keys = set()
+        
+        # Articles waiting for their image download before being indexed, with their query and download
+        self.unindexed = []
+        
+        # Rows added to the output by this search, and whether they stay in the results once streamed
+        # to the Excel (see run_search, without "keep_results" the streamed rows are only counted)
+        self.result_count = 0
+        self.keep_results = True
+        
+        # Phrases counted in each row: every phrase of a multi-phrase search, None for the phrase searched
+        self.count_phrases = None
+        
+        # Image URL of each picture filename used in this search, to avoid overwriting a different image
+        self.image_names = {}
+        
+        # Post-processing of the images after the downloads, None to keep them as downloaded
+        self.image_processor = None
+        
+        # Checkpoint journal of the pages of the current query, the journals of every query of the plan,
+        # and whether the pages analysed are replayed from a journal
+        self.journal = None
+        self.journals = []
+        self.replaying = False
+        
+        # Seconds from the start of the search to the first ordered results, set by run_search with the browser
+        self.time_to_first_search = None
+        
+        # Timed spans of the search, written next to the Excel file by finish_search
+        self.tracer = Tracer()
+        self.downloader.tracer = self.tracer
+        if self.browser_open:
+            self.tracer.instrument_driver(self.browser.driver)
+
+
+    def finish_search(self):
+        """
+        Close the Excel stream and the article index of the search, keeping the rows already streamed.
+        """
+        if self.excel_stage is not None:
+            try:
+                self.excel_stage.close()
+            except Exception as e:
+                logging.error(f"Failed to write the streamed rows: {e}")
+        
+        if self.excel_stream is not None:
+            self.excel_stream.close()
+        
+        if self.article_index is not None:
+            self.article_index.close()
+        
+        for journal in self.journals:
+            journal.close()
+        
+        # Report the requests the browser didn't load
+        if self.request_blocker is not None and self.browser_open:
+            self.request_blocker.collect(self.browser.driver)
+            report = self.request_blocker.report()
+            logging.info(f"Blocked {report['blocked_requests']} requests {report['blocked_by_type']}, "
+                         f"about {report['estimated_bytes_saved'] / 1024:.0f} KB saved, "
+                         f"{report['bytes_received'] / 1024:.0f} KB received in {report['received_requests']} requests")
+        
+        # Keep the timings of the search for diagnosing slow runs
+        try:
+            self.tracer.write(self.output_path)
+        except Exception as e:
+            logging.error(f"Failed to write the trace: {e}")
+
+
+    def load_config(self, config_file):
+        """
+        Load and parse the JSON configuration file.
+
+        Args:
+            config_file (str): Path to the configuration file.
+
+        Returns:
+            dict: Parsed configuration.
+
+        Raises:
+            FileNotFoundError: If the config file is not found.
+            json.JSONDecodeError: If there is an error decoding the JSON.
+        """
+        try:
+            with open(config_file, 'r') as file:
+                config = json.load(file)
+            return config
+        except FileNotFoundError:
+            logging.error("Config file not found: %s", config_file)
+            raise
+        except json.JSONDecodeError as e:
+            logging.error("Error decoding JSON from file: %s", e)
+            raise
+
+
+    def get_workitem(self):
+        """
+        Load the input work item containing search parameters.
+
+        Returns:
+            tuple: Contains the search phrase, news category, and number of months.
+        """
+        logging.info("Loading work item")
+        input_data = self.work_items.get_input_work_item()
+        logging.info("Work Items Loaded Successfully")
+        
+        return self.read_workitem_payload(input_data.payload)
+
+
+    def read_workitem_payload(self, payload):
+        """
+        Read the search parameters from a work item payload, keeping the payload for the optional settings.
+
+        Args:
+            payload (dict): The payload of the input work item.
+
+        Returns:
+            tuple: Contains the search phrase, news category, and number of months.
+        """
+        self.payload = payload
+        
+        try:
+            return (payload["search_phrase"], 
+                    payload["months"], 
+                    payload["news_category"])
+        except KeyError:
+            logging.error("Error retrieving parameters from Cloud Robocorp. Configure the Payload in Cloud Robocorp.")
+            logging.error("Go to Unattendend -> Processes -> [PROCESS NAME] -> Configure -> Advanced Settings -> Start Process with input data -> Payload")
+
+            raise
+            
+
+    def open_browser(self, url):
+        """
+        Open a browser and navigate to the specified URL.
+        
+        Args:
+            url (str): The URL to open.
+        
+        Raises:
+            Exception: If there is an error opening the browser.
+        """
+        try:
+            self.browser.open_available_browser(url)
+            logging.info(f"Opened browser with URL: {url}")
+        except Exception as e:
+            logging.error(f"Failed to open browser with URL {url}: {e}")
+            raise
+
+
+    def open_browser_avoiding_robot_detection(self, url):
+        """
+        Open a browser and navigate to the specified URL while avoiding robot detection.
+
+        Args:
+            url (str): The URL to open.
+
+        Raises:
+            Exception: If there is an error opening the browser.
+        """
+        try:
+            # Arguments of the launch profile, a slot of the prewarmed user data dir is taken here
+            options = self.browser_profile.options(performance_log=self.request_blocker is not None)
+            
+            # Start on a blank page, so the blocking applies to the first load of the site too
+            self.browser.open_available_browser("about:blank", options=options)
+            self.apply_request_blocking()
+            self.navigate(url)
+            
+            # No implicit wait: every lookup that needs an element to appear waits for it explicitly
+            self.browser.execute_javascript(f"Object.defineProperty(navigator, 'webdriver', {{get: () => undefined}})")
+            self.browser.execute_javascript(f"navigator.__defineGetter__('userAgent', () => '{self.browser_profile.user_agent}')")
+            logging.info(f"Opened browser with URL: {url}")
+            
+        except Exception as e:
+            logging.error(f"Failed to open browser with URL {url}: {e}")
+            self.browser_profile.release_slot()
+            raise
+
+                
+    def configure_browser_profile(self, settings=True):
+        """
+        Set the launch profile of the browser. An open browser keeps its profile until it is launched again.
+        
+        Args:
+            settings (bool or dict): True for the fast headless profile, False for the legacy headed one,
+                                     or a dictionary changing the fast profile (see BrowserProfile.from_settings).
+        """
+        if self.browser_open:
+            logging.info("The browser is already open, the launch profile applies to its next launch")
+            return
+        
+        self.browser_profile = BrowserProfile.from_settings(settings)
+
+
+    def configure_request_blocking(self, settings=True):
+        """
+        Set the requests blocked by the browser.
+        
+        Args:
+            settings (bool or dict): True for the profile of the site, False to load everything,
+                                     or a dictionary changing the profile ("block_types", "deny" and "allow").
+        """
+        if settings is False:
+            self.request_blocker = None
+        else:
+            self.request_blocker = RequestBlocker(self.site_adapter.home_url, settings if isinstance(settings, dict) else None)
+        
+        if self.browser_open:
+            self.apply_request_blocking()
+
+
+    def apply_request_blocking(self):
+        """
+        Apply the blocked requests to the open browser. It needs Chrome, other browsers load everything.
+        """
+        try:
+            if self.request_blocker is None:
+                self.browser.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+            else:
+                self.request_blocker.apply(self.browser.driver)
+        except Exception as e:
+            logging.warning(f"Couldn't block the requests in the browser: {e}")
+
+
+    def get_phrase_matcher(self, phrases):
+        """
+        Get the matcher counting the given phrases, it is compiled only once per run.
+
+        Args:
+            phrases (list or dict): The phrases to count, or a dictionary mapping each phrase to its aliases.
+
+        Returns:
+            PhraseMatcher: The matcher.
+        """
+        if isinstance(phrases, dict):
+            key = tuple((phrase, tuple(aliases)) for phrase, aliases in phrases.items())
+        else:
+            key = tuple(phrases)
+        
+        if key not in self.phrase_matchers:
+            self.phrase_matchers[key] = PhraseMatcher(phrases)
+        
+        return self.phrase_matchers[key]
+
+
+    def count_string_in_text(self, text, search_string):
+        """
+        Count the number of occurrences of a specific string in a given text.
+        The matching is case insensitive and respects word boundaries.
+
+        Args:
+            text (str): The text to search within.
+            search_string (str): The string to count.
+
+        Returns:
+            int: The number of occurrences of the search string in the text.
+        """
+        return self.get_phrase_matcher([search_string]).count(text)[search_string]
+
+
+    def make_valid_filename(self, filename):
+        """
+        Convert a given filename into a valid filename by replacing invalid characters.
+
+        Args:
+            filename (str): The original filename.
+
+        Returns:
+            str: The valid filename with invalid characters replaced by underscores.
+        """
+        return re.sub(r'[<>:"/\\|?*]', '_', filename)
+
+
+    def has_money_in_text(self, text):
+        """
+        Check if the given text contains any money-related strings.
+        
+        Args:
+            text (str): The text to search within.
+        
+        Returns:
+            bool: True if the text contains money-related strings, otherwise False.
+        """
+        # Define regular expression patterns for different money formats
+        patterns = [
+            # $11.1 or $111,111.11 -> '$' + '1-3 digits' + ',' + '1-3 digits' + '.' + '1-2 digits'
+            re.compile(r'\$\d{1,3}(,\d{3})*(\.\d{1,2})?', re.IGNORECASE),
+            # 11 dollars
+            re.compile(r'\d+ dollars', re.IGNORECASE),
+            # 11 USD
+            re.compile(r'\d+ USD', re.IGNORECASE)
+        ]
+        
+        # Check if any pattern matches
+        for pattern in patterns:
+            if pattern.search(text):
+                return True
+        
+        return False
+
+
+    def add_extension(self, filename):
+        """
+        Add the .jpg extension to a filename if it doesn't already have a common image extension.
+        As I saw, it is usually .JPG files in LA Times, but sometimes the URL doesn't show it.
+        
+        Args:
+            filename (str): The original filename.
+        
+        Returns:
+            str: The filename with the .jpg extension added if necessary.
+        """
+        
+        # Check if the filename has a valid image extension using a regular expression, add if it is needed
+        if not re.search(r'\.(?:jpg|jpeg|png|gif|webp|bmp|svg)$', filename, re.IGNORECASE):
+            return f'{filename}.jpg'
+        
+        return filename
+
+
+    def unique_image_name(self, image_name, image_url):
+        """
+        Make sure two different images don't share a filename in this run.
+        If the name is already used by another URL, a short hash of the URL is added to it.
+        
+        Args:
+            image_name (str): The filename taken from the URL.
+            image_url (str): The URL of the image.
+        
+        Returns:
+            str: A filename only used by this URL.
+        """
+        if self.image_names.get(image_name, image_url) != image_url:
+            root, extension = os.path.splitext(image_name)
+            image_name = f"{root}-{hashlib.sha1(image_url.encode('utf-8')).hexdigest()[:8]}{extension}"
+        
+        self.image_names[image_name] = image_url
+        return image_name
+
+
+    def open_image_cache(self, folder, max_megabytes=500):
+        """
+        Download the images through a persistent cache shared by the runs.
+        
+        Args:
+            folder (str): Folder of the cache.
+            max_megabytes (int): Maximum size of the cache, the least recently used images are evicted above it.
+        """
+        self.downloader.cache = ImageCache(folder, max_bytes=int(max_megabytes) * 1024 * 1024)
+        logging.info(f"Image cache opened: {folder}")
+
+
+    def configure_image_processing(self, settings=False):
+        """
+        Post-process the downloaded images: fix their extensions, write derivatives and remove the duplicates.
+        
+        Args:
+            settings (bool | dict): False to keep the images as downloaded, True for the default settings,
+                                    or a dictionary with the arguments of ImagePostProcessor ("workers", "max_size",
+                                    "derivative_format", "quality", "dedup_distance", "replace_originals").
+        """
+        if not settings:
+            self.image_processor = None
+            return
+        
+        self.image_processor = ImagePostProcessor(**(settings if isinstance(settings, dict) else {}))
+        logging.info("Image post-processing enabled")
+
+
+    def output_header(self):
+        """
+        Get the header of the Excel file, with the image hashes when the images are post-processed,
+        and a count for each phrase of a multi-phrase search.
+        
+        Returns:
+            list: The header row.
+        """
+        header = self.excel_header
+        if self.image_processor is not None:
+            header = header + ["Image hash"]
+        if self.count_phrases is not None and len(self.count_phrases) > 1:
+            header = header + [NewsResult.phrase_column + phrase for phrase in self.count_phrases]
+        return header
+
+
+    def fix_date(self, date):
+        """
+        Fix common issues with date formats, including replacing "Sept" with "Sep" and converting relative times
+        like "5 minutes ago", "3 days ago" or "yesterday" to the date they refer to.
+        
+        Args:
+            date (str): The original date string.
+        
+        Returns:
+            str: The fixed date string.
+        """
+        # Replace 'Sept' with 'Sep' to standardize the month abbreviation
+        date = date.replace('Sept', 'Sep')
+        
+        # Convert relative times like "X minutes ago" or "X days ago" to the date they refer to
+        relative_date = self.date_parser.resolve_relative(date)
+        if relative_date is not None:
+            date = relative_date.strftime('%Y-%m-%d')
+        elif ('minutes' in date or 'hour' in date):
+            date = datetime.now().strftime('%Y-%m-%d')
+            
+        return date
+
+
+    def parse_date(self, date_str):
+        """
+        Parse the date string using multiple formats.
+        Only the formats with the same shape as the string are tried, and the results are cached,
+        when several formats match the last one in self.date_formats wins.
+
+        Args:
+            date_str (str): The date string to parse.
+
+        Returns:
+            datetime: The parsed date.
+        """
+        
+        date = self.date_parser.parse(date_str)
+        if (date == None):
+            logging.warning(f"Unable to parse date: {date_str}")
+            date = datetime(1, 1, 1)
+    
+        else:
+            logging.info("Parsed date: %s", date.date(), extra={"event": "parsed_date"})
+    
+        return date
+
+    
+    def open_la_times(self):
+        """
+        Open the browser on the LA Times homepage, or go back to the homepage if the browser is already open.
+        """
+        self.open_site(self.la_times_url)
+
+
+    def navigate(self, url):
+        """
+        Go to a URL in the current tab, within the rate limit of its host and retrying the timeouts.
+        
+        Args:
+            url (str): The URL.
+        
+        Raises:
+            CircuitOpenError: If the host failed too many times recently.
+        """
+        self.scheduler.call(url, lambda: self.browser.go_to(url))
+
+
+    def open_site(self, url):
+        """
+        Open the browser on the homepage of a site, or go to it if the browser is already open.
+        
+        Args:
+            url (str): The URL of the homepage.
+        """
+        if self.browser_open:
+            logging.info("Reusing the open browser")
+            self.navigate(url)
+            return
+        
+        with self.tracer.span("browser_launch", profile=self.browser_profile.name) as span:
+            self.open_browser_avoiding_robot_detection(url)
+            span["args"]["prewarmed"] = self.browser_profile.prewarmed
+        
+        # The fast profile has a fixed viewport, the legacy one a maximized window
+        if self.browser_profile.window_size is None:
+            self.browser.maximize_browser_window()
+        self.browser_open = True
+        self.tracer.instrument_driver(self.browser.driver)
+
+
+    def is_browser_alive(self):
+        """
+        Check if the browser is open and still answering.
+        
+        Returns:
+            bool: True if the browser answers, otherwise False.
+        """
+        if not self.browser_open:
+            return False
+        
+        try:
+            self.browser.get_location()
+            return True
+        except Exception as e:
+            logging.warning(f"Browser is not answering: {e}")
+            return False
+
+
+    def open_la_times_and_search(self, search_phrase):
+        self.open_la_times()
+        logging.info(f"Performing the search for {search_phrase}")
+
+        # Wait to load the search button and click it
+        try:
+            self.browser.wait_until_element_is_visible("//button[@data-element='search-button']", timeout=60)
+            self.browser.click_element_when_visible("//button[@data-element='search-button']")
+        except AssertionError:
+            logging.error("Could't find Search Button after 60 seconds")
+            raise SeleniumError("Search Button not found")
+            
+        try:
+            self.browser.wait_until_element_is_visible("//input[@data-element='search-form-input']", timeout=60)
+            self.browser.input_text_when_element_is_visible("//input[@data-element='search-form-input']", search_phrase)
+        except AssertionError:
+            logging.error("Could't find Search Input after 60 seconds")
+            raise SeleniumError("Search Input not found")
+            
+        try:
+            self.browser.click_element_when_visible('//button[@data-element="search-submit-button"]')
+        except AssertionError:
+            logging.error("Could't submit the Search Form")
+            raise SeleniumError("Search Form submission failed")
+            
+        logging.info(f"Search for {search_phrase} complete")
+
+
+    def filter_la_times(self, news_category):
+        """
+        Filter the results by one category, or by several ones ticked together.
+        
+        Args:
+            news_category (str or list): The category, a list of categories, or empty for all.
+        
+        Raises:
+            SeleniumError: If the categories can't be shown.
+        """
+        news_categories = as_list(news_category)
+        if news_categories:
+            logging.info(f"Selecting categories: {', '.join(news_categories)}")
+            
+            # Expand to see all topics
+            try:
+                self.browser.wait_until_element_is_visible('//span[@class="see-all-text"]', timeout=60)
+                self.browser.click_element_when_visible('//span[@class="see-all-text"]')
+            except AssertionError:
+                logging.error("Could't find categories for this search")
+                raise SeleniumError("Search categories failed")
+            
+            try:
+                categories_xpath = "//ul[@class='search-filter-menu']/li"
+                self.browser.wait_until_element_is_visible(categories_xpath + "//label/span", timeout=60)
+                
+                # Each checkbox ticked adds its category to the results, the list is read again after each one
+                for news_category in news_categories:
+                    labels = [category.text.lower().strip() for category in self.browser.find_elements(categories_xpath + "//label/span")]
+                    if news_category.lower() not in labels:
+                        logging.error(f"Couldn't find the category {news_category} for this search")
+                        continue
+                    
+                    logging.info(f"Found category: {news_category}")
+                    i = labels.index(news_category.lower()) + 1
+                    
+                    # The filter replaces the results, wait for the new ones instead of reading the old page
+                    self.waiter.mark(f"{self.articles_xpath}[1]")
+                    self.browser.click_element_when_visible(f'{categories_xpath}[{i}]//label//input[@type="checkbox"]')
+                    self.waiter.wait_for_any({"no_results": self.no_results_xpath, "results:fresh": self.first_title_xpath}, timeout=60)
+
+            except AssertionError:
+                logging.error("Could't find this category for this search")
+                raise SeleniumError("Category doesn't exists")  
+                
+        else:
+            logging.info(f"No news category to select")
+            
+            
+            
+    def order_la_times(self):
+        """
+        Order the results by the newest.
+        
+        Returns:
+            bool: True if there are results, False if the search has no results.
+        
+        Raises:
+            SeleniumError: If the results can't be ordered.
+        """
+        # Race the "no results" message against the order selection box, instead of waiting for each one
+        try:
+            outcome = self.waiter.wait_for_any({"no_results": self.no_results_xpath, "order_box": '//select[@class="select-input"]'}, timeout=60)
+        except WaitTimeout:
+            logging.error("Could't find the order selection box")
+            raise SeleniumError("Order failed")
+        
+        if outcome == "no_results":
+            logging.error("There is no results for the search")
+            return False
+        
+        select_element = self.browser.find_elements("//select[@class='select-input']")
+        
+        # When it changes the sorter, it will remove the page content and load again,
+        # mark the current results to wait for the new ones
+        self.waiter.mark(f"{self.articles_xpath}[1]")
+            
+        try:
+            self.browser.select_from_list_by_label(select_element, "Newest")
+        except AssertionError:
+            logging.error("Impossible to filter by the Newest")
+            raise SeleniumError("Order failed")
+        
+        try:
+            outcome = self.waiter.wait_for_any({"no_results": self.no_results_xpath, "results:fresh": self.first_title_xpath}, timeout=60)
+        except WaitTimeout:
+            logging.error("Could't load the ordered news after 60 seconds")
+            raise SeleniumError("Order failed")
+        
+        return outcome == "results"
+
+
+    def extract_articles_la_times(self):
+        """
+        Extract every article of the current results page in a single WebDriver call.
+        
+        Returns:
+            list: A list of dictionaries with the raw title, description, date, image URL and article URL.
+                  A field is None when its element is missing in the article.
+        
+        Raises:
+            Exception: If the script fails or doesn't return a list.
+        """
+        # The selectors mirror the XPaths used by extract_article_la_times
+        script = """
+            var text = function (element) { return element ? element.innerText.trim() : null; };
+            var articles = document.querySelectorAll("ul[class='search-results-module-results-menu'] > li");
+            return JSON.stringify(Array.prototype.map.call(articles, function (article) {
+                var link = article.querySelector("h3[class='promo-title'] > a");
+                var image = article.querySelector("div[class='promo-media'] img[class='image']");
+                return {
+                    title: text(link),
+                    description: text(article.querySelector("p[class='promo-description']")),
+                    date: text(article.querySelector("p[class='promo-timestamp']")),
+                    image_url: image ? image.src : null,
+                    url: link ? link.href : null
+                };
+            }));
+        """
+        articles = json.loads(self.browser.execute_javascript(script))
+        if not isinstance(articles, list):
+            raise ValueError("Unexpected result from the bulk extraction")
+        
+        logging.info("Extracted %d articles in a single call", len(articles))
+        return articles
+
+
+    def extract_article_la_times(self, articles_xpath, i):
+        """
+        Extract one article of the current results page, element by element.
+        It is slower than extract_articles_la_times, and it is kept as a fallback.
+        
+        Args:
+            articles_xpath (str): XPath locating the articles of the results page.
+            i (int): 1-based position of the article in the page.
+        
+        Returns:
+            dict: The raw title, description, date, image URL and article URL.
+        """
+        # Locate elements for title, description, date, and image within each article
+        title_element = self.browser.find_element(f"{articles_xpath}[{i}]//h3[@class='promo-title']/a")
+        description_element = self.browser.find_element(f"{articles_xpath}[{i}]//p[@class='promo-description']")
+        date_element = self.browser.find_element(f"{articles_xpath}[{i}]//p[@class='promo-timestamp']")
+        image_element = self.browser.find_element(f"{articles_xpath}[{i}]//div[@class='promo-media']//img[@class='image']") 
+        
+        # Extract text and attributes from the located elements
+        return {
+            "title": self.browser.get_text(title_element),
+            "description": self.browser.get_text(description_element),
+            "date": self.browser.get_text(date_element),
+            "image_url": self.browser.get_element_attribute(image_element, 'src'),
+            "url": self.browser.get_element_attribute(title_element, 'href')
+        }
+
+
+    def get_start_date(self, months):
+        """
+        Get the oldest date accepted for the news.
+        
+        Args:
+            months (int): Number of months to go back, 0 or empty for no limit.
+        
+        Returns:
+            datetime: The start date.
+        """
+        if (months == "" or months == 0):
+            start_date = datetime(1, 1, 1)
+        else:
+            from dateutil.relativedelta import relativedelta
+            start_date = datetime.now() - relativedelta(months=int(months))
+        
+        start_str = start_date.strftime('%Y-%m-%d')
+        logging.info(f"Limit for the news: {start_str}")
+        
+        return start_date
+
+
+    def open_article_index(self, path, site, search_phrase, news_category):
+        """
+        Open the article index for an incremental run: the pagination stops at the first article
+        already indexed for the query, and the indexed rows are reused.
+        
+        Args:
+            path (str): Path of the SQLite file.
+            site (str): Name of the site searched.
+            search_phrase (str): The phrase searched.
+            news_category (str): The category filtered, empty for all.
+        """
+        # The searches of a plan share the index, each one with its query
+        if self.article_index is None or self.article_index.path != path:
+            self.article_index = ArticleIndex(path)
+        self.index_query = self.article_index.query_key(site, search_phrase, news_category)
+
+
+    def open_journal(self, site, search_phrase, news_category, name="checkpoint.jsonl"):
+        """
+        Open the checkpoint journal of the search in the output folder, resuming the one left by a crashed run.
+        
+        Args:
+            site (str): Name of the site searched.
+            search_phrase (str): The phrase searched.
+            news_category (str): The category filtered, empty for all.
+            name (str): Name of the file, each search of a plan has its own.
+        """
+        key = CheckpointJournal.search_key(site, search_phrase, news_category)
+        self.journal = CheckpointJournal(os.path.join(self.output_path, name), key)
+        self.journals.append(self.journal)
+
+
+    def is_indexed(self, article):
+        """
+        Check if an article was already scraped for this query in a previous run.
+        
+        Args:
+            article (dict): The raw title, description, date, image URL and article URL.
+        
+        Returns:
+            bool: True if the article is indexed, otherwise False.
+        """
+        # The pages replayed from the journal were indexed by the run that crashed
+        if self.article_index is None or self.replaying:
+            return False
+        
+        key = self.article_index.article_key(article)
+        return key not in self.scraped_keys and self.article_index.contains(self.index_query, article)
+
+
+    def merge_indexed_results(self, results, months):
+        """
+        Add the indexed articles in range that weren't scraped in this run, reusing their analysis and images.
+        
+        Args:
+            results (list): The results scraped in this run.
+            months (int): Number of months to go back, 0 or empty for no limit.
+        
+        Returns:
+            list: The results followed by the indexed ones.
+        """
+        if self.article_index is None:
+            return results
+        
+        start_str = self.get_start_date(months).strftime('%Y-%m-%d')
+        
+        reused = 0
+        for key, result, image_url, image_path in self.article_index.get_results(self.index_query, start_str):
+            if key in self.scraped_keys:
+                continue
+            
+            # The index keeps the count of the query's phrase, a multi-phrase search counts all of its phrases again
+            if self.count_phrases is not None and len(self.count_phrases) > 1:
+                counts = self.get_phrase_matcher(self.count_phrases).count_articles([{"title": result.title, "description": result.description}])[0]
+                result.search_count = sum(counts.values())
+                result.phrase_counts = counts
+            
+            # The stored name may be taken by another image of this run
+            result.picture_filename = self.unique_image_name(result.picture_filename, image_url or key)
+            
+            # Reuse the stored image, download it again only if it is gone
+            image_filepath = self.output_path + result.picture_filename
+            if not os.path.exists(image_filepath):
+                if image_path and os.path.exists(image_path):
+                    shutil.copyfile(image_path, image_filepath)
+                elif image_url:
+                    self.downloader.submit(image_url, image_filepath)
+            
+            self.scraped_keys.add(key)
+            self.add_result(results, result)
+            reused += 1
+        
+        logging.info(f"Reused {reused} articles from the index")
+        return results
+
+
+    def add_result(self, results, result):
+        """
+        Add a result to the list, and send it to the writer thread when the Excel is streamed.
+        A streamed row is only counted, unless keep_results is set.
+        The post-processed images change the rows after the downloads, so those are written at the end.
+        
+        Args:
+            results (list): The results scraped so far.
+            result (NewsResult): The new result.
+        """
+        self.result_count += 1
+        if self.excel_stage is not None and self.image_processor is None:
+            self.excel_stage.put(result)
+            if not self.keep_results:
+                return
+        results.append(result)
+
+
+    def process_article(self, article, search_phrase, start_date, counts=None):
+        """
+        Analyse one extracted article and schedule the download of its image.
+        
+        Args:
+            article (dict): The raw title, description, date, image URL and article URL.
+            search_phrase (str): The phrase searched.
+            start_date (datetime): The oldest date accepted for the news.
+            counts (dict): Occurrences of each phrase in the title and description, already counted
+                           for the whole page by PhraseMatcher.count_articles. Counted here if None.
+        
+        Returns:
+            NewsResult: The result row, or None if the article is out of range.
+        
+        Raises:
+            ValueError: If a required element is missing in the article.
+        """
+        missing = [field for field in ("title", "description", "date", "image_url") if article.get(field) is None]
+        if missing:
+            raise ValueError(f"Missing elements: {', '.join(missing)}")
+        
+        title = article["title"]
+        description = article["description"]
+        image_url = article["image_url"]
+        
+        # Fix the date format, parse it and format as string
+        date = self.fix_date(article["date"])
+        date = self.parse_date(date)
+        date_str = date.strftime('%Y-%m-%d')
+        
+        # Extract the image name from the URL and make it a valid filename
+        image_name = self.make_valid_filename(image_url.split('%2F')[-1])
+        image_name = self.add_extension(image_name)
+        image_name = self.unique_image_name(image_name, image_url)
+        
+        # Count of search phrases in the title and description, and of each one when several phrases are searched
+        if counts is None:
+            counts = self.get_phrase_matcher(self.count_phrases or [search_phrase]).count_articles([article])[0]
+        total_count = sum(counts.values())
+        phrase_counts = counts if len(counts) > 1 else None
+        
+        # Check if the title or description contains any money-related terms
+        money_in_title = self.has_money_in_text(title)
+        money_in_description = self.has_money_in_text(description)
+        money_in_text = money_in_title or money_in_description
+        
+        # If the article date is before the start date, it is out of range
+        if not date > start_date:
+            logging.info("%s is out of range, not scraped", title, extra={"event": "out_of_range", "article": article.get("url")})
+            return None
+        
+        # Schedule the image download, it runs while the browser keeps scraping.
+        # The images of the replayed pages were already downloaded by the run that crashed
+        image_filepath = self.output_path + image_name
+        download = None
+        if not (self.replaying and os.path.exists(image_filepath)):
+            download = self.downloader.submit(image_url, image_filepath)
+        
+        result = NewsResult(title, date_str, description, image_name, total_count, money_in_text, phrase_counts=phrase_counts)
+        self.scraped_keys.add(ArticleIndex.article_key(article))
+        
+        # Keep the article for the next runs of the same query, once its image is saved (see index_downloaded_articles)
+        if self.article_index is not None:
+            self.unindexed.append((self.index_query, article, result, image_filepath, download))
+        
+        logging.info("Scraped %s", title, extra={"event": "scraped", "article": article.get("url")})
+        return result
+
+
+    def wait_for_results(self, no_results_xpath, first_xpath, label, fresh=True, timeout=60):
+        """
+        Wait until a results page shows its results or its "no results" message.
+        
+        Args:
+            no_results_xpath (str): XPath of the "no results" message.
+            first_xpath (str): XPath of the first result.
+            label (str): Name of the wait in the logging and timings.
+            fresh (bool): If True, the first result must not be one marked before the page changed.
+            timeout (int): Maximum seconds to wait.
+        
+        Returns:
+            str: "results" or "no_results".
+        
+        Raises:
+            SeleniumError: If neither is visible before the timeout.
+        """
+        results_condition = "results:fresh" if fresh else "results"
+        try:
+            return self.waiter.wait_for_any({"no_results": no_results_xpath, results_condition: first_xpath}, timeout=timeout, label=label)
+        except WaitTimeout:
+            logging.error(f"Could't load the news after {timeout} seconds")
+            raise SeleniumError("News didn't load")
+
+
+    def extract_articles_by_xpath(self, articles_xpath, fields):
+        """
+        Extract every article of the current results page in a single WebDriver call, from XPaths.
+        
+        Args:
+            articles_xpath (str): XPath of the articles.
+            fields (dict): XPath of each raw field, relative to the article. A text is read from an element,
+                           an attribute from an XPath ending with "/@name".
+        
+        Returns:
+            list: A list of dictionaries with the raw fields, None when the element of a field is missing.
+        
+        Raises:
+            Exception: If the script fails or doesn't return a list.
+        """
+        script = """
+            var fields = %s;
+            var articles = document.evaluate(%s, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var extracted = [];
+            for (var i = 0; i < articles.snapshotLength; i++) {
+                var article = {};
+                for (var name in fields) {
+                    var node = document.evaluate(fields[name], articles.snapshotItem(i), null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+                    article[name] = !node ? null : (node.nodeType === Node.ATTRIBUTE_NODE ? new URL(node.value, document.baseURI).href : node.innerText.trim());
+                }
+                extracted.push(article);
+            }
+            return JSON.stringify(extracted);
+        """ % (json.dumps(fields), json.dumps(articles_xpath))
+        articles = json.loads(self.browser.execute_javascript(script))
+        if not isinstance(articles, list):
+            raise ValueError("Unexpected result from the bulk extraction")
+        
+        logging.info("Extracted %d articles in a single call", len(articles))
+        return articles
+
+
+    def read_page_la_times(self, count_pages):
+        """
+        Wait for the current LA Times results page and read its raw articles.
+        
+        Args:
+            count_pages (int): Number of the page, for the logging.
+        
+        Returns:
+            list: The raw articles, or None if the page has no results.
+        
+        Raises:
+            SeleniumError: If the news don't load.
+        """
+        # Wait to load the first news, after changing the page it has to be a new one
+        if self.wait_for_results(self.no_results_xpath, self.first_title_xpath, f"page {count_pages}") == "no_results":
+            return None
+        
+        # Read the whole page in one call, if it fails go back to one element at a time
+        try:
+            return self.extract_articles_la_times()
+        except Exception as e:
+            logging.warning(f"Bulk extraction failed, extracting element by element: {e}")
+        
+        page_articles = []
+        for index in range(len(self.browser.find_elements(self.articles_xpath))):
+            try:
+                page_articles.append(self.extract_article_la_times(self.articles_xpath, index + 1))
+            except Exception as e:
+                logging.error(f"Failed to extract article at index {index + 1}: {e}")
+        return page_articles
+
+
+    def next_page_la_times(self, count_pages):
+        """
+        Click the button to the next LA Times results page.
+        
+        Args:
+            count_pages (int): Number of the current page.
+        
+        Returns:
+            bool: True if the next page is loading, False if there is no next page.
+        """
+        try:
+            # Interact with the button to change the page
+            # It would be easier to just change the URL, but for an RPA test, I choose to interact with the button 
+            self.waiter.mark(f"{self.articles_xpath}[1]")
+            self.browser.find_element("//div[@class='search-results-module-next-page']/a").click()                
+            return True
+        except:
+            return False
+
+
+    def process_page(self, page_articles, search_phrase, start_date, results, count_pages):
+        """
+        Analyse the raw articles of a results page and add the new ones to the results.
+        
+        Args:
+            page_articles (list): The raw articles of the page.
+            search_phrase (str): The phrase searched.
+            start_date (datetime): The oldest date accepted for the news.
+            results (list): The results scraped so far, the new ones are added to it.
+            count_pages (int): Number of the page, for the logging.
+        
+        Returns:
+            bool: True if the start date (or an indexed article) was reached.
+        """
+        reach_start_date = False
+        
+        # Count the search phrases in every title and description of the page in one pass
+        page_counts = self.get_phrase_matcher(self.count_phrases or [search_phrase]).count_articles(page_articles)
+        
+        for index, article in enumerate(page_articles):
+            try:
+                with self.tracer.span("article", page=count_pages, index=index + 1):
+                    # Found before by this search or another one of the plan: analysed and downloaded once,
+                    # but its date still ends the pagination
+                    if ArticleIndex.article_key(article) in self.scraped_keys:
+                        if not self.parse_date(self.fix_date(article["date"])) > start_date:
+                            reach_start_date = True
+                        continue
+                    
+                    # The rest of the results were scraped in a previous run
+                    if self.is_indexed(article):
+                        logging.info(f"{article['title']} is already indexed, stopping the pagination")
+                        reach_start_date = True
+                        break
+                    
+                    result = self.process_article(article, search_phrase, start_date, page_counts[index])
+                    if result is None:
+                        reach_start_date = True
+                    else:
+                        self.add_result(results, result)
+            
+            except Exception as e:
+                logging.error(f"Failed to process article at index {index + 1}: {e}")
+                continue
+        
+        return reach_start_date
+
+
+    def read_current_page(self, adapter, count_pages):
+        """
+        Read the raw articles of the results page shown in the current window.
+        
+        Args:
+            adapter (SiteAdapter): The adapter of the site.
+            count_pages (int): Number of the page, for the logging.
+        
+        Returns:
+            list: The raw articles of the page, or None at the end of the results.
+        
+        Raises:
+            SeleniumError: If the news don't load.
+        """
+        with self.tracer.span("page", page=count_pages) as span:
+            page_articles = adapter.read_page(self, count_pages)
+            if page_articles is None:
+                logging.info(f"No more news in page {count_pages}")
+                return None
+            
+            span["args"]["articles"] = len(page_articles)
+            return page_articles
+
+
+    def iter_site_pages(self, adapter, first_page=1):
+        """
+        Produce the results pages of a site, one by one. The next page is only loaded when
+        the consumer asks for it, so closing the generator stops the pagination.
+        
+        Args:
+            adapter (SiteAdapter): The adapter of the site, with the search already sorted.
+            first_page (int): Number of the first page; above 1 the site must paginate by URL.
+        
+        Yields:
+            tuple: The number of the page, its raw articles and its URL.
+        """
+        count_pages = first_page
+        if first_page > 1:
+            self.navigate(adapter.page_url(self.browser.get_location(), first_page))
+        
+        while True:
+            page_articles = self.read_current_page(adapter, count_pages)
+            if page_articles is None:
+                return
+            
+            yield count_pages, page_articles, self.browser.get_location()
+            
+            if not adapter.next_page(self, count_pages):
+                logging.error(f"Can't load more news, reached page {count_pages}")
+                return
+            count_pages += 1
+
+
+    def scrape_pages(self, pages, search_phrase, months, results):
+        """
+        Analyse the pages of a producer until the start date, then close it.
+        Each new page is added to the checkpoint journal once analysed.
+        
+        Args:
+            pages (generator): The producer of (page number, raw articles, URL).
+            search_phrase (str): The phrase searched.
+            months (int): Number of months to go back, 0 or empty for no limit.
+            results (list): The results scraped so far, the new ones are added to it.
+        
+        Returns:
+            list: The results.
+        """
+        try:
+            start_date = self.get_start_date(months)
+            for count_pages, page_articles, position in pages:
+                reach_start_date = self.process_page(page_articles, search_phrase, start_date, results, count_pages)
+                if self.journal is not None and not self.replaying:
+                    self.journal.add_page(count_pages, page_articles, position)
+                
+                # Index the articles whose image is already saved, the others wait for their download
+                self.index_downloaded_articles()
+                
+                if reach_start_date:
+                    logging.info("Scraped all news articles that matches the constraints")
+                    break
+            
+            # The pagination is over, a new run won't load more pages
+            if self.journal is not None:
+                self.journal.end()
+            return results
+        finally:
+            pages.close()
+
+
+    def resume_pages(self, make_pages):
+        """
+        Replay the pages of the checkpoint journal left by a crashed run, then produce the next ones.
+        
+        Args:
+            make_pages (callable): Gets the number of the first page to load and returns its producer.
+        
+        Yields:
+            tuple: The number of the page, its raw articles and its URL.
+        """
+        if self.journal is None:
+            yield from make_pages(1)
+            return
+        
+        if self.journal.pages:
+            self.replaying = True
+            try:
+                for page in self.journal.pages:
+                    yield page
+            finally:
+                self.replaying = False
+            logging.info(f"Replayed {len(self.journal.pages)} pages from the journal")
+        
+        if not self.journal.ended:
+            yield from make_pages(self.journal.next_page())
+
+
+    def scrape_site(self, adapter, search_phrase, months):
+        """
+        Scrape the news of a site, page by page, until the start date.
+        
+        Args:
+            adapter (SiteAdapter): The adapter of the site, with the search already sorted.
+            search_phrase (str): The phrase searched.
+            months (int): Number of months to go back, 0 or empty for no limit.
+        
+        Returns:
+            list: The NewsResult records of the scraped news articles.
+        """
+        
+        results = []
+        try:
+            pages = self.resume_pages(lambda first_page: self.iter_site_pages(adapter, first_page))
+            return self.scrape_pages(pages, search_phrase, months, results)
+        except Exception as e:
+            logging.error(f"Failed to scrape news articles: {e}")
+            return results
+
+
+    def scrape_news_la_times(self, search_phrase, months):
+        """
+        Scrape news articles from the LA Times website.
+        
+        Returns:
+            list: The NewsResult records of the scraped news articles.
+        """
+        return self.scrape_site(LATimesAdapter(), search_phrase, months)
+
+
+    def open_tab(self, url):
+        """
+        Open a URL in a new tab, without leaving the current one.
+        The blocked requests are set on each tab, before its page starts loading.
+        
+        Args:
+            url (str): The URL to open.
+        
+        Returns:
+            str: The handle of the new tab.
+        """
+        current = self.browser.driver.current_window_handle
+        before = set(self.browser.get_window_handles())
+        self.browser.execute_javascript("window.open('about:blank', '_blank');")
+        handles = [handle for handle in self.browser.get_window_handles() if handle not in before]
+        if not handles:
+            raise SeleniumError("Could't open a new tab")
+        
+        # The blocking of DevTools applies to one tab, the new one starts without it
+        self.browser.switch_window(handles[0])
+        if self.request_blocker is not None:
+            self.apply_request_blocking()
+        
+        # Start loading the page without waiting for it, and go back to the current tab
+        self.browser.execute_javascript(f"window.location.href = {json.dumps(url)};")
+        self.browser.switch_window(current)
+        return handles[0]
+
+
+    def iter_site_tab_pages(self, adapter, prefetch=3, first_page=1):
+        """
+        Produce the results pages of a site, loading the next ones ahead in other tabs. The site must paginate by URL.
+        The first page is the one already open. While a page is analysed, the next `prefetch` pages
+        are loading in background tabs; when the generator is closed, the tabs still loading are closed.
+        
+        Args:
+            adapter (SiteAdapter): The adapter of the site, with the search already sorted.
+            prefetch (int): Number of pages loaded ahead.
+            first_page (int): Number of the first page, loaded in the current tab.
+        
+        Yields:
+            tuple: The number of the page, its raw articles and its URL.
+        """
+        pending = []
+        current = None
+        main_window = self.browser.driver.current_window_handle
+        try:
+            search_url = self.browser.get_location()
+            if first_page > 1:
+                search_url = adapter.page_url(search_url, first_page)
+                self.navigate(search_url)
+            
+            page_articles = self.read_current_page(adapter, first_page)
+            if page_articles is None:
+                return
+            yield first_page, page_articles, search_url
+            next_page = first_page + 1
+            
+            while True:
+                # Keep the next pages loading in background tabs
+                self.browser.switch_window(main_window)
+                while len(pending) < prefetch:
+                    pending.append((next_page, self.open_tab(adapter.page_url(search_url, next_page))))
+                    next_page += 1
+                
+                count_pages, current = pending.pop(0)
+                self.browser.switch_window(current)
+                page_articles = self.read_current_page(adapter, count_pages)
+                if page_articles is None:
+                    return
+                yield count_pages, page_articles, adapter.page_url(search_url, count_pages)
+                
+                self.browser.close_window()
+                current = None
+        finally:
+            # Cancel the pages still loading past the cutoff
+            for count_pages, handle in pending + ([(None, current)] if current is not None else []):
+                try:
+                    self.browser.switch_window(handle)
+                    self.browser.close_window()
+                except Exception as e:
+                    logging.warning(f"Failed to close the tab of page {count_pages}: {e}")
+            if pending:
+                logging.info(f"Cancelled {len(pending)} pages loaded past the cutoff")
+            self.browser.switch_window(main_window)
+
+
+    def scrape_site_tabs(self, adapter, search_phrase, months, prefetch=3):
+        """
+        Scrape the news of a site, loading the next pages ahead in other tabs (see iter_site_tab_pages).
+        The pages are processed in order, so the start date cutoff still applies.
+        
+        Args:
+            adapter (SiteAdapter): The adapter of the site, with the search already sorted.
+            search_phrase (str): The phrase searched.
+            months (int): Number of months to go back, 0 or empty for no limit.
+            prefetch (int): Number of pages loaded ahead.
+        
+        Returns:
+            list: The NewsResult records of the scraped news articles.
+        """
+        
+        results = []
+        try:
+            pages = self.resume_pages(lambda first_page: self.iter_site_tab_pages(adapter, prefetch, first_page))
+            return self.scrape_pages(pages, search_phrase, months, results)
+        except Exception as e:
+            logging.error(f"Failed to scrape news articles: {e}")
+            return results
+
+
+    def iter_la_times_http_pages(self, search_phrase, news_category, first_page=1):
+        """
+        Produce the LA Times results pages without a browser, one by one: the search URL is built
+        directly and the server-rendered pages are parsed with lxml. A page is only fetched when
+        the consumer asks for it.
+        
+        Args:
+            search_phrase (str): The phrase to search.
+            news_category (str or list): The category to filter, several ones filtered together, or empty for all.
+            first_page (int): Number of the first page.
+        
+        Yields:
+            tuple: The number of the page, its raw articles and its URL.
+        
+        Raises:
+            CategoryNotFoundError: If none of the categories exist. The ones that exist are filtered,
+                                   the others are logged and skipped, like in filter_la_times.
+        """
+        # Resolve the category names to the facets used in the search URL
+        facet = None
+        news_categories = as_list(news_category)
+        if news_categories:
+            logging.info(f"Selecting categories: {', '.join(news_categories)}")
+            facets = []
+            for category, found in zip(news_categories, self.search_client.find_categories(search_phrase, news_categories)):
+                if found is None:
+                    logging.error(f"Couldn't find the category {category} for this search")
+                else:
+                    facets.append(found)
+            if not facets:
+                raise CategoryNotFoundError(f"No category of {', '.join(news_categories)} for this search")
+            facet = facets[0] if len(facets) == 1 else facets
+        
+        count_pages = first_page
+        while True:
+            with self.tracer.span("page", page=count_pages) as span:
+                url = self.search_client.build_search_url(search_phrase, facet=facet, page=count_pages)
+                html = self.search_client.fetch(url)
+                
+                # Parse the page once, for its articles and its link to the next page
+                document = self.search_client.parse_html(html)
+                page_articles = self.search_client.parse_articles(document)
+                span["args"]["characters"] = len(html)
+                span["args"]["articles"] = len(page_articles)
+            
+            if count_pages == 1 and len(page_articles) == 0:
+                logging.error("There is no results for the search")
+                return
+            
+            yield count_pages, page_articles, url
+            
+            if not self.search_client.has_next_page(document):
+                logging.error(f"Can't load more news, reached page {count_pages}")
+                return
+            count_pages += 1
+
+
+    def scrape_news_la_times_http(self, search_phrase, months, news_category):
+        """
+        Scrape news articles from the LA Times website without a browser (see iter_la_times_http_pages).
+        
+        Args:
+            search_phrase (str): The phrase to search.
+            months (int): Number of months to go back, 0 or empty for no limit.
+            news_category (str or list): The category to filter, several ones filtered together, or empty for all.
+        
+        Returns:
+            list: The NewsResult records of the scraped news articles.
+        """
+        
+        results = []
+        try:
+            pages = self.resume_pages(lambda first_page: self.iter_la_times_http_pages(search_phrase, news_category, first_page))
+            return self.scrape_pages(pages, search_phrase, months, results)
+        except SeleniumError:
+            raise
+        except Exception as e:
+            logging.error(f"Failed to scrape news articles: {e}")
+            return results
+
+
+    def wait_for_downloads(self):
+        """
+        Wait for every scheduled image download to finish.
+
+        Returns:
+            tuple: Number of successful downloads and a list of (url, error) for the failed ones.
+        """
+        logging.info("Waiting for image downloads")
+        downloads = self.downloader.wait()
+        self.index_downloaded_articles()
+        return downloads
+
+
+    def index_downloaded_articles(self):
+        """
+        Index the articles scraped in this run whose image was saved, the ones still downloading are kept
+        for the next call. An article whose download failed isn't indexed, so the next run scrapes it again
+        instead of reusing a row without its picture.
+        """
+        downloading = []
+        for entry in self.unindexed:
+            query, article, result, image_filepath, download = entry
+            if download is not None and not download.done():
+                downloading.append(entry)
+            elif self.article_index is not None and (download is None or download.exception() is None):
+                self.article_index.add(query, article, result, image_filepath)
+        self.unindexed = downloading
+
+
+    def process_images(self, results):
+        """
+        Post-process the downloaded images of the results, in a process pool, and update their rows.
+        
+        Args:
+            results (list): The results, updated in place.
+        
+        Returns:
+            list: The results.
+        """
+        if self.image_processor is None:
+            return results
+        
+        logging.info("Processing images")
+        return self.image_processor.process_results(results, self.output_path)
+
+
+    def open_excel_stream(self):
+        """
+        Open the Excel file in the streaming mode, the results are written as they are scraped
+        instead of all together in save_news_data_to_excel, by a thread behind a bounded queue.
+        """
+        self.excel_stream = StreamingExcelWriter(self.excel_output_file, self.output_header())
+        self.excel_stage = WriterStage(self.excel_stream, max_pending=int(self.payload.get("writer_queue", 64) or 64))
+
+
+    def save_news_data_to_excel(self, results):
+        """
+        Save the scraped news data to an Excel file.
+        In the streaming mode the rows are already written, so only the missing ones are added before closing it.
+        
+        Args:
+            results (list): The NewsResult records of the scraped news.
+        """
+        
+        logging.info("Saving data to Excel")
+        
+        if self.excel_stream is not None:
+            # Wait for the writer thread, then add the rows it didn't get, which are all the results if it didn't keep them
+            self.excel_stage.close()
+            for result in (results[self.excel_stream.rows:] if self.keep_results else results):
+                self.excel_stream.append(result)
+            self.excel_stream.close()
+            return
+        
+        # Create a new workbook
+        self.excel.create_workbook(self.excel_output_file)
+        
+        # Append the header for the Excel sheet
+        self.excel.append_rows_to_worksheet([self.output_header()], header=False)
+        
+        # Append each result to the worksheet
+        for result in results:
+            self.excel.append_rows_to_worksheet([result.values()], header=False)
+            
+        # Save and close the workbook
+        self.excel.save_workbook()
+        self.excel.close_workbook()
+
+
+    def close_browser(self):
+        """
+        Close the browser instance.
+        """
+        # Nothing to close if the browser library was never used
+        if self.browser_library is None:
+            return
+        
+        try:
+            self.browser_open = False
+            self.browser.close_browser()
+            logging.info("Browser closed")
+        except Exception as e:
+            logging.error(f"Failed to close browser: {e}")
+            raise
+        finally:
+            self.browser_profile.release_slot()
+
+
+    def close(self):
+        """
+        Close the browser, the download pool and the HTTP client.
+        """
+        try:
+            self.close_browser()
+        finally:
+            self.downloader.close()
+            self.search_client.close()
+
+
+def scrape_query(scraper, adapter, engine, query, months):
+    """
+    Run one search of a query plan: search, filter and sort the site, then scrape its pages until the start date.
+
+    Args:
+        scraper (NewsScraper): The scraper, with the settings of the search applied by run_search.
+        adapter (SiteAdapter): The adapter of the site.
+        engine (str): "browser" or "http".
+        query (SearchQuery): The phrase and the categories of the search.
+        months (int): Number of months to go back, 0 or empty for no limit.
+
+    Returns:
+        list: The NewsResult records of the articles that the previous searches of the plan didn't find,
+              without the ones streamed to the Excel when they aren't kept (see run_search).
+
+    Raises:
+        SeleniumError: If the search fails in the site.
+    """
+    results = []
+    
+    if engine == "http":
+        # Scrape news articles from the LA Times without opening a browser
+        logging.info("Scraping LA Times over HTTP")
+        with scraper.tracer.span("scrape_news_la_times_http"):
+            return scraper.scrape_news_la_times_http(query.phrase, months, query.news_category)
+    
+    # Time to first search, for the first search of the plan: from the launch of the browser, or the warm one,
+    # to the first ordered results. The next searches of the plan are timed as "search_setup"
+    first = scraper.time_to_first_search is None
+    cold_start = not scraper.browser_open
+    name = "time_to_first_search" if first else "search_setup"
+    with scraper.tracer.span(name, profile=scraper.browser_profile.name, cold_start=cold_start) as first_search:
+        # Open, filter and order the site
+        logging.info(f"Opening {adapter.name}")
+        with scraper.tracer.span("search", site=adapter.name):
+            adapter.search(scraper, query.phrase)
+        
+        logging.info(f"Filtering categories in {adapter.name}")
+        with scraper.tracer.span("filter", category=query.category):
+            adapter.filter(scraper, query.news_category)
+        
+        logging.info(f"Ordering news in {adapter.name}")
+        with scraper.tracer.span("sort"):
+            has_results = adapter.sort(scraper)
+    
+    if first:
+        scraper.time_to_first_search = first_search["dur"] / 1000000
+        logging.info(f"Time to first search: {scraper.time_to_first_search:.2f}s "
+                     f"({scraper.browser_profile.name} profile, {'cold start' if cold_start else 'warm browser'})")
+    
+    if has_results:
+        # Only the sites paginated by URL can jump to the page after the journal
+        paginated_by_url = adapter.page_url(scraper.browser.get_location(), 2) is not None
+        if scraper.journal is not None and scraper.journal.pages and not paginated_by_url:
+            logging.warning(f"{adapter.name} can't jump to a page, starting the search again")
+            scraper.journal.restart()
+        
+        # Scrape the news, with the next pages loading in other tabs if asked and the site paginates by URL
+        prefetch = int(scraper.payload.get("prefetch_pages", 0) or 0)
+        with scraper.tracer.span("scrape_site", prefetch_pages=prefetch) as span:
+            if prefetch > 0 and paginated_by_url:
+                results = scraper.scrape_site_tabs(adapter, query.phrase, months, prefetch)
+            else:
+                results = scraper.scrape_site(adapter, query.phrase, months)
+            span["args"]["results"] = len(results)
+    
+    return results
+
+
+def run_search(scraper, search_phrase, months, news_category, engine = None, excel_writer = None, records = False, keep_results = None):
+    """
+    Run one search with the given scraper and save its Excel file.
+    The phrase and the category can be lists: the QueryPlan runs one site search per phrase, with every
+    category ticked in it when the site can, an article found by several searches is analysed and downloaded
+    once, and each row gets a "Count of <phrase>" column for every phrase.
+    The optional settings not given as arguments are read from scraper.payload:
+    when it has an "article_index" path, the run is incremental: the articles
+    scraped by previous runs of the same query are read from that SQLite index instead of the site.
+    When it has an "image_cache" folder, the images are kept there between runs and revalidated
+    with conditional requests, up to "image_cache_max_mb" megabytes (500 by default).
+    When it has "prefetch_pages" above 0, the browser engine loads that many next result pages
+    ahead in background tabs while the current one is scraped.
+    "block_requests" is true by default (the browser skips images, media, fonts and ads),
+    false to load everything, or a dictionary with "block_types", "deny" and "allow" changing the profile.
+    "site" is the site searched, "latimes" by default (see site_adapters.py); the http engine only supports LA Times.
+    "image_processing" is false by default, true or a dictionary of settings (see configure_image_processing)
+    to fix the image extensions, write resized WebP derivatives and keep one copy of the duplicated photos,
+    adding an "Image hash" column.
+    In the streaming mode the rows go to a writer thread through a queue of "writer_queue" rows (64 by default);
+    the pages are only loaded as fast as the analysis, the downloads and that writer keep up. The rows written
+    aren't kept, the search only keeps their number in scraper.result_count and the keys of the articles,
+    so its memory doesn't grow with the months searched. "keep_results" true keeps them to return them.
+    With "image_processing" the rows wait for the processed images and are all written at the end.
+    "checkpoint" is true by default: each page analysed is journaled in checkpoint.jsonl in the output folder
+    (checkpoint-<n>.jsonl for the n-th search of a plan),
+    and a run of the same search after a crash replays the journal and continues from the next page.
+    "request_scheduler" is a dictionary changing the limits of the shared RequestScheduler
+    ("rate", "burst", "retries", "backoff", "max_backoff", "failure_threshold", "reset_timeout").
+    "browser_profile" is true by default: a browser launched by the search is headless, with a fixed viewport
+    and a user data dir reused between runs; false launches the legacy headed browser with a fresh profile,
+    and a dictionary changes the fast profile (see BrowserProfile.from_settings). The time from the start
+    of the search to the first ordered results is logged and traced as "time_to_first_search".
+
+    Args:
+        scraper (NewsScraper): The scraper, with the state of the search reset.
+        search_phrase (str or list): The phrase to search, or several phrases.
+        months (int): Number of months to go back, 0 or empty for no limit.
+        news_category (str or list): The category to filter, several categories, or empty for all.
+        engine (str): "browser" to drive Chrome or "http" to fetch the pages without a browser.
+                      If None, it is read from the "engine" key of the payload, defaulting to "browser".
+        excel_writer (str): "streaming" to write each row to the Excel as it is scraped, or "rpa" to write them all at the end.
+                            If None, it is read from the "excel_writer" key of the payload, defaulting to "rpa".
+        records (bool): If True, the results are returned as NewsResult records instead of dictionaries.
+        keep_results (bool): If True, the rows streamed to the Excel are kept and returned too.
+                             If None, it is read from the "keep_results" key of the payload, defaulting to False.
+                             The rows written at the end are always returned.
+
+    Returns:
+        list: A list of dictionaries containing scraped news article data, keyed by the columns of the output.
+              Without the streamed rows when they aren't kept, see scraper.result_count for the number of rows.
+
+    Raises:
+        SeleniumError: If the search fails in the site.
+    """
+    results = []
+    
+    try:
+        if engine == None:
+            engine = scraper.payload.get("engine", "browser")
+        
+        if excel_writer == None:
+            excel_writer = scraper.payload.get("excel_writer", "rpa")
+        
+        # The rows streamed to the Excel are only counted, unless the caller needs them back
+        if keep_results == None:
+            keep_results = scraper.payload.get("keep_results", False)
+        scraper.keep_results = excel_writer != "streaming" or bool(keep_results)
+        
+        adapter = get_site_adapter(scraper.payload.get("site", "latimes"))
+        scraper.site_adapter = adapter
+        if engine == "http" and adapter.name != "latimes":
+            logging.warning(f"The http engine only supports LA Times, searching {adapter.name} with the browser")
+            engine = "browser"
+        
+        # Plan of the site searches: one per phrase, with every category ticked in it when the site can
+        plan = QueryPlan.create(search_phrase, news_category, adapter.category_filter)
+        scraper.count_phrases = plan.phrases
+        
+        os.makedirs(scraper.output_path, exist_ok=True)
+        scraper.configure_image_processing(scraper.payload.get("image_processing", False))
+        if excel_writer == "streaming":
+            scraper.open_excel_stream()
+        
+        # Images already downloaded by previous runs are revalidated instead of downloaded again
+        if scraper.payload.get("image_cache") and scraper.downloader.cache is None:
+            scraper.open_image_cache(scraper.payload["image_cache"], scraper.payload.get("image_cache_max_mb", 500))
+        
+        # Limits of the requests to each host, shared with the other searches of the process
+        if scraper.payload.get("request_scheduler"):
+            scraper.scheduler.configure(**scraper.payload["request_scheduler"])
+        
+        # Launch profile of the browser, which doesn't load images, media, fonts and ads unless "block_requests" is false
+        if engine != "http":
+            scraper.configure_browser_profile(scraper.payload.get("browser_profile", True))
+            scraper.configure_request_blocking(scraper.payload.get("block_requests", True))
+        
+        # Each search of the plan only adds the articles the previous ones didn't find
+        for number, query in enumerate(plan.queries, 1):
+            # Incremental run: only the articles newer than the last run of the query are scraped
+            if scraper.payload.get("article_index"):
+                scraper.open_article_index(scraper.payload["article_index"], adapter.name, query.phrase, query.category)
+            
+            # Journal of the pages, resumed if a previous run of the same search crashed
+            if scraper.payload.get("checkpoint", True):
+                name = "checkpoint.jsonl" if len(plan.queries) == 1 else f"checkpoint-{number}.jsonl"
+                scraper.open_journal(adapter.name, query.phrase, query.category, name)
+            
+            logging.info(f"Search {number} of {len(plan.queries)}: {query.phrase} in {query.category or 'all categories'}")
+            with scraper.tracer.span("query", phrase=query.phrase, category=query.category) as span:
+                found = scraper.result_count
+                query_results = scrape_query(scraper, adapter, engine, query, months)
+                span["args"]["results"] = scraper.result_count - found
+            results += query_results
+            
+            # Add the articles indexed in previous runs of an incremental search
+            results = scraper.merge_indexed_results(results, months)
+        
+        # If there are no results, create an Excel file with only the header
+        if scraper.result_count == 0: 
+            results.append(NewsResult.empty())
+            
+        # Join the image downloads before writing the output
+        with scraper.tracer.span("wait_for_downloads"):
+            scraper.wait_for_downloads()
+        
+        # Fix, resize and deduplicate the images before their filenames are written
+        if scraper.image_processor is not None:
+            with scraper.tracer.span("process_images", images=len(results)):
+                scraper.process_images(results)
+            
+        # Save the scraped news data to an Excel file
+        logging.debug("Saving Excel")
+        with scraper.tracer.span("save_news_data_to_excel", rows=scraper.result_count):
+            scraper.save_news_data_to_excel(results)
+        
+        # A search stopped before the end of its pages keeps its journal, so a retry continues it
+        for journal in scraper.journals:
+            if journal.ended:
+                journal.finish()
+            else:
+                logging.warning(f"The search stopped before its last page, {journal.path} is kept to resume it")
+        
+    finally:
+        # Keep the rows already streamed even if an error occurs
+        scraper.finish_search()
+    
+    # The records only become dictionaries when they leave the robot
+    if records:
+        return results
+    return [result.to_dict() for result in results]
+
+
+def scrape_news(Workitens = None, engine = None, excel_writer = None):
+    """
+    Main function to scrape news articles based on a search term and configuration.
+
+    Args:
+        Workitens (list): Search phrase, months and news category. If None, they are read from the work item.
+        engine (str): "browser" or "http", see run_search.
+        excel_writer (str): "streaming" or "rpa", see run_search.
+
+    Returns:
+        list: A list of dictionaries containing scraped news article data.
+    """
+        
+    # Initialize the NewsScraper with the provided configuration
+    logging.debug("Init NewsScraper")
+    scraper = NewsScraper()
+    results = []
+    
+    try:
+        # Get all the variables: from the WorkItems, or from parameters
+        logging.debug("Getting workitens")
+        if Workitens == None:
+            search_phrase, months, news_category = scraper.get_workitem() 
+        else:
+            search_phrase, months, news_category = Workitens 
+        
+        # The same search in several sites at the same time, each with its own browser
+        sites = scraper.payload.get("sites") or []
+        if len(sites) > 1:
+            # Imported here, multi_site imports this module
+            from multi_site import scrape_news_sites
+            payload = dict(scraper.payload, engine=engine) if engine else scraper.payload
+            results = scrape_news_sites(sites, search_phrase, months, news_category, payload)
+        else:
+            if len(sites) == 1:
+                scraper.payload["site"] = sites[0]
+            results = run_search(scraper, search_phrase, months, news_category, engine, excel_writer)
+        
+    except SeleniumError as e:
+        logging.error(f"Search operation failed: {e.message}")
+        
+    finally:
+        # Ensure the browser is closed even if an error occurs
+        scraper.close()
+        
+    # Return the results of the scraping process
+    return results
+
+
+if __name__ == "__main__":
+    
+    log_path = './output/rpa_news_scraper.log'
+    
+    # Imported here, the robot sets up its logging in main.py
+    from structured_logging import setup_logging
+    setup_logging(log_path, level = logging.INFO)
+    
+    scrape_news(['amazon', 1, 'Climate & Environment'])
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+Long-lived scraper service with warm browser sessions.
+
+A pool of NewsScraper sessions is started once, each with its browser already
+on the LA Times homepage. Searches are received on a local HTTP endpoint and
+run on an idle session, which goes back to the homepage between searches
+instead of relaunching the browser. A session is recycled (browser closed and
+opened again) after a number of searches, or when it stops answering.
+
+Endpoints:
+    POST /search  {"search_phrase": ..., "months": ..., "news_category": ..., "engine": ...}
+    GET  /health
+"""
+
+import os
+import json
+import time
+import queue
+import logging
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scraper import NewsScraper, SeleniumError, run_search
+
+
+class WarmSession:
+    def __init__(self, number, output_path='./output/service/'):
+        """
+        Initialize the WarmSession class.
+
+        Args:
+            number (int): Number of the session.
+            output_path (str): Folder where a subfolder is created for each search.
+        """
+        self.number = number
+        self.output_path = output_path
+        self.scraper = NewsScraper()
+        self.searches = 0
+        self.total_searches = 0
+        self.started_at = None
+
+        # Held while a search uses the browser, the driver isn't safe to use from two threads
+        self.lock = threading.Lock()
+
+
+    def warm(self):
+        """
+        Open the browser on the LA Times homepage.
+        """
+        self.scraper.open_la_times()
+        self.searches = 0
+        self.started_at = time.time()
+        logging.info(f"Session {self.number} warmed")
+
+
+    def recycle(self):
+        """
+        Close the browser and open it again.
+        """
+        logging.info(f"Recycling session {self.number} after {self.searches} searches")
+        try:
+            self.scraper.close_browser()
+        except Exception:
+            pass
+        self.warm()
+
+
+    def search(self, request):
+        """
+        Run a search on this session.
+
+        Args:
+            request (dict): The search_phrase, months and news_category, and the optional settings of a work item payload.
+
+        Returns:
+            dict: The number of results, the results and the path of the Excel file.
+        """
+        self.searches += 1
+        self.total_searches += 1
+
+        self.scraper.reset_search(os.path.join(self.output_path, f"{self.number}-{self.total_searches}", ''))
+        search_phrase, months, news_category = self.scraper.read_workitem_payload(request)
+        # The response returns the rows, so the streamed ones are kept too
+        results = run_search(self.scraper, search_phrase, months, news_category, keep_results=True)
+
+        count = len([result for result in results if result["Title"] != ''])
+        return {"count": count, "results": results, "excel": self.scraper.excel_output_file}
+
+
+    def health(self):
+        """
+        Get the state of the session. A busy session is reported as busy without probing its browser,
+        which its search is using.
+
+        Returns:
+            dict: The number of the session, whether it is busy, whether its browser answers (None while busy)
+                  and its searches.
+        """
+        busy = not self.lock.acquire(blocking=False)
+        if busy:
+            alive = None
+        else:
+            try:
+                alive = self.scraper.is_browser_alive()
+            finally:
+                self.lock.release()
+
+        return {
+            "session": self.number,
+            "busy": busy,
+            "alive": alive,
+            "searches": self.searches,
+            "total_searches": self.total_searches,
+            "uptime": round(time.time() - self.started_at, 1) if self.started_at else 0
+        }
+
+
+class ScraperService:
+    def __init__(self, sessions=1, max_searches=20, port=8765, wait_timeout=300):
+        """
+        Initialize the ScraperService class.
+
+        Args:
+            sessions (int): Number of warm browser sessions.
+            max_searches (int): Number of searches after which a session is recycled.
+            port (int): Local port of the HTTP endpoint.
+            wait_timeout (int): Seconds a search waits for an idle session before being refused.
+        """
+        self.max_searches = max(1, int(max_searches))
+        self.port = int(port)
+        self.wait_timeout = wait_timeout
+
+        self.sessions = [WarmSession(number) for number in range(1, max(1, int(sessions)) + 1)]
+        self.idle = queue.Queue()
+        self.server = None
+
+
+    def start(self):
+        """
+        Warm every session and start the HTTP endpoint.
+        """
+        for session in self.sessions:
+            session.warm()
+            self.idle.put(session)
+
+        handler = type("Handler", (ServiceRequestHandler,), {"service": self})
+        self.server = ThreadingHTTPServer(("127.0.0.1", self.port), handler)
+        logging.info(f"Scraper service listening on 127.0.0.1:{self.port} with {len(self.sessions)} sessions")
+
+
+    def serve_forever(self):
+        """
+        Serve the requests until the service is stopped.
+        """
+        try:
+            self.server.serve_forever()
+        finally:
+            self.stop()
+
+
+    def stop(self):
+        """
+        Stop the HTTP endpoint and close every session.
+        """
+        if self.server is not None:
+            self.server.server_close()
+
+        for session in self.sessions:
+            try:
+                session.scraper.close()
+            except Exception as e:
+                logging.error(f"Failed to close session {session.number}: {e}")
+
+
+    def search(self, request):
+        """
+        Run a search on the first idle session.
+
+        Args:
+            request (dict): The search_phrase, months and news_category, and the optional settings.
+
+        Returns:
+            dict: The number of results, the results and the path of the Excel file.
+
+        Raises:
+            queue.Empty: If no session gets idle before the timeout.
+        """
+        session = self.idle.get(timeout=self.wait_timeout)
+        try:
+            with session.lock:
+                # A session that stopped answering or served too many searches starts again from a fresh browser
+                if session.searches >= self.max_searches or not session.scraper.is_browser_alive():
+                    session.recycle()
+
+                start = time.perf_counter()
+                response = session.search(request)
+            response["seconds"] = round(time.perf_counter() - start, 3)
+            response["session"] = session.number
+            return response
+        finally:
+            self.idle.put(session)
+
+
+    def health(self):
+        """
+        Get the state of every session.
+
+        Returns:
+            dict: Whether every session is alive or busy searching, the number of idle sessions and the state of each one.
+        """
+        sessions = [session.health() for session in self.sessions]
+        healthy = all(session["busy"] or session["alive"] for session in sessions)
+        return {"healthy": healthy, "idle": self.idle.qsize(), "sessions": sessions}
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def send_json(self, status, body):
+        data = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            health = self.service.health()
+            self.send_json(200 if health["healthy"] else 503, health)
+        else:
+            self.send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path != "/search":
+            self.send_json(404, {"error": "Not found"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            self.send_json(200, self.service.search(request))
+        except (ValueError, KeyError) as e:
+            self.send_json(400, {"error": f"Invalid search request: {e}"})
+        except queue.Empty:
+            self.send_json(503, {"error": "No browser session available"})
+        except SeleniumError as e:
+            self.send_json(502, {"error": e.message})
+        except Exception as e:
+            logging.error(f"Search failed: {e}")
+            self.send_json(500, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        logging.info(f"{self.address_string()} - {format % args}")
+
+
+def run_service(sessions=None, max_searches=None, port=None):
+    """
+    Start the scraper service and serve until it is stopped.
+
+    Args:
+        sessions (int): Number of warm browser sessions, NEWS_SCRAPER_SESSIONS if None, 1 by default.
+        max_searches (int): Searches before a session is recycled, NEWS_SCRAPER_MAX_SEARCHES if None, 20 by default.
+        port (int): Local port of the HTTP endpoint, NEWS_SCRAPER_PORT if None, 8765 by default.
+    """
+    if sessions == None:
+        sessions = int(os.environ.get("NEWS_SCRAPER_SESSIONS", 1))
+    if max_searches == None:
+        max_searches = int(os.environ.get("NEWS_SCRAPER_MAX_SEARCHES", 20))
+    if port == None:
+        port = int(os.environ.get("NEWS_SCRAPER_PORT", 8765))
+
+    service = ScraperService(sessions, max_searches, port)
+    service.start()
+    service.serve_forever()
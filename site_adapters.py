@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+Site adapters: what the scraper has to know about each news site.
+
+An adapter declares how to search, filter by category, sort by the newest,
+read the raw articles of the current results page and go to the next page of
+one site. Everything else (date cutoff, phrase counting, money detection, image
+download, index and Excel output) is the shared pipeline of NewsScraper, which
+calls the adapter through NewsScraper.scrape_site. Each adapter runs on its own
+NewsScraper, so several sites can be scraped at the same time (see multi_site.py).
+
+The raw articles are dictionaries with the title, description, date, image_url
+and url of each article, None when the site doesn't show the field.
+"""
+
+import logging
+
+from abc import ABC, abstractmethod
+from urllib.parse import urlencode, urlsplit, urlunsplit, parse_qsl
+
+
+class SiteAdapter(ABC):
+    # Name of the site in the "site" and "sites" keys of the payload
+    name = None
+    home_url = None
+
+    # How the site filters the categories, for the query planner: None when it doesn't,
+    # "single" for one category per search, "multiple" for several ones ticked in the same search
+    category_filter = None
+
+    @abstractmethod
+    def search(self, scraper, search_phrase):
+        """
+        Open the site and search a phrase.
+
+        Args:
+            scraper (NewsScraper): The scraper, with its browser.
+            search_phrase (str): The phrase to search.
+
+        Raises:
+            SeleniumError: If the search fails.
+        """
+
+
+    def filter(self, scraper, news_category):
+        """
+        Filter the results by a category, nothing to do when the category is empty.
+
+        Args:
+            scraper (NewsScraper): The scraper, with its browser.
+            news_category (str or list): The category to filter, or several ones when category_filter is "multiple".
+
+        Raises:
+            SeleniumError: If the category doesn't exist.
+        """
+        if news_category:
+            logging.warning(f"{self.name} doesn't filter by category, ignoring {news_category}")
+
+
+    @abstractmethod
+    def sort(self, scraper):
+        """
+        Sort the results by the newest.
+
+        Args:
+            scraper (NewsScraper): The scraper, with its browser.
+
+        Returns:
+            bool: True if there are results, False if the search has no results.
+
+        Raises:
+            SeleniumError: If the results can't be sorted.
+        """
+
+
+    @abstractmethod
+    def read_page(self, scraper, page):
+        """
+        Wait for the current results page and read its raw articles.
+
+        Args:
+            scraper (NewsScraper): The scraper, with its browser.
+            page (int): Number of the page, for the logging.
+
+        Returns:
+            list: The raw articles, or None if the page has no results.
+
+        Raises:
+            SeleniumError: If the page doesn't load.
+        """
+
+
+    @abstractmethod
+    def next_page(self, scraper, page):
+        """
+        Go to the next results page.
+
+        Args:
+            scraper (NewsScraper): The scraper, with its browser.
+            page (int): Number of the current page.
+
+        Returns:
+            bool: True if there is a next page, otherwise False.
+        """
+
+
+    def page_url(self, url, page):
+        """
+        Get the URL of another results page of the same search, used to load the next pages in other tabs.
+
+        Args:
+            url (str): URL of a results page.
+            page (int): 1-based page number.
+
+        Returns:
+            str: The URL of the page, or None if the site doesn't paginate by URL.
+        """
+        return None
+
+
+class LATimesAdapter(SiteAdapter):
+    name = "latimes"
+    home_url = "https://www.latimes.com/"
+    category_filter = "multiple"
+
+    def search(self, scraper, search_phrase):
+        scraper.open_la_times_and_search(search_phrase)
+
+    def filter(self, scraper, news_category):
+        scraper.filter_la_times(news_category)
+
+    def sort(self, scraper):
+        return scraper.order_la_times()
+
+    def read_page(self, scraper, page):
+        return scraper.read_page_la_times(page)
+
+    def next_page(self, scraper, page):
+        return scraper.next_page_la_times(page)
+
+    def page_url(self, url, page):
+        # The page is the "p" query parameter of the search
+        parts = urlsplit(url)
+        query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != "p"]
+        query.append(("p", str(page)))
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+class APNewsAdapter(SiteAdapter):
+    name = "apnews"
+    home_url = "https://apnews.com/"
+
+    # XPaths of the search results page, from the first version of scrape_news_ap_news
+    articles_xpath = "//div[@class='SearchResultsModule-results']//div[contains(@class, 'PageList-items-item')]"
+    no_results_xpath = "//div[contains(@class, 'SearchResultsModule-noResults')]"
+    order_xpath = "//select[@class='Select-input']"
+    next_page_xpath = "//div[contains(@class, 'Pagination-nextPage')]/a"
+    fields = {
+        "title": ".//div[@class='PagePromo-title']//span",
+        "description": ".//div[@class='PagePromo-description']//span",
+        "date": ".//span[@class='Timestamp-template']",
+        "image_url": ".//div[@class='PagePromo-media']//img/@src",
+        "url": ".//div[@class='PagePromo-title']//a/@href"
+    }
+
+    def __init__(self):
+        # Whether the results were just replaced, the next page read waits for new ones
+        self.reloading = False
+
+    def search(self, scraper, search_phrase):
+        # The search page is reached by URL, the site has no search form to fill
+        scraper.open_site(self.home_url)
+        logging.info(f"Performing the search for {search_phrase}")
+        scraper.navigate(f"{self.home_url}search?{urlencode({'q': search_phrase})}")
+
+    def sort(self, scraper):
+        outcome = scraper.wait_for_results(self.no_results_xpath, f"{self.articles_xpath}[1]", "sort")
+        if outcome == "no_results":
+            logging.error("There is no results for the search")
+            return False
+
+        # The results keep the relevance order if there is no sort box
+        try:
+            scraper.waiter.mark(f"{self.articles_xpath}[1]")
+            scraper.browser.select_from_list_by_label(self.order_xpath, "Newest")
+            self.reloading = True
+        except Exception as e:
+            logging.warning(f"Couldn't sort {self.name} by the newest: {e}")
+        return True
+
+    def read_page(self, scraper, page):
+        outcome = scraper.wait_for_results(self.no_results_xpath, f"{self.articles_xpath}[1]", f"page {page}", fresh=self.reloading)
+        self.reloading = False
+        if outcome == "no_results":
+            return None
+        return scraper.extract_articles_by_xpath(self.articles_xpath, self.fields)
+
+    def next_page(self, scraper, page):
+        try:
+            scraper.waiter.mark(f"{self.articles_xpath}[1]")
+            scraper.browser.click_element(self.next_page_xpath)
+            self.reloading = True
+            return True
+        except Exception:
+            return False
+
+
+def get_site_adapter(name):
+    """
+    Get the adapter of a site.
+
+    Args:
+        name (str): Name of the site, "latimes" or "apnews".
+
+    Returns:
+        SiteAdapter: A new adapter of the site.
+
+    Raises:
+        ValueError: If there is no adapter for the site.
+    """
+    adapters = {adapter.name: adapter for adapter in [LATimesAdapter, APNewsAdapter]}
+    if name not in adapters:
+        raise ValueError(f"No adapter for the site {name}, the sites are: {', '.join(adapters)}")
+    return adapters[name]()
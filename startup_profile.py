@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Startup profile of a robot run, in the format of `python -X importtime`.
+
+The profiler wraps the import statement from the moment it is installed, and
+records the self and cumulative time of each module loaded for the first time,
+nested under the module that imported it. Named marks (task started, task
+finished) are kept with their time since the install. The profile is written
+to the artifacts of each run, so a slow cold start can be traced to the import
+that caused it. Modules loaded by importlib.import_module without an import
+statement are counted in the time of their importer.
+"""
+
+import sys
+import time
+import logging
+import builtins
+import threading
+
+
+class StartupProfiler:
+    def __init__(self):
+        """
+        Initialize the StartupProfiler class, the times are relative to its creation.
+        """
+        self.start = time.perf_counter()
+        self.original_import = None
+        self.records = []
+        self.marks = []
+        self.lock = threading.Lock()
+
+        # Time of the children of each import in progress, per thread
+        self.local = threading.local()
+
+
+    def install(self):
+        """
+        Start recording the imports.
+        """
+        if self.original_import is None:
+            self.original_import = builtins.__import__
+            builtins.__import__ = self.profiled_import
+
+
+    def uninstall(self):
+        """
+        Stop recording the imports.
+        """
+        if self.original_import is not None:
+            builtins.__import__ = self.original_import
+            self.original_import = None
+
+
+    def new_modules(self, name, globals, fromlist, level):
+        """
+        Get the modules an import statement will load for the first time.
+
+        Args:
+            name (str): The module imported.
+            globals (dict): The globals of the importer, for the relative imports.
+            fromlist (tuple): The names imported from the module.
+            level (int): The level of a relative import, 0 for an absolute one.
+
+        Returns:
+            list: The names of the modules not loaded yet, empty if everything is loaded.
+        """
+        if level:
+            package = (globals or {}).get("__package__") or ""
+            base = package.rsplit(".", level - 1)[0] if level > 1 else package
+            name = f"{base}.{name}" if name else base
+
+        module = sys.modules.get(name)
+        if module is None:
+            return [name]
+
+        # "from package import module" loads the submodules that aren't attributes yet
+        return [f"{name}.{item}" for item in (fromlist or ()) if item != "*" and not hasattr(module, item)]
+
+
+    def profiled_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        try:
+            modules = self.new_modules(name, globals, fromlist, level)
+        except Exception:
+            modules = []
+        if not modules:
+            return self.original_import(name, globals, locals, fromlist, level)
+
+        stack = self.local.__dict__.setdefault("stack", [])
+        depth = len(stack)
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self.original_import(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += cumulative
+            with self.lock:
+                self.records.append((depth, ", ".join(modules), cumulative - children, cumulative))
+
+
+    def mark(self, name):
+        """
+        Keep the time of a point of the run.
+
+        Args:
+            name (str): Name of the point, as "task started".
+        """
+        seconds = time.perf_counter() - self.start
+        with self.lock:
+            self.marks.append((name, seconds))
+        logging.info(f"Startup: {name} after {seconds:.3f}s")
+
+
+    def slowest(self, count=10):
+        """
+        Get the slowest top-level imports.
+
+        Args:
+            count (int): Number of imports.
+
+        Returns:
+            list: Tuples of (module, cumulative seconds), the slowest first.
+        """
+        with self.lock:
+            top = [(name, cumulative) for depth, name, own, cumulative in self.records if depth == 0]
+        return sorted(top, key=lambda record: record[1], reverse=True)[:count]
+
+
+    def report(self):
+        """
+        Get the profile as text: the imports as printed by -X importtime, then the marks.
+
+        Returns:
+            str: The profile.
+        """
+        with self.lock:
+            records = list(self.records)
+            marks = list(self.marks)
+
+        lines = ["import time: self [us] | cumulative | imported package"]
+        for depth, name, own, cumulative in records:
+            lines.append(f"import time: {own * 1000000:9.0f} | {cumulative * 1000000:10.0f} | {'  ' * depth}{name}")
+
+        lines.append("")
+        lines.append("mark: seconds | name")
+        for name, seconds in marks:
+            lines.append(f"mark: {seconds:7.3f} | {name}")
+        return "\n".join(lines) + "\n"
+
+
+    def write(self, path):
+        """
+        Write the profile to a file, and log the slowest imports.
+
+        Args:
+            path (str): Path of the file.
+        """
+        with open(path, "w") as file:
+            file.write(self.report())
+
+        slowest = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in self.slowest(5))
+        logging.info(f"Startup profile written to {path}, slowest imports: {slowest}")
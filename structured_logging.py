@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Non-blocking structured logging of the robot.
+
+The log records don't go to the file in the thread that logs them: a
+QueueHandler puts them in a queue, and a QueueListener thread formats them and
+writes them to rpa_news_scraper.log, one JSON object per line. The message is
+formatted by the listener too, so a record logged with lazy arguments
+(logging.info("Scraped %s", title)) costs the scrape loop only the creation of
+the record, and nothing at all when its level is filtered.
+
+Each record gets the stage it was logged in, the innermost tracer span open in
+its thread (see tracing.current_stage), and the "event" and "article" fields
+given in its extra. The records of a high-volume event (one per article or per
+image) are sampled: only the first ones of each second are written, and the
+next record written says how many were left out.
+"""
+
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+from tracing import current_stage
+
+
+class JsonFormatter(logging.Formatter):
+    # Attributes of the records written when they are set, from the extra of the logging call or the handler
+    fields = ("stage", "event", "article", "page", "url", "suppressed")
+
+    def format(self, record):
+        """
+        Format a record as a JSON object on one line.
+
+        Args:
+            record (logging.LogRecord): The record.
+
+        Returns:
+            str: The JSON object.
+        """
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage()
+        }
+        for field in self.fields:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["error"] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class EventSampler(logging.Filter):
+    def __init__(self, rate=10, interval=1.0):
+        """
+        Initialize the EventSampler class.
+
+        Args:
+            rate (int): Records of each event written per interval, the next ones are left out.
+            interval (float): Length of the interval in seconds.
+        """
+        super().__init__()
+        self.rate = rate
+        self.interval = interval
+
+        # Start of the current interval, records written and records left out, by event
+        self.windows = {}
+        self.suppressed = {}
+        self.lock = threading.Lock()
+
+
+    def filter(self, record):
+        """
+        Check if a record is written. The records without an "event" are always written.
+
+        Args:
+            record (logging.LogRecord): The record.
+
+        Returns:
+            bool: True if the record is written.
+        """
+        event = getattr(record, "event", None)
+        if event is None:
+            return True
+
+        now = time.monotonic()
+        with self.lock:
+            window = self.windows.get(event)
+            if window is None or now - window[0] >= self.interval:
+                # The first record of an interval tells how many the previous one left out
+                if window is not None and window[2]:
+                    record.suppressed = window[2]
+                window = self.windows[event] = [now, 0, 0]
+
+            if window[1] >= self.rate:
+                window[2] += 1
+                self.suppressed[event] = self.suppressed.get(event, 0) + 1
+                return False
+
+            window[1] += 1
+            return True
+
+
+class StageQueueHandler(QueueHandler):
+    def prepare(self, record):
+        """
+        Add the stage to a record before it is queued, leaving the message to the listener.
+        QueueHandler.prepare would format the message in the thread that logs.
+
+        Args:
+            record (logging.LogRecord): The record.
+
+        Returns:
+            logging.LogRecord: The record.
+        """
+        if getattr(record, "stage", None) is None:
+            record.stage = current_stage()
+        return record
+
+
+class LogPipeline:
+    # Pipeline of the process, set by setup_logging
+    active = None
+
+    def __init__(self, log_path, level=logging.INFO, sample_rate=10):
+        """
+        Initialize the LogPipeline class and start its listener thread.
+
+        Args:
+            log_path (str): Path of the log file.
+            level (int): Level of the root logger.
+            sample_rate (int): Records of each high-volume event written per second.
+        """
+        self.log_path = log_path
+        self.queue = queue.SimpleQueue()
+
+        file_handler = logging.FileHandler(log_path, encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter())
+        self.listener = QueueListener(self.queue, file_handler, respect_handler_level=True)
+
+        self.sampler = EventSampler(rate=sample_rate)
+        self.handler = StageQueueHandler(self.queue)
+        self.handler.addFilter(self.sampler)
+
+        self.root = logging.getLogger()
+        self.root.setLevel(level)
+        self.root.addHandler(self.handler)
+        self.listener.start()
+
+
+    def stop(self):
+        """
+        Log the records left out by the sampling, write the queued records and stop the listener.
+        """
+        for event, count in sorted(self.sampler.suppressed.items()):
+            logging.info(f"Sampled out {count} {event} records")
+
+        self.root.removeHandler(self.handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+
+def setup_logging(log_path, level=logging.INFO, sample_rate=10):
+    """
+    Send the logs of the process to a JSON log file through the background listener.
+    Calling it again with the same file keeps the running pipeline.
+
+    Args:
+        log_path (str): Path of the log file.
+        level (int): Level of the root logger.
+        sample_rate (int): Records of each high-volume event written per second.
+
+    Returns:
+        LogPipeline: The pipeline, stopped at the exit of the process.
+    """
+    if LogPipeline.active is not None:
+        if LogPipeline.active.log_path == log_path:
+            return LogPipeline.active
+        stop_logging()
+
+    LogPipeline.active = LogPipeline(log_path, level, sample_rate)
+    return LogPipeline.active
+
+
+def stop_logging():
+    """
+    Write the queued records and stop the listener, nothing to do if the logging isn't set up.
+    """
+    if LogPipeline.active is not None:
+        LogPipeline.active.stop()
+        LogPipeline.active = None
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Microbenchmark of the date parsing: the original trial loop over the 34 formats
+against DateParser (shape dispatch, with and without the cache).
+
+Run from the repository root: python test/date_parser-benchmark.py
+"""
+
+import os
+import sys
+import timeit
+
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from date_parser import DateParser
+
+date_formats = ["%d/%m/%Y", "%d.%m.%Y", "%m/%d/%Y", "%Y-%m-%d", "%d-%m-%Y", "%B %d, %Y", "%b %d, %Y", "%d %B %Y", "%d %b %Y", "%Y/%m/%d", "%Y.%m.%d", "%Y %b %d", "%Y %B %d", "%A, %d %B %Y", "%a, %d %b %Y", "%A, %B %d, %Y", "%a, %b %d, %Y", "%d/%m/%y", "%m/%d/%y", "%y-%m-%d", "%d-%m-%y", "%Y.%m.%d %H:%M:%S", "%d.%m.%Y %H:%M", "%d/%m/%Y %H:%M", "%m-%d-%Y %H:%M", "%d %B %Y %H:%M", "%d %b %Y %H:%M", "%Y/%m/%d %H:%M:%S", "%Y %b %d %H:%M", "%d-%m-%Y %H:%M:%S", "%A, %d %B %Y %H:%M", "%a, %d %b %Y %H:%M", "%b. %d, %Y", "%b %d, %Y"]
+
+def parse_date_legacy(date_str):
+    date = None
+    for date_format in date_formats:
+        try:
+            date = datetime.strptime(date_str, date_format)
+        except ValueError:
+            continue
+    return date
+
+# A page of LA Times timestamps, most of them repeated as in a real search
+test_dates = ["July 29, 2024", "July 28, 2024", "Sep. 20, 2024", "June 2, 2024", "2024-07-29", "Jul 29, 2024"] * 50
+
+number = 20
+legacy = timeit.timeit(lambda: [parse_date_legacy(d) for d in test_dates], number=number)
+
+parser = DateParser(date_formats, cache_size=0)
+uncached = timeit.timeit(lambda: [parser.parse(d) for d in test_dates], number=number)
+
+parser = DateParser(date_formats)
+cached = timeit.timeit(lambda: [parser.parse(d) for d in test_dates], number=number)
+
+total = len(test_dates) * number
+for name, seconds in [("Legacy loop", legacy), ("Shape dispatch", uncached), ("Shape dispatch + cache", cached)]:
+    print(f'{name}:')
+    print(f'\t\t-> {total / seconds:,.0f} dates/s ({legacy / seconds:.1f}x)')
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the Excel output: RPA.Excel.Files appending one row per call, as in
+save_news_data_to_excel, against the StreamingExcelWriter. Each case runs in its
+own process so the peak RSS is measured separately.
+
+Run from the repository root: python test/excel_writer-benchmark.py [rows ...]
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+import tempfile
+import subprocess
+
+ROOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT_PATH)
+
+from news_result import NewsResult
+
+header = ["Title", "Date", "Description", "Picture filename", "Count of search", "Contains money"]
+
+def make_result(i):
+    return NewsResult(f"Amazon opens warehouse number {i} in the Inland Empire", "2024-07-29",
+                      f"The site number {i} cost $120 million to build and will employ 1,000 people, the company said.",
+                      f"amazon-warehouse-{i}.jpg", 1, True)
+
+def run_rpa(rows, output_file):
+    from RPA.Excel.Files import Files
+    excel = Files()
+    excel.create_workbook(output_file)
+    excel.append_rows_to_worksheet([header], header=False)
+    for i in range(rows):
+        excel.append_rows_to_worksheet([make_result(i).values()], header=False)
+    excel.save_workbook()
+    excel.close_workbook()
+
+def run_streaming(rows, output_file):
+    from excel_writer import StreamingExcelWriter
+    writer = StreamingExcelWriter(output_file, header)
+    for i in range(rows):
+        writer.append(make_result(i))
+    writer.close()
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+if len(sys.argv) == 4 and sys.argv[1] == "--run":
+    # Child process: run one case and print its measures as JSON
+    mode, rows = sys.argv[2], int(sys.argv[3])
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        {"rpa": run_rpa, "streaming": run_streaming}[mode](rows, os.path.join(folder, "News.xlsx"))
+        seconds = time.perf_counter() - start
+    print(json.dumps({"rows_per_second": rows / seconds, "peak_rss_mb": peak_rss_mb()}))
+    sys.exit(0)
+
+test_rows = [int(rows) for rows in sys.argv[1:]] or [10000, 100000]
+
+for rows in test_rows:
+    for mode in ["rpa", "streaming"]:
+        child = subprocess.run([sys.executable, __file__, "--run", mode, str(rows)], capture_output=True, text=True)
+        print(f'{mode} - {rows} rows:')
+        if child.returncode != 0:
+            print(f'\t\t-> failed: {child.stderr.strip().splitlines()[-1]}')
+            continue
+        measures = json.loads(child.stdout)
+        print(f'\t\t-> {measures["rows_per_second"]:,.0f} rows/s, peak RSS {measures["peak_rss_mb"]:.1f} MB')
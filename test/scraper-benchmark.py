@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+Offline benchmark suite of the scraper.
+
+Runs the pure functions of NewsScraper (parse_date, fix_date,
+count_string_in_text, has_money_in_text, make_valid_filename + add_extension)
+and the Excel save over large synthetic corpora, and an end-to-end search with
+the http engine against a local server that serves pages built from the saved
+HTML fixtures, with the images served locally too. Nothing reaches the network.
+
+For each case it reports the operations per second (articles per second for the
+end-to-end search) and the peak Python memory measured with tracemalloc, and
+compares them against the stored baseline. The baseline depends on the machine,
+save it once with --save-baseline before comparing changes.
+
+Run from the repository root:
+    python test/scraper-benchmark.py [--quick] [--save-baseline] [--baseline PATH] [--tolerance 0.2]
+
+It exits with 1 when a case is slower than the baseline by more than the tolerance.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+import threading
+import tracemalloc
+
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TEST_PATH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_PATH, ".."))
+
+from scraper import NewsScraper, run_search
+from la_times_http import LATimesSearchClient
+from news_result import NewsResult
+from request_scheduler import RequestScheduler
+
+DEFAULT_BASELINE = os.path.join(TEST_PATH, "benchmark-baseline.json")
+
+# Synthetic corpora, always the same for the same size
+def make_corpus(size):
+    generator = random.Random(42)
+    subjects = ["Amazon", "The city council", "Disney", "A Los Angeles startup", "The Dodgers", "Caltrans", "SpaceX"]
+    verbs = ["opens", "cancels", "announces", "delays", "sells", "buys", "approves"]
+    objects = ["a new warehouse", "the stadium deal", "a $120 million plan", "its streaming service", "the 405 project",
+               "a USD 5,000 bonus", "a rocket launch", "$1.5 billion in bonds", "25 dollars tickets", "a new park"]
+    months = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December"]
+    short_months = ["Jan.", "Feb.", "March", "April", "May", "June", "July", "Aug.", "Sept.", "Oct.", "Nov.", "Dec."]
+
+    titles = []
+    descriptions = []
+    dates = []
+    filenames = []
+    for i in range(size):
+        title = f"{generator.choice(subjects)} {generator.choice(verbs)} {generator.choice(objects)}"
+        description = f"{title}, officials said. {generator.choice(subjects)} {generator.choice(verbs)} {generator.choice(objects)} after {i} days."
+        titles.append(title)
+        descriptions.append(description)
+
+        shape = i % 5
+        if shape == 0:
+            dates.append(f"{generator.choice(months)} {generator.randint(1, 28)}, {generator.randint(2015, 2024)}")
+        elif shape == 1:
+            dates.append(f"{generator.choice(short_months)} {generator.randint(1, 28)}, {generator.randint(2015, 2024)}")
+        elif shape == 2:
+            dates.append(f"{generator.randint(1, 59)} minutes ago")
+        elif shape == 3:
+            dates.append(f"{generator.randint(1, 23)} hours ago")
+        else:
+            dates.append(f"{generator.randint(2015, 2024)}-{generator.randint(1, 12):02d}-{generator.randint(1, 28):02d}")
+
+        filenames.append(f"https%3A%2F%2Fcalifornia-times-brightspot.s3.amazonaws.com%2F{i % 97:02x}%2F{title.replace(' ', '-')}?w={i}")
+
+    return {"titles": titles, "descriptions": descriptions, "dates": dates, "filenames": filenames}
+
+def make_results(corpus):
+    return [NewsResult(title, "2024-07-29", description, f"image-{i}.jpg", 1, "$" in description)
+            for i, (title, description) in enumerate(zip(corpus["titles"], corpus["descriptions"]))]
+
+# Local LA Times: the search pages are built from the saved fixture, with the images served by the same server
+def load_page_template():
+    with open(os.path.join(TEST_PATH, "fixtures", "la_times_search_page_1.html"), encoding="utf-8") as file:
+        page = file.read()
+
+    results_start = page.index('<ul class="search-results-module-results-menu">')
+    results_start = page.index("\n", results_start) + 1
+    results_end = page.index("    </ul>\n    <div class=\"search-results-module-pagination\">")
+    return page[:results_start], page[results_end:page.index("<div class=\"search-results-module-page-counts\">")]
+
+ARTICLE_TEMPLATE = """      <li>
+        <ps-promo class="promo">
+          <div class="promo-wrapper">
+            <div class="promo-media"><a class="link" href="/story/{page}/{index}"><picture><img class="image" src="{server}/images/{page}-{index}?url=amazon-{page}-{index}.jpg"></picture></a></div>
+            <div class="promo-content">
+              <div class="promo-title-container"><h3 class="promo-title"><a class="link" href="/story/{page}/{index}">{title}</a></h3></div>
+              <p class="promo-description">{description}</p>
+              <p class="promo-timestamp">{date}</p>
+            </div>
+          </div>
+        </ps-promo>
+      </li>
+"""
+
+class LocalLATimesHandler(BaseHTTPRequestHandler):
+    server_url = None
+    head = None
+    tail = None
+    corpus = None
+    pages = 10
+    articles_per_page = 10
+    image = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 16
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path.startswith("/images/"):
+            self.send_body(self.image, "image/jpeg")
+            return
+
+        page = int(parse_qs(parts.query).get("p", ["1"])[0])
+        articles = []
+        for index in range(self.articles_per_page):
+            number = ((page - 1) * self.articles_per_page + index) % len(self.corpus["titles"])
+            articles.append(ARTICLE_TEMPLATE.format(server=self.server_url, page=page, index=index,
+                                                    title=self.corpus["titles"][number],
+                                                    description=self.corpus["descriptions"][number],
+                                                    date=f"July {28 - page}, 2024"))
+
+        pagination = f'<div class="search-results-module-page-counts">{page} of {self.pages}</div>\n'
+        if page < self.pages:
+            pagination += f'      <div class="search-results-module-next-page"><a href="/search?q=amazon&amp;s=1&amp;p={page + 1}">Next</a></div>\n'
+        body = self.head + "".join(articles) + self.tail + pagination + "    </div>\n  </div>\n</body>\n</html>\n"
+        self.send_body(body.encode("utf-8"), "text/html; charset=utf-8")
+
+    def send_body(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_local_la_times(corpus, pages, articles_per_page):
+    head, tail = load_page_template()
+    handler = type("Handler", (LocalLATimesHandler,), {"head": head, "tail": tail, "corpus": corpus,
+                                                      "pages": pages, "articles_per_page": articles_per_page})
+    # The default backlog of 5 drops connections when the download workers connect together
+    server_class = type("Server", (ThreadingHTTPServer,), {"request_queue_size": 64})
+    server = server_class(("127.0.0.1", 0), handler)
+    handler.server_url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, handler.server_url
+
+# Cases, each returns the number of operations it did
+def bench_parse_date(scraper, corpus):
+    dates = [scraper.fix_date(date) for date in corpus["dates"]]
+    return lambda: len([scraper.parse_date(date) for date in dates])
+
+def bench_fix_date(scraper, corpus):
+    return lambda: len([scraper.fix_date(date) for date in corpus["dates"]])
+
+def bench_count_string_in_text(scraper, corpus):
+    texts = [f"{title} {description}" for title, description in zip(corpus["titles"], corpus["descriptions"])]
+    return lambda: len([scraper.count_string_in_text(text, "amazon") for text in texts])
+
+def bench_has_money_in_text(scraper, corpus):
+    texts = [f"{title} {description}" for title, description in zip(corpus["titles"], corpus["descriptions"])]
+    return lambda: len([scraper.has_money_in_text(text) for text in texts])
+
+def bench_make_valid_filename(scraper, corpus):
+    return lambda: len([scraper.add_extension(scraper.make_valid_filename(filename)) for filename in corpus["filenames"]])
+
+def bench_excel(excel_writer):
+    def setup(scraper, corpus):
+        results = make_results(corpus)
+        folder = tempfile.mkdtemp()
+
+        def run():
+            scraper.reset_search(os.path.join(folder, ""))
+            scraper.payload = {"excel_writer": excel_writer}
+            if excel_writer == "streaming":
+                scraper.open_excel_stream()
+            scraper.save_news_data_to_excel(results)
+            return len(results)
+        run.cleanup = lambda: shutil.rmtree(folder)
+        return run
+    return setup
+
+def bench_end_to_end(scraper, corpus, pages, articles_per_page):
+    server, server_url = start_local_la_times(corpus, pages, articles_per_page)
+    scraper.search_client.close()
+    scraper.search_client = LATimesSearchClient(base_url=server_url + "/")
+
+    # The local server has no rate limit, only the overhead of the scheduler is measured
+    scraper.scheduler = RequestScheduler(rate=100000, burst=100000)
+    scraper.downloader.scheduler = scraper.scheduler
+    scraper.search_client.scheduler = scraper.scheduler
+    folder = tempfile.mkdtemp()
+
+    def run():
+        scraper.reset_search(os.path.join(folder, ""))
+        scraper.payload = {"engine": "http", "excel_writer": "streaming"}
+        run_search(scraper, "amazon", 0, "")
+        return scraper.result_count
+
+    def cleanup():
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(folder)
+    run.cleanup = cleanup
+    return run
+
+def measure(run, repeat):
+    # Best time of the repeats, then one more run under tracemalloc for the peak memory
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operations = run()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {"ops_per_second": round(operations / best, 1), "operations": operations, "seconds": round(best, 6), "peak_kb": round(peak / 1024, 1)}
+
+def compare(name, measures, baseline, tolerance):
+    if name not in baseline:
+        return "no baseline", False
+
+    ratio = measures["ops_per_second"] / baseline[name]["ops_per_second"]
+    memory = measures["peak_kb"] / baseline[name]["peak_kb"] if baseline[name]["peak_kb"] else 1
+    regression = ratio < 1 - tolerance
+    return f"{ratio:.2f}x speed, {memory:.2f}x memory{' REGRESSION' if regression else ''}", regression
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmark suite of the scraper")
+    parser.add_argument("--quick", action="store_true", help="Smaller corpora, for a fast check")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Path of the baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Slowdown accepted before reporting a regression")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    size = 2000 if args.quick else 20000
+    repeat = 2 if args.quick else 5
+    pages, articles_per_page = (5, 10) if args.quick else (20, 25)
+    corpus = make_corpus(size)
+
+    cases = [
+        ("parse_date", bench_parse_date),
+        ("fix_date", bench_fix_date),
+        ("count_string_in_text", bench_count_string_in_text),
+        ("has_money_in_text", bench_has_money_in_text),
+        ("make_valid_filename+add_extension", bench_make_valid_filename),
+        ("excel_rpa", bench_excel("rpa")),
+        ("excel_streaming", bench_excel("streaming")),
+        ("end_to_end_http (articles)", lambda scraper, corpus: bench_end_to_end(scraper, corpus, pages, articles_per_page)),
+    ]
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    elif not args.save_baseline:
+        print(f"No baseline at {args.baseline}, run with --save-baseline to store one")
+
+    scraper = NewsScraper()
+    report = {}
+    regressions = []
+    try:
+        for name, setup in cases:
+            # Excel and end-to-end cases are slow, they repeat less
+            case_repeat = repeat if not name.startswith(("excel", "end_to_end")) else max(1, repeat // 2)
+            run = setup(scraper, corpus)
+            try:
+                measures = measure(run, case_repeat)
+            except Exception as e:
+                print(f"{name}:\n\t\t-> failed: {e}")
+                continue
+            finally:
+                if hasattr(run, "cleanup"):
+                    run.cleanup()
+
+            report[name] = measures
+            comparison, regression = compare(name, measures, baseline, args.tolerance)
+            if regression:
+                regressions.append(name)
+            print(f"{name}:")
+            print(f"\t\t-> {measures['ops_per_second']:,.0f} ops/s, peak {measures['peak_kb']:,.0f} KB ({comparison})")
+    finally:
+        scraper.close()
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}")
+        sys.exit(1)
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the SQLite article index used by the incremental runs.
+"""
+
+import os
+import tempfile
+import unittest
+
+from concurrent.futures import Future
+
+from article_index import ArticleIndex
+from news_result import NewsResult
+from scraper import NewsScraper
+
+
+def make_result(title, date):
+    return NewsResult(title, date, f"{title} description", f"{title}.jpg", 2, True)
+
+
+class TestArticleIndex(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.index = ArticleIndex(os.path.join(self.folder.name, "index", "articles.sqlite"))
+        self.query = self.index.query_key("latimes", "Amazon ", "Climate & Environment")
+
+    def tearDown(self):
+        self.index.close()
+        self.folder.cleanup()
+
+    def test_add_and_contains(self):
+        article = {"title": "Fires", "url": "https://www.latimes.com/fires", "image_url": "https://img/fires"}
+        self.assertFalse(self.index.contains(self.query, article))
+        self.index.add(self.query, article, make_result("Fires", "2024-07-29"), "./output/Fires.jpg")
+        self.assertTrue(self.index.contains(self.query, article))
+
+        # The same article for another query isn't indexed
+        other_query = self.index.query_key("latimes", "amazon", "")
+        self.assertFalse(self.index.contains(other_query, article))
+
+    def test_sites_dont_share_rows(self):
+        article = {"title": "Fires", "url": "https://www.latimes.com/fires"}
+        self.index.add(self.query, article, make_result("Fires", "2024-07-29"), "./output/Fires.jpg")
+
+        # The same phrase and category on another site has none of the rows
+        other_site = self.index.query_key("apnews", "Amazon ", "Climate & Environment")
+        self.assertFalse(self.index.contains(other_site, article))
+        self.assertEqual(self.index.get_results(other_site, "2024-01-01"), [])
+
+    def test_title_hash_without_url(self):
+        article = {"title": "No link", "url": None}
+        self.index.add(self.query, article, make_result("No link", "2024-07-29"), "./output/No link.jpg")
+        self.assertTrue(self.index.contains(self.query, {"title": "No link"}))
+
+    def test_get_results(self):
+        for title, date in [("Old", "2024-01-01"), ("New", "2024-07-29"), ("Middle", "2024-05-01")]:
+            self.index.add(self.query, {"title": title, "url": f"https://www.latimes.com/{title}"}, make_result(title, date), f"./output/{title}.jpg")
+
+        indexed = self.index.get_results(self.query, "2024-03-01")
+        self.assertEqual([result.title for key, result, image_url, image_path in indexed], ["New", "Middle"])
+        self.assertEqual(indexed[0][1], make_result("New", "2024-07-29"))
+
+
+class TestIncrementalScraper(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.scraper = NewsScraper()
+        self.scraper.reset_search(os.path.join(self.folder.name, ""))
+        self.scraper.open_article_index(os.path.join(self.folder.name, "articles.sqlite"), "latimes", "Amazon", "")
+        self.downloads = {}
+        self.scraper.downloader.submit = lambda url, filepath: self.downloads.setdefault(url, Future())
+
+    def tearDown(self):
+        self.scraper.article_index.close()
+        self.scraper.close()
+        self.folder.cleanup()
+
+    def article(self, number, image="photo"):
+        return {"title": f"Amazon {number}", "description": "Amazon", "date": "July 29, 2024",
+                "image_url": f"https://ca-times.brightspotcdn.com/{number}%2F{image}.jpg", "url": f"https://www.latimes.com/story/{number}"}
+
+    def test_failed_download_not_indexed(self):
+        saved, failed = self.article(1), self.article(2, "other")
+        self.scraper.process_article(saved, "Amazon", self.scraper.get_start_date(0))
+        self.scraper.process_article(failed, "Amazon", self.scraper.get_start_date(0))
+        self.assertFalse(self.scraper.article_index.contains(self.scraper.index_query, saved))
+
+        # Only the article with its picture saved is reused by the next runs
+        self.downloads[saved["image_url"]].set_result("saved")
+        self.downloads[failed["image_url"]].set_exception(OSError("404"))
+        self.scraper.wait_for_downloads()
+        self.assertTrue(self.scraper.article_index.contains(self.scraper.index_query, saved))
+        self.assertFalse(self.scraper.article_index.contains(self.scraper.index_query, failed))
+
+    def test_merged_image_name_unique(self):
+        # A previous run indexed an article whose picture has the name of another image of this run
+        indexed = self.article(1)
+        self.scraper.article_index.add(self.scraper.index_query, indexed, NewsResult("Amazon 1", "2024-07-29", "Amazon", "photo.jpg", 1, False), "")
+        results = [self.scraper.process_article(self.article(2), "Amazon", self.scraper.get_start_date(0))]
+
+        results = self.scraper.merge_indexed_results(results, 0)
+        self.assertEqual(results[0].picture_filename, "photo.jpg")
+        self.assertNotEqual(results[1].picture_filename, "photo.jpg")
+        self.assertEqual(self.downloads.keys(), {self.article(2)["image_url"], indexed["image_url"]})
+
+if __name__ == "__main__":
+    unittest.main()
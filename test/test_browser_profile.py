@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the launch profiles of the browser.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from browser_profile import BrowserProfile
+
+
+class TestBrowserProfile(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_fast_arguments(self):
+        profile = BrowserProfile(user_data_dir=self.folder)
+        arguments = profile.options()["arguments"]
+        profile.release_slot()
+
+        self.assertEqual(profile.name, "fast")
+        for argument in ["--headless=new", "--window-size=1920,1080", "--disable-gpu", "--disable-extensions",
+                         "--disable-background-networking", f"--user-data-dir={os.path.join(self.folder, 'slot-0')}"]:
+            self.assertIn(argument, arguments)
+        self.assertIn(f"--user-agent={BrowserProfile.user_agent}", arguments)
+
+    def test_performance_log_only_with_blocker(self):
+        profile = BrowserProfile.legacy()
+        self.assertNotIn("capabilities", profile.options())
+        self.assertEqual(profile.options(performance_log=True)["capabilities"], {"goog:loggingPrefs": {"performance": "ALL"}})
+
+    def test_legacy_arguments(self):
+        profile = BrowserProfile.from_settings(False)
+        arguments = profile.arguments()
+
+        self.assertEqual(profile.name, "legacy")
+        self.assertIsNone(profile.window_size)
+        self.assertEqual(arguments, BrowserProfile.base_arguments)
+
+    def test_settings(self):
+        profile = BrowserProfile.from_settings({"window_size": [1280, 800], "user_data_dir": self.folder})
+        self.assertEqual(profile.window_size, (1280, 800))
+        self.assertEqual(profile.user_data_dir, self.folder)
+        with self.assertRaises(ValueError):
+            BrowserProfile.from_settings({"gpu": True})
+
+    def test_slots(self):
+        first = BrowserProfile(user_data_dir=self.folder)
+        second = BrowserProfile(user_data_dir=self.folder, max_slots=2)
+        third = BrowserProfile(user_data_dir=self.folder, max_slots=2)
+
+        # Two browsers at once take two slots, a third one gets a fresh profile
+        self.assertEqual(first.acquire_slot(), os.path.join(self.folder, "slot-0"))
+        self.assertEqual(second.acquire_slot(), os.path.join(self.folder, "slot-1"))
+        self.assertIsNone(third.acquire_slot())
+
+        # A closed browser leaves its profile to the next one, which starts prewarmed
+        os.makedirs(os.path.join(self.folder, "slot-0", "Default"))
+        first.release_slot()
+        self.assertEqual(third.acquire_slot(), os.path.join(self.folder, "slot-0"))
+        self.assertTrue(third.prewarmed)
+        self.assertFalse(second.prewarmed)
+
+        second.release_slot()
+        third.release_slot()
+
+if __name__ == "__main__":
+    unittest.main()
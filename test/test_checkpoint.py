@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the checkpoint journal and the resume of a crashed search.
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from checkpoint import CheckpointJournal
+from scraper import NewsScraper
+
+
+class TestCheckpointJournal(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, "checkpoint.jsonl")
+        self.key = CheckpointJournal.search_key("latimes", "Amazon", "Business")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_resume_unfinished(self):
+        journal = CheckpointJournal(self.path, self.key)
+        journal.add_page(1, [{"title": "First"}], "https://www.latimes.com/search?q=amazon&s=1")
+        journal.add_page(2, [{"title": "Second"}], "https://www.latimes.com/search?q=amazon&s=1&p=2")
+        journal.close()
+
+        resumed = CheckpointJournal(self.path, CheckpointJournal.search_key("latimes", " amazon", "business"))
+        self.assertEqual([page for page, articles, position in resumed.pages], [1, 2])
+        self.assertEqual(resumed.pages[1][1], [{"title": "Second"}])
+        self.assertEqual(resumed.next_page(), 3)
+        self.assertFalse(resumed.ended)
+        resumed.close()
+
+    def test_cut_line_removed(self):
+        journal = CheckpointJournal(self.path, self.key)
+        journal.add_page(1, [{"title": "First"}])
+        journal.close()
+        with open(self.path, "a") as file:
+            file.write('{"type": "page", "page": 2, "artic')
+
+        resumed = CheckpointJournal(self.path, self.key)
+        resumed.add_page(2, [{"title": "Second"}])
+        resumed.close()
+
+        with open(self.path) as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual([record.get("page") for record in records], [None, 1, 2])
+
+    def test_finished_or_other_search_starts_again(self):
+        journal = CheckpointJournal(self.path, self.key)
+        journal.add_page(1, [{"title": "First"}])
+        journal.end()
+        journal.finish()
+        self.assertEqual(CheckpointJournal(self.path, self.key).pages, [])
+
+        journal = CheckpointJournal(self.path, self.key)
+        journal.add_page(1, [{"title": "First"}])
+        journal.close()
+        other = CheckpointJournal(self.path, CheckpointJournal.search_key("latimes", "Google", ""))
+        self.assertEqual(other.pages, [])
+        other.close()
+
+
+class TestResume(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.scraper = NewsScraper()
+        self.scraper.reset_search(os.path.join(self.folder, ""))
+        self.processed = []
+        self.scraper.process_page = lambda page_articles, search_phrase, start_date, results, count_pages: \
+            self.processed.append((count_pages, self.scraper.replaying)) or False
+
+    def tearDown(self):
+        self.scraper.close()
+        shutil.rmtree(self.folder)
+
+    def site(self, crash_on=None, last_page=5):
+        # Producer of a site with 5 pages, which can crash on a page
+        def make_pages(first_page):
+            self.first_pages.append(first_page)
+            for number in range(first_page, last_page + 1):
+                if number == crash_on:
+                    raise ConnectionError("Browser crashed")
+                yield number, [{"title": f"Article {number}"}], f"https://www.latimes.com/search?q=amazon&p={number}"
+        return make_pages
+
+    def test_resume_after_crash(self):
+        self.first_pages = []
+        self.scraper.open_journal("latimes", "amazon", "")
+        with self.assertRaises(ConnectionError):
+            self.scraper.scrape_pages(self.scraper.resume_pages(self.site(crash_on=3)), "amazon", 0, [])
+        self.scraper.finish_search()
+
+        # The retry replays pages 1 and 2, then loads from page 3
+        self.processed = []
+        self.scraper.reset_search(os.path.join(self.folder, ""))
+        self.scraper.open_journal("latimes", "amazon", "")
+        self.scraper.scrape_pages(self.scraper.resume_pages(self.site()), "amazon", 0, [])
+
+        self.assertEqual(self.first_pages, [1, 3])
+        self.assertEqual(self.processed, [(1, True), (2, True), (3, False), (4, False), (5, False)])
+        self.assertTrue(self.scraper.journal.ended)
+        journal = CheckpointJournal(self.scraper.journal.path, self.scraper.journal.key)
+        self.assertEqual([page for page, articles, position in journal.pages], [1, 2, 3, 4, 5])
+        journal.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the date parsing engine, checked against the original trial loop over every format.
+"""
+
+import unittest
+
+from datetime import datetime
+
+from date_parser import DateParser
+
+
+DATE_FORMATS = ["%d/%m/%Y", "%d.%m.%Y", "%m/%d/%Y", "%Y-%m-%d", "%d-%m-%Y", "%B %d, %Y", "%b %d, %Y", "%d %B %Y", "%d %b %Y", "%Y/%m/%d", "%Y.%m.%d", "%Y %b %d", "%Y %B %d", "%A, %d %B %Y", "%a, %d %b %Y", "%A, %B %d, %Y", "%a, %b %d, %Y", "%d/%m/%y", "%m/%d/%y", "%y-%m-%d", "%d-%m-%y", "%Y.%m.%d %H:%M:%S", "%d.%m.%Y %H:%M", "%d/%m/%Y %H:%M", "%m-%d-%Y %H:%M", "%d %B %Y %H:%M", "%d %b %Y %H:%M", "%Y/%m/%d %H:%M:%S", "%Y %b %d %H:%M", "%d-%m-%Y %H:%M:%S", "%A, %d %B %Y %H:%M", "%a, %d %b %Y %H:%M", "%b. %d, %Y", "%b %d, %Y"]
+
+DATE_STRINGS = [
+    "July 29, 2024", "Jul 29, 2024", "Sep. 20, 2024", "2024-07-29", "29/07/2024", "01/02/2024",
+    "07/29/24", "29.07.2024", "29.07.2024 14:30", "2024/07/29 14:30:15", "Monday, 29 July 2024",
+    "Mon, Jul 29, 2024", "29 Jul 2024 08:05", "2024 Jul 29", "not a date", "", "July 32, 2024"
+]
+
+
+def parse_date_legacy(date_str):
+    # The original loop: try every format, the last match wins
+    date = None
+    for date_format in DATE_FORMATS:
+        try:
+            date = datetime.strptime(date_str, date_format)
+        except ValueError:
+            continue
+    return date
+
+
+class TestDateParser(unittest.TestCase):
+    def setUp(self):
+        self.parser = DateParser(DATE_FORMATS)
+
+    def test_same_results_as_legacy_loop(self):
+        for date_str in DATE_STRINGS:
+            with self.subTest(date_str=date_str):
+                self.assertEqual(self.parser.parse(date_str), parse_date_legacy(date_str))
+
+    def test_ambiguous_date_uses_last_format(self):
+        # "%d/%m/%Y" and "%m/%d/%Y" both match, "%m/%d/%Y" comes later in the list
+        self.assertEqual(self.parser.parse("01/02/2024"), datetime(2024, 1, 2))
+
+    def test_cache(self):
+        self.parser.parse("July 29, 2024")
+        self.parser.parse("July 29, 2024")
+        self.assertEqual(self.parser.parse_cached.cache_info().hits, 1)
+
+    def test_resolve_relative(self):
+        now = datetime(2024, 7, 29, 0, 30)
+        self.assertEqual(self.parser.resolve_relative("5 minutes ago", now), datetime(2024, 7, 29, 0, 25))
+        self.assertEqual(self.parser.resolve_relative("2 hours ago", now), datetime(2024, 7, 28, 22, 30))
+        self.assertEqual(self.parser.resolve_relative("an hour ago", now), datetime(2024, 7, 28, 23, 30))
+        self.assertEqual(self.parser.resolve_relative("3 days ago", now), datetime(2024, 7, 26, 0, 30))
+        self.assertEqual(self.parser.resolve_relative("Yesterday", now), datetime(2024, 7, 28, 0, 30))
+        self.assertIsNone(self.parser.resolve_relative("July 29, 2024", now))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the concurrent image downloads, against a local HTTP server.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from downloader import ImageDownloader
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    """
+    Serve /image, /missing (404), /slow (waits for the release event) and /broken (cut in the middle).
+    """
+    image = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 64
+    release = threading.Event()
+
+    def do_GET(self):
+        if self.path.startswith("/missing"):
+            self.send_error(404)
+            return
+
+        if self.path.startswith("/slow"):
+            self.release.wait(5)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(self.image)))
+        self.end_headers()
+        if self.path.startswith("/broken"):
+            # Half of the image, then the connection is closed
+            self.wfile.write(self.image[:len(self.image) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(self.image)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestImageDownloader(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        ImageHandler.release.clear()
+
+    def tearDown(self):
+        ImageHandler.release.set()
+        shutil.rmtree(self.folder)
+
+    def path(self, name):
+        return os.path.join(self.folder, name)
+
+    def test_download_and_failures(self):
+        downloader = ImageDownloader(max_workers=2)
+        try:
+            downloader.submit(f"{self.url}/image", self.path("image.jpg"))
+            downloader.submit(f"{self.url}/missing", self.path("missing.jpg"))
+            downloader.submit(f"{self.url}/broken", self.path("broken.jpg"))
+            succeeded, failed = downloader.wait()
+        finally:
+            downloader.close()
+
+        self.assertEqual(succeeded, 1)
+        self.assertEqual(sorted(url for url, error in failed), [f"{self.url}/broken", f"{self.url}/missing"])
+        with open(self.path("image.jpg"), "rb") as file:
+            self.assertEqual(file.read(), ImageHandler.image)
+
+        # The failed downloads leave no image and no partial file
+        self.assertEqual(os.listdir(self.folder), ["image.jpg"])
+
+    def test_counters_reset_after_wait(self):
+        downloader = ImageDownloader(max_workers=1)
+        try:
+            downloader.submit(f"{self.url}/missing", self.path("missing.jpg"))
+            self.assertEqual(len(downloader.wait()[1]), 1)
+            self.assertEqual(downloader.wait(), (0, []))
+        finally:
+            downloader.close()
+
+    def test_max_pending_blocks_submit(self):
+        downloader = ImageDownloader(max_workers=1, max_pending=2)
+        try:
+            downloader.submit(f"{self.url}/slow", self.path("first.jpg"))
+            downloader.submit(f"{self.url}/slow", self.path("second.jpg"))
+
+            # A third download waits for a slot
+            third = threading.Thread(target=downloader.submit, args=(f"{self.url}/image", self.path("third.jpg")))
+            third.start()
+            third.join(0.3)
+            self.assertTrue(third.is_alive())
+
+            ImageHandler.release.set()
+            third.join(5)
+            self.assertFalse(third.is_alive())
+            self.assertEqual(downloader.wait(), (3, []))
+        finally:
+            downloader.close()
+
+if __name__ == "__main__":
+    unittest.main()
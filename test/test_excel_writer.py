@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the streaming Excel writer, read back with openpyxl and compared with the rows of the RPA writer.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from openpyxl import load_workbook
+
+from excel_writer import StreamingExcelWriter
+from news_result import NewsResult
+from scraper import NewsScraper
+
+
+class FakeExcel:
+    # RPA.Excel.Files keeping the rows appended to the workbook
+    def __init__(self):
+        self.rows = []
+
+    def create_workbook(self, path):
+        self.path = path
+
+    def append_rows_to_worksheet(self, rows, header=False):
+        self.rows += [list(row) for row in rows]
+
+    def save_workbook(self):
+        pass
+
+    def close_workbook(self):
+        pass
+
+
+def make_results():
+    return [
+        NewsResult("Amazon and Google", "2024-07-29", "Both", "both.jpg", 2, True, image_hash="8f0f", phrase_counts={"Amazon": 1, "Google": 1}),
+        NewsResult("Google", "2024-07-28", "Only one", "google.jpg", 1, False, image_hash="00ff", phrase_counts={"Amazon": 0, "Google": 1})
+    ]
+
+
+def read_rows(path):
+    workbook = load_workbook(path, read_only=True)
+    rows = [list(row) for row in workbook.active.values]
+    workbook.close()
+    return rows
+
+
+class TestStreamingExcelWriter(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, "News.xlsx")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_rows_read_back(self):
+        header = NewsScraper.excel_header + ["Image hash", "Count of Amazon", "Count of Google"]
+        writer = StreamingExcelWriter(self.path, header)
+        for result in make_results():
+            writer.append(result)
+        self.assertEqual(writer.rows, 2)
+
+        # Nothing is saved before close, which can be called again
+        self.assertFalse(os.path.exists(self.path))
+        writer.close()
+        writer.close()
+
+        rows = read_rows(self.path)
+        self.assertEqual(rows[0], header)
+        self.assertEqual(rows[1:], [result.values() for result in make_results()])
+
+    def test_same_rows_as_rpa_writer(self):
+        scraper = NewsScraper()
+        try:
+            scraper.reset_search(os.path.join(self.folder, ""))
+            scraper.image_processor = True
+            scraper.count_phrases = ["Amazon", "Google"]
+
+            scraper.open_excel_stream()
+            scraper.save_news_data_to_excel(make_results())
+            streamed = read_rows(self.path)
+
+            scraper.excel_stream = None
+            scraper.excel_library = FakeExcel()
+            scraper.save_news_data_to_excel(make_results())
+        finally:
+            scraper.image_processor = None
+            scraper.close()
+
+        # Same header, with the hash and phrase columns, and the same columns in every row
+        self.assertEqual(streamed[0], ["Title", "Date", "Description", "Picture filename", "Count of search", "Contains money",
+                                       "Image hash", "Count of Amazon", "Count of Google"])
+        self.assertEqual(streamed, scraper.excel_library.rows)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the content-addressed image cache, against a local HTTP server answering conditional requests.
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from image_cache import ImageCache
+
+
+IMAGES = {
+    "/a.jpg": b"\xff\xd8\xff" + b"a" * 1000,
+    "/b.jpg": b"\xff\xd8\xff" + b"b" * 1000,
+    "/same-as-a.jpg": b"\xff\xd8\xff" + b"a" * 1000,
+}
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    """
+    Serve IMAGES with an ETag, answering 304 when it matches, and count the full downloads.
+    """
+    downloads = 0
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path not in IMAGES:
+            self.send_error(404)
+            return
+
+        etag = f'"{path}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        ImageHandler.downloads += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(IMAGES[path])))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(IMAGES[path])
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestImageCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        ImageHandler.downloads = 0
+        self.folder = tempfile.TemporaryDirectory()
+        self.cache = ImageCache(os.path.join(self.folder.name, "cache"))
+        self.session = requests.Session()
+
+    def tearDown(self):
+        self.cache.close()
+        self.session.close()
+        self.folder.cleanup()
+
+    def fetch(self, path, name):
+        filepath = os.path.join(self.folder.name, name)
+        self.cache.fetch(self.session, self.base_url + path, filepath)
+        with open(filepath, "rb") as file:
+            return file.read()
+
+    def test_conditional_revalidation(self):
+        self.assertEqual(self.fetch("/a.jpg", "first.jpg"), IMAGES["/a.jpg"])
+        self.assertEqual(self.fetch("/a.jpg", "second.jpg"), IMAGES["/a.jpg"])
+        self.assertEqual(ImageHandler.downloads, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_normalized_url(self):
+        self.assertEqual(self.cache.normalize_url("HTTPS://Example.COM/img?b=2&a=1#top"), "https://example.com/img?a=1&b=2")
+
+    def test_content_stored_once(self):
+        self.fetch("/a.jpg", "a.jpg")
+        self.fetch("/same-as-a.jpg", "same.jpg")
+        self.assertEqual(self.cache.size(), len(IMAGES["/a.jpg"]))
+
+    def test_lru_eviction(self):
+        self.cache.max_bytes = 1500
+        self.fetch("/a.jpg", "a.jpg")
+        self.fetch("/b.jpg", "b.jpg")
+
+        # The oldest image was evicted, the file already placed in the output is kept
+        self.assertIsNone(self.cache.get_entry(self.cache.normalize_url(self.base_url + "/a.jpg")))
+        self.assertIsNotNone(self.cache.get_entry(self.cache.normalize_url(self.base_url + "/b.jpg")))
+        self.assertTrue(os.path.exists(os.path.join(self.folder.name, "a.jpg")))
+
+    def test_blob_in_use_not_evicted(self):
+        self.fetch("/a.jpg", "first.jpg")
+        key = self.cache.normalize_url(self.base_url + "/a.jpg")
+
+        # Another download evicts the whole cache while this one revalidates the image, before it is linked
+        touch = self.cache.touch
+        def touch_and_evict(url):
+            touch(url)
+            self.cache.max_bytes = 0
+            self.cache.evict()
+        self.cache.touch = touch_and_evict
+
+        self.assertEqual(self.fetch("/a.jpg", "second.jpg"), IMAGES["/a.jpg"])
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.pinned, {})
+
+        # Once linked, the blob can be evicted
+        self.cache.evict()
+        self.assertIsNone(self.cache.get_entry(key))
+
+if __name__ == "__main__":
+    unittest.main()
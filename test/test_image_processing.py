@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the post-processing of the downloaded images.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from image_processing import sniff_format, fix_extension, hash_distance, process_image, ImagePostProcessor
+from news_result import NewsResult
+
+try:
+    from PIL import Image, ImageDraw
+except ImportError:
+    Image = None
+
+
+def draw_photo(path, size, image_format):
+    """
+    Draw the same test picture at any size, so its scaled copies have close hashes.
+    """
+    image = Image.new("RGB", size, (30, 60, 90))
+    draw = ImageDraw.Draw(image)
+    width, height = size
+    draw.ellipse((width * 0.1, height * 0.2, width * 0.5, height * 0.9), fill=(240, 200, 40))
+    draw.rectangle((width * 0.6, height * 0.1, width * 0.9, height * 0.5), fill=(200, 30, 30))
+    image.save(path, image_format)
+
+
+class TestFormats(unittest.TestCase):
+    def test_sniff_format(self):
+        headers = {
+            b"\xff\xd8\xff\xe0\x00\x10JFIF": "jpeg",
+            b"\x89PNG\r\n\x1a\n\x00\x00": "png",
+            b"GIF89a\x01\x00": "gif",
+            b"RIFF\x24\x00\x00\x00WEBPVP8 ": "webp",
+            b"\x00\x00\x00\x1cftypavif\x00\x00": "avif",
+            b"\x00\x00\x00\x18ftypheic\x00\x00": "heic",
+            b"  <?xml version='1.0'?><svg xmlns": "svg",
+            b"<html><body>Not found": None,
+        }
+        for header, image_format in headers.items():
+            with self.subTest(header=header):
+                self.assertEqual(sniff_format(header), image_format)
+
+    def test_fix_extension(self):
+        self.assertEqual(fix_extension("photo.jpg", "webp"), "photo.webp")
+        self.assertEqual(fix_extension("photo.jpeg", "jpeg"), "photo.jpeg")
+        self.assertEqual(fix_extension("photo.JPG", "jpeg"), "photo.JPG")
+        self.assertEqual(fix_extension("photo.jpg", None), "photo.jpg")
+
+    def test_hash_distance(self):
+        self.assertEqual(hash_distance("0000000000000000", "0000000000000000"), 0)
+        self.assertEqual(hash_distance("0000000000000000", "ffffffffffffffff"), 64)
+        self.assertEqual(hash_distance("00000000000000f0", "0000000000000010"), 3)
+
+
+@unittest.skipIf(Image is None, "Pillow is not installed")
+class TestImagePostProcessor(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp() + os.sep
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_process_image(self):
+        draw_photo(self.folder + "photo.jpg", (1200, 800), "PNG")
+        processed = process_image(self.folder + "photo.jpg", self.folder + "small.webp", max_size=300)
+
+        self.assertEqual(processed["format"], "png")
+        self.assertEqual((processed["width"], processed["height"]), (1200, 800))
+        self.assertEqual(len(processed["hash"]), 16)
+        with Image.open(self.folder + "small.webp") as derivative:
+            self.assertEqual(derivative.format, "WEBP")
+            self.assertEqual(derivative.size, (300, 200))
+
+    def test_not_an_image(self):
+        with open(self.folder + "error.jpg", "w") as file:
+            file.write("<html>Not found</html>")
+        processed = process_image(self.folder + "error.jpg", self.folder + "error.webp")
+        self.assertIsNone(processed["format"])
+        self.assertIsNone(processed["hash"])
+        self.assertFalse(os.path.exists(self.folder + "error.webp"))
+
+    def test_process_results(self):
+        # The same photo in two sizes, the second with a wrong extension, and another photo
+        draw_photo(self.folder + "large.jpg", (1200, 800), "JPEG")
+        draw_photo(self.folder + "small.jpg", (600, 400), "PNG")
+        Image.new("RGB", (400, 400), (255, 255, 255)).save(self.folder + "other.jpg", "PNG")
+        for line in range(0, 400, 40):
+            image = Image.open(self.folder + "other.jpg")
+            ImageDraw.Draw(image).line((0, line, 400, 400 - line), fill=(0, 0, 0), width=8)
+            image.save(self.folder + "other.jpg", "PNG")
+
+        # The cache blobs are hardlinked to the output, they must not change
+        cached = os.path.join(self.folder, "cached-blob")
+        os.link(self.folder + "other.jpg", cached)
+        with open(cached, "rb") as file:
+            cached_bytes = file.read()
+
+        results = [NewsResult(title, "2024-07-29", "", filename, 1, False)
+                   for title, filename in [("Large", "large.jpg"), ("Small", "small.jpg"), ("Other", "other.jpg"), ("Same", "other.jpg")]]
+        processor = ImagePostProcessor(workers=2, max_size=200)
+        processor.process_results(results, self.folder)
+
+        self.assertEqual([result.picture_filename for result in results], ["large.jpg", "large.jpg", "other.png", "other.png"])
+        self.assertEqual(processor.duplicates, 1)
+        self.assertLessEqual(hash_distance(results[0].image_hash, results[1].image_hash), 4)
+        self.assertEqual(results[2].image_hash, results[3].image_hash)
+        self.assertFalse(os.path.exists(self.folder + "small.jpg"))
+        self.assertTrue(os.path.exists(self.folder + "other.png"))
+        self.assertTrue(os.path.exists(os.path.join(self.folder, "derivatives", "large.webp")))
+        self.assertFalse(os.path.exists(os.path.join(self.folder, "derivatives", "small.webp")))
+        with open(cached, "rb") as file:
+            self.assertEqual(file.read(), cached_bytes)
+
+    def test_replace_originals(self):
+        draw_photo(self.folder + "photo.jpg", (800, 800), "JPEG")
+        results = [NewsResult("Photo", "2024-07-29", "", "photo.jpg", 1, False)]
+        ImagePostProcessor(workers=1, replace_originals=True).process_results(results, self.folder)
+
+        self.assertEqual(results[0].picture_filename, "derivatives/photo.webp")
+        self.assertFalse(os.path.exists(self.folder + "photo.jpg"))
+
+if __name__ == "__main__":
+    unittest.main()
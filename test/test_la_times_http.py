@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the browserless LA Times client, against saved search pages served by a local HTTP server.
+"""
+
+import os
+import threading
+import unittest
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from la_times_http import LATimesSearchClient
+
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class SearchFixtureHandler(BaseHTTPRequestHandler):
+    """
+    Serve la_times_search_page_<p>.html for /search?p=<p>, and keep the requested URLs.
+    """
+    requests_seen = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.requests_seen.append(self.path)
+        page = parse_qs(url.query).get("p", ["1"])[0]
+        fixture = os.path.join(FIXTURES_PATH, f"la_times_search_page_{page}.html")
+
+        if url.path != "/search" or not os.path.exists(fixture):
+            self.send_error(404)
+            return
+
+        with open(fixture, "rb") as file:
+            body = file.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestLATimesSearchClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), SearchFixtureHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        SearchFixtureHandler.requests_seen.clear()
+        self.client = LATimesSearchClient(base_url=self.base_url)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_build_search_url(self):
+        url = self.client.build_search_url("climate change", facet=("f0", "abc"), page=3)
+        self.assertEqual(url, f"{self.base_url}search?q=climate+change&f0=abc&s=1&p=3")
+        url = self.client.build_search_url("climate change", facet=[("f0", "abc"), ("f0", "def")])
+        self.assertEqual(url, f"{self.base_url}search?q=climate+change&f0=abc&f0=def&s=1")
+
+    def test_parse_articles(self):
+        articles = self.client.parse_articles(self.client.fetch_search_page("amazon"))
+        self.assertEqual(len(articles), 3)
+        self.assertEqual(articles[0]["title"], "Amazon opens a new warehouse")
+        self.assertEqual(articles[0]["description"], "The Amazon site cost $120 million to build.")
+        self.assertEqual(articles[0]["date"], "July 29, 2024")
+        self.assertTrue(articles[0]["image_url"].endswith("%2Famazon-warehouse.jpg"))
+        self.assertEqual(articles[0]["url"], f"{self.base_url}business/story/2024-07-29/amazon-warehouse")
+        self.assertIsNone(articles[2]["image_url"])
+
+    def test_pagination(self):
+        first_page = self.client.fetch_search_page("amazon")
+        last_page = self.client.fetch_search_page("amazon", page=2)
+        self.assertTrue(self.client.has_next_page(first_page))
+        self.assertFalse(self.client.has_next_page(last_page))
+        self.assertEqual(len(self.client.parse_articles(last_page)), 1)
+
+    def test_find_category(self):
+        facet = self.client.find_category("amazon", "climate & environment ")
+        self.assertEqual(facet, ("f0", "00000168-865c-d5d8-a76d-efddaf000000"))
+        self.assertIsNone(self.client.find_category("amazon", "Sports"))
+        self.assertEqual(self.client.find_categories("amazon", ["Climate & Environment", "Sports"]),
+                         [("f0", "00000168-865c-d5d8-a76d-efddaf000000"), None])
+
+        # The first page of the search is only fetched once
+        self.assertEqual(len(SearchFixtureHandler.requests_seen), 1)
+
+    def test_parse_once(self):
+        document = self.client.parse_html(self.client.fetch_search_page("amazon", page=2))
+        self.assertIs(self.client.parse_html(document), document)
+        self.assertEqual(len(self.client.parse_articles(document)), 1)
+        self.assertFalse(self.client.has_next_page(document))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the slotted record of the scraped news.
+"""
+
+import unittest
+
+from news_result import NewsResult
+
+
+class TestNewsResult(unittest.TestCase):
+    def setUp(self):
+        self.result = NewsResult("Amazon fined $5 million", "2024-07-29", "A description", "amazon.jpg", 2, True)
+
+    def test_to_dict(self):
+        self.assertEqual(self.result.to_dict(), {
+            "Title": "Amazon fined $5 million",
+            "Date": "2024-07-29",
+            "Description": "A description",
+            "Picture filename": "amazon.jpg",
+            "Count of search phrases in the title and description": 2,
+            "Title or description contains any amount of money": True
+        })
+
+    def test_image_hash_column(self):
+        self.assertEqual(len(self.result.values()), 6)
+        self.result.image_hash = "8f3a0c1e5b7d9a2c"
+        self.assertEqual(self.result.values()[-1], "8f3a0c1e5b7d9a2c")
+        self.assertEqual(self.result.to_dict()["Image hash"], "8f3a0c1e5b7d9a2c")
+
+    def test_from_dict(self):
+        self.assertEqual(NewsResult.from_dict(self.result.to_dict()), self.result)
+        self.assertEqual(NewsResult.empty().to_dict()["Title"], '')
+
+    def test_slots(self):
+        # No dictionary per record, and no attribute outside the columns
+        self.assertFalse(hasattr(self.result, "__dict__"))
+        with self.assertRaises(AttributeError):
+            self.result.url = "https://www.latimes.com/"
+
+if __name__ == "__main__":
+    unittest.main()
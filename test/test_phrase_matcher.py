@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the multi-phrase counting engine, checked against the original count_string_in_text.
+"""
+
+import re
+import unittest
+
+from phrase_matcher import PhraseMatcher
+
+
+def count_string_in_text_legacy(text, search_string):
+    pattern = re.compile(r'\b' + re.escape(search_string) + r'\b', re.IGNORECASE)
+    return len(pattern.findall(text))
+
+
+TEST_TEXTS = [
+    "Matheus and Alex are friends.",
+    "MATHEUS likes to do RPAs.",
+    "Matheus loves programming, matheus also enjoys cycling.",
+    "Matthew.",
+    "Sometimes, people call me math.",
+    "AMatheusZ should not be a match.",
+    "Matheus Ruggeri, Matheus Ruggeri and Matheus",
+    "New York New York New York",
+]
+
+TEST_PHRASES = ["Matheus", "math", "Matheus Ruggeri", "New York New York", "RPA"]
+
+
+class TestPhraseMatcher(unittest.TestCase):
+    def test_same_counts_as_legacy(self):
+        counts = PhraseMatcher(TEST_PHRASES).count_many(TEST_TEXTS)
+        for text, text_counts in zip(TEST_TEXTS, counts):
+            for phrase in TEST_PHRASES:
+                with self.subTest(text=text, phrase=phrase):
+                    self.assertEqual(text_counts[phrase], count_string_in_text_legacy(text, phrase))
+
+    def test_aliases(self):
+        # "AMAZON" differs from the phrase only in case, it isn't counted twice
+        matcher = PhraseMatcher({"Amazon": ["AMZN", "AMAZON"]})
+        self.assertEqual(matcher.count("Amazon (AMZN) and amazon"), {"Amazon": 3})
+
+    def test_count_articles(self):
+        articles = [
+            {"title": "Amazon fires", "description": "The amazon burns, Amazon says"},
+            {"title": "Amazonian birds", "description": None},
+        ]
+        self.assertEqual(PhraseMatcher(["amazon"]).count_articles(articles), [{"amazon": 3}, {"amazon": 0}])
+
+if __name__ == "__main__":
+    unittest.main()
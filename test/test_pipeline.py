@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the stages of the streaming search pipeline.
+"""
+
+import time
+import threading
+import unittest
+
+from pipeline import WriterStage
+from scraper import NewsScraper
+
+
+class ListWriter:
+    def __init__(self, gate=None, fail_on=None):
+        self.rows = []
+        self.gate = gate
+        self.fail_on = fail_on
+
+    def append(self, result):
+        if self.gate is not None:
+            self.gate.wait()
+        if result == self.fail_on:
+            raise IOError("Disk full")
+        self.rows.append(result)
+
+
+class TestWriterStage(unittest.TestCase):
+    def test_writes_in_order(self):
+        writer = ListWriter()
+        stage = WriterStage(writer, max_pending=4)
+        for number in range(100):
+            stage.put(number)
+        stage.close()
+        self.assertEqual(writer.rows, list(range(100)))
+
+    def test_back_pressure(self):
+        gate = threading.Event()
+        stage = WriterStage(ListWriter(gate), max_pending=2)
+
+        # One result in the writer and two in the queue, the next put waits
+        producer = threading.Thread(target=lambda: [stage.put(number) for number in range(4)])
+        producer.start()
+        time.sleep(0.2)
+        self.assertTrue(producer.is_alive())
+
+        gate.set()
+        producer.join(5)
+        self.assertFalse(producer.is_alive())
+        stage.close()
+
+    def test_writer_error(self):
+        stage = WriterStage(ListWriter(fail_on=1))
+        stage.put(0)
+        stage.put(1)
+        with self.assertRaises(IOError):
+            stage.close()
+
+
+class TestScrapePages(unittest.TestCase):
+    def setUp(self):
+        self.scraper = NewsScraper()
+
+    def tearDown(self):
+        self.scraper.close()
+
+    def test_producer_closed_at_start_date(self):
+        requested = []
+        closed = []
+
+        def pages():
+            try:
+                for number in range(1, 10):
+                    requested.append(number)
+                    yield number, [{"title": f"Article {number}"}], None
+            finally:
+                closed.append(True)
+
+        # The second page reaches the start date
+        self.scraper.process_page = lambda page_articles, search_phrase, start_date, results, count_pages: count_pages == 2
+        self.scraper.scrape_pages(pages(), "amazon", 0, [])
+
+        self.assertEqual(requested, [1, 2])
+        self.assertEqual(closed, [True])
+
+if __name__ == "__main__":
+    unittest.main()
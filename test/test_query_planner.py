@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the query planner and the deduplication of the articles across the searches of a plan.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from datetime import datetime
+
+from news_result import NewsResult
+from query_planner import QueryPlan
+from scraper import NewsScraper
+
+
+def article(number, title, date="July 29, 2024"):
+    return {
+        "title": title,
+        "description": f"Description {number}",
+        "date": date,
+        "image_url": f"https://ca-times.brightspotcdn.com/image%2Fphoto-{number}.jpg",
+        "url": f"https://www.latimes.com/story/{number}"
+    }
+
+
+class TestQueryPlan(unittest.TestCase):
+    def test_one_search_per_phrase(self):
+        plan = QueryPlan.create(["Amazon", "amazon ", "Google"], ["Business", "Climate & Environment", "business"])
+        self.assertEqual(plan.phrases, ["Amazon", "Google"])
+        self.assertEqual([(query.phrase, query.categories) for query in plan.queries],
+                         [("Amazon", ["Business", "Climate & Environment"]), ("Google", ["Business", "Climate & Environment"])])
+        self.assertEqual(plan.queries[0].category, "Business, Climate & Environment")
+
+    def test_single_values(self):
+        plan = QueryPlan.create("amazon", "Business")
+        self.assertEqual(len(plan.queries), 1)
+        self.assertEqual(plan.queries[0].news_category, "Business")
+        self.assertEqual(QueryPlan.create("amazon", None).queries[0].news_category, "")
+
+    def test_empty_category_means_all(self):
+        plan = QueryPlan.create(["amazon"], ["Business", ""])
+        self.assertEqual(plan.queries[0].categories, [])
+
+    def test_category_filters(self):
+        self.assertEqual(len(QueryPlan.create(["amazon", "google"], ["Business", "Politics"], "single").queries), 4)
+        plan = QueryPlan.create(["amazon", "google"], ["Business", "Politics"], None)
+        self.assertEqual([query.categories for query in plan.queries], [[], []])
+
+    def test_no_phrase(self):
+        with self.assertRaises(ValueError):
+            QueryPlan.create(["", " "], "")
+
+
+class TestCrossQueryDedup(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.scraper = NewsScraper()
+        self.scraper.reset_search(os.path.join(self.folder, ""))
+        self.scraper.count_phrases = ["Amazon", "Google"]
+        self.downloads = []
+        self.scraper.downloader.submit = lambda url, filepath: self.downloads.append(url)
+
+    def tearDown(self):
+        self.scraper.close()
+        shutil.rmtree(self.folder)
+
+    def test_overlapping_searches(self):
+        start_date = datetime(2024, 1, 1)
+        results = []
+
+        # The search of "Amazon" finds two articles, the one of "Google" finds one of them again and a new one
+        self.scraper.process_page([article(1, "Amazon and Google"), article(2, "Amazon")], "Amazon", start_date, results, 1)
+        self.scraper.process_page([article(1, "Amazon and Google"), article(3, "Google, Google")], "Google", start_date, results, 1)
+
+        self.assertEqual([result.title for result in results], ["Amazon and Google", "Amazon", "Google, Google"])
+        self.assertEqual(len(self.downloads), 3)
+        self.assertEqual([result.phrase_counts for result in results],
+                         [{"Amazon": 1, "Google": 1}, {"Amazon": 1, "Google": 0}, {"Amazon": 0, "Google": 2}])
+        self.assertEqual([result.search_count for result in results], [2, 1, 2])
+
+        # Each phrase has its column
+        self.assertEqual(self.scraper.output_header()[-2:], ["Count of Amazon", "Count of Google"])
+        self.assertEqual(results[0].to_dict()["Count of Google"], 1)
+        self.assertEqual(NewsResult.from_dict(results[2].to_dict()), results[2])
+
+    def test_duplicate_ends_pagination(self):
+        results = []
+        start_date = datetime(2024, 1, 1)
+        self.scraper.process_page([article(1, "Amazon", "July 29, 2023")], "Amazon", datetime(2000, 1, 1), results, 1)
+
+        # An article already found still tells that the start date was reached
+        self.assertTrue(self.scraper.process_page([article(1, "Amazon", "July 29, 2023")], "Google", start_date, results, 1))
+        self.assertEqual(len(results), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the network request blocking profiles and the counting of the blocked requests.
+"""
+
+import json
+import unittest
+
+from request_blocker import RequestBlocker
+from scraper import NewsScraper
+
+
+def log_entry(method, **params):
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+class FakeDriver:
+    def __init__(self):
+        self.commands = []
+        self.current_window_handle = "main"
+
+    def execute_cdp_cmd(self, command, params):
+        self.commands.append((self.current_window_handle, command, params))
+
+
+class FakeBrowser:
+    # Tabs of a browser, each one with the scripts run in it
+    def __init__(self):
+        self.driver = FakeDriver()
+        self.scripts = {"main": []}
+
+    def get_window_handles(self):
+        return list(self.scripts)
+
+    def switch_window(self, handle):
+        self.driver.current_window_handle = handle
+
+    def execute_javascript(self, script):
+        self.scripts[self.driver.current_window_handle].append(script)
+        if script.startswith("window.open("):
+            self.scripts[f"tab-{len(self.scripts)}"] = []
+
+
+class TestRequestBlocker(unittest.TestCase):
+    def test_site_profile(self):
+        blocker = RequestBlocker("https://www.latimes.com/search?q=dollar")
+        self.assertTrue(blocker.is_blocked("https://securepubads.g.doubleclick.net/tag/js/gpt.js"))
+        self.assertTrue(blocker.is_blocked("https://ca-times.brightspotcdn.com/dims4/default/photo.jpg?url=x"))
+        self.assertTrue(blocker.is_blocked("https://www.latimes.com/fonts/font.woff2"))
+        self.assertFalse(blocker.is_blocked("https://www.latimes.com/search?q=dollar"))
+        self.assertFalse(blocker.is_blocked("https://www.latimes.com/static/main.js"))
+
+    def test_unknown_site_uses_default_profile(self):
+        blocker = RequestBlocker("example.org")
+        self.assertTrue(blocker.is_blocked("https://example.org/logo.png"))
+        self.assertFalse(blocker.is_blocked("https://securepubads.g.doubleclick.net/tag/js/gpt.js"))
+
+    def test_settings(self):
+        blocker = RequestBlocker("https://www.latimes.com/", {"block_types": ["font"], "deny": ["*/video/*"], "allow": ["doubleclick.net"]})
+        self.assertFalse(blocker.is_blocked("https://ca-times.brightspotcdn.com/photo.jpg"))
+        self.assertFalse(blocker.is_blocked("https://securepubads.g.doubleclick.net/tag/js/gpt.js"))
+        self.assertTrue(blocker.is_blocked("https://www.latimes.com/video/clip"))
+        self.assertTrue(blocker.is_blocked("https://www.taboola.com/loader.js"))
+
+    def test_allowed_pattern(self):
+        blocker = RequestBlocker("https://www.latimes.com/", {"allow": ["*.svg"]})
+        self.assertFalse(blocker.is_blocked("https://www.latimes.com/logo.svg"))
+        self.assertTrue(blocker.is_blocked("https://www.latimes.com/logo.png"))
+
+    def test_apply(self):
+        driver = FakeDriver()
+        blocker = RequestBlocker("https://www.latimes.com/")
+        blocker.apply(driver)
+        self.assertEqual(driver.commands[0], ("main", "Network.enable", {}))
+        self.assertEqual(driver.commands[1], ("main", "Network.setBlockedURLs", {"urls": blocker.blocked_patterns()}))
+
+    def test_prefetch_tab_blocked(self):
+        scraper = NewsScraper()
+        scraper.browser_library = FakeBrowser()
+        handle = scraper.open_tab("https://www.latimes.com/search?q=dollar&p=2")
+
+        # The new tab gets the blocking before its page starts loading, and the current tab stays the same
+        self.assertEqual(scraper.browser.driver.commands[-1], (handle, "Network.setBlockedURLs", {"urls": scraper.request_blocker.blocked_patterns()}))
+        self.assertEqual(scraper.browser.scripts[handle], ['window.location.href = "https://www.latimes.com/search?q=dollar&p=2";'])
+        self.assertEqual(scraper.browser.driver.current_window_handle, "main")
+
+    def test_record_events(self):
+        blocker = RequestBlocker("https://www.latimes.com/")
+        blocker.record_events([
+            log_entry("Network.loadingFailed", type="Image", blockedReason="inspector"),
+            log_entry("Network.loadingFailed", type="Image", blockedReason="inspector"),
+            log_entry("Network.loadingFailed", type="Script", blockedReason="inspector"),
+            log_entry("Network.loadingFailed", type="XHR", errorText="net::ERR_ABORTED"),
+            log_entry("Network.loadingFinished", encodedDataLength=1000),
+            log_entry("Network.loadingFinished", encodedDataLength=500),
+            {"message": "not json"},
+        ])
+        report = blocker.report()
+        self.assertEqual(report["blocked_requests"], 3)
+        self.assertEqual(report["blocked_by_type"], {"Image": 2, "Script": 1})
+        self.assertEqual(report["estimated_bytes_saved"], 2 * blocker.average_sizes["Image"] + blocker.average_sizes["Script"])
+        self.assertEqual(report["received_requests"], 2)
+        self.assertEqual(report["bytes_received"], 1500)
+
+if __name__ == "__main__":
+    unittest.main()
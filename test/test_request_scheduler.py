@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the request scheduler, against a local server that throttles and fails.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from downloader import ImageDownloader
+from la_times_http import LATimesSearchClient
+from request_scheduler import RequestScheduler, TokenBucket, CircuitBreaker, CircuitOpenError
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """
+    /throttled/<name> answers 429 to the first two requests of each name, /down always 503,
+    the paths with /slow answer after 50 ms, and the rest at once.
+    """
+    requests = Counter()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            self.requests[self.path] += 1
+            count = self.requests[self.path]
+
+        if self.path.startswith("/throttled/") and count <= 2:
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path.startswith("/down"):
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if "/slow" in self.path:
+            time.sleep(0.05)
+
+        body = b"\x89PNG\r\n\x1a\n" + self.path.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestRequestScheduler(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        server_class = type("Server", (ThreadingHTTPServer,), {"request_queue_size": 64})
+        cls.server = server_class(("127.0.0.1", 0), FlakyHandler)
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        FlakyHandler.requests.clear()
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_downloads_retried_after_429(self):
+        scheduler = RequestScheduler(rate=1000, burst=10, backoff=0.01)
+        downloader = ImageDownloader(max_workers=4)
+        downloader.scheduler = scheduler
+        try:
+            for number in range(10):
+                downloader.submit(f"{self.url}/throttled/slow/{number}.png", os.path.join(self.folder, f"{number}.png"))
+            succeeded, failed = downloader.wait()
+        finally:
+            downloader.close()
+
+        # Every image arrives, each one after two throttled attempts
+        self.assertEqual((succeeded, failed), (10, []))
+        self.assertEqual(scheduler.throttled, 20)
+        self.assertEqual(sorted(os.listdir(self.folder)), sorted(f"{number}.png" for number in range(10)))
+
+    def test_search_page_retried(self):
+        client = LATimesSearchClient(base_url=self.url + "/")
+        client.scheduler = RequestScheduler(backoff=0.01)
+        try:
+            self.assertIn("/throttled/search", client.fetch(self.url + "/throttled/search"))
+        finally:
+            client.close()
+
+    def test_circuit_opens_on_dead_host(self):
+        scheduler = RequestScheduler(rate=1000, burst=100, retries=10, backoff=0.001, failure_threshold=3, reset_timeout=60)
+        client = LATimesSearchClient(base_url=self.url + "/")
+        client.scheduler = scheduler
+        try:
+            with self.assertRaises(Exception):
+                client.fetch(self.url + "/down/1")
+            # The circuit opened after 3 attempts, the next requests don't reach the host
+            with self.assertRaises(CircuitOpenError):
+                client.fetch(self.url + "/down/2")
+        finally:
+            client.close()
+        self.assertEqual(sum(FlakyHandler.requests.values()), 3)
+
+    def test_not_retryable(self):
+        scheduler = RequestScheduler()
+        with self.assertRaises(ValueError):
+            scheduler.call(self.url, lambda: int("page"))
+        self.assertEqual(scheduler.retried, 0)
+
+    def test_rate_limit(self):
+        scheduler = RequestScheduler(rate=20, burst=1)
+        client = LATimesSearchClient(base_url=self.url + "/")
+        client.scheduler = scheduler
+        start = time.perf_counter()
+        try:
+            for number in range(6):
+                client.fetch(f"{self.url}/page/{number}")
+        finally:
+            client.close()
+
+        # The first request takes the only token, the next ones get one every 50 ms
+        self.assertGreaterEqual(time.perf_counter() - start, 0.24)
+
+
+class StatusError(Exception):
+    # Error with the response of a request, like requests.HTTPError
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.response = type("Response", (), {"status_code": status, "headers": {}})()
+
+
+class TestLimits(unittest.TestCase):
+    def test_token_bucket_throttle_and_recover(self):
+        bucket = TokenBucket(rate=16, burst=1)
+        bucket.throttle()
+        bucket.throttle()
+        self.assertEqual(bucket.rate, 4)
+        for _ in range(100):
+            bucket.recover()
+        self.assertEqual(bucket.rate, 16)
+
+    def test_circuit_breaker_half_open(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        breaker.failure()
+        self.assertTrue(breaker.failure())
+        self.assertFalse(breaker.allow())
+
+        # After the timeout one trial goes through, and its failure opens the circuit again
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        self.assertTrue(breaker.failure())
+        self.assertEqual(breaker.state, "open")
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        breaker.success()
+        self.assertEqual(breaker.state, "closed")
+
+    def test_throttled_trial_closes_circuit(self):
+        scheduler = RequestScheduler(rate=1000, retries=0, failure_threshold=2, reset_timeout=0.05)
+
+        def fail(status):
+            raise StatusError(status)
+
+        # Two server errors open the circuit
+        for _ in range(2):
+            with self.assertRaises(StatusError):
+                scheduler.call("https://www.latimes.com/1", lambda: fail(503))
+        with self.assertRaises(CircuitOpenError):
+            scheduler.call("https://www.latimes.com/2", lambda: "page")
+
+        # The trial request is throttled: the host is alive, the next requests go through
+        time.sleep(0.06)
+        with self.assertRaises(StatusError):
+            scheduler.call("https://www.latimes.com/3", lambda: fail(429))
+        self.assertEqual(scheduler.limits("https://www.latimes.com/")[1].state, "closed")
+        self.assertEqual(scheduler.call("https://www.latimes.com/4", lambda: "page"), "page")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,28 +1,133 @@
-# -*- coding: utf-8 -*-
-"""
-Created on Mon Jul 22 14:25:46 2024
-
-@author: JoaoMurdiga
-"""
-
-import unittest
-from scraper import NewsScraper
-from utils import load_config
-
-class TestNewsScraper(unittest.TestCase):
-    def setUp(self):
-        self.config = load_config('../config/formats.json')
-        self.scraper = NewsScraper(self.config)
-
-    def test_scrape_news(self):
-        results = self.scraper.scrape_news("Schott")
-        self.assertIsInstance(results, list)
-        self.assertGreater(len(results), 0)
-        for result in results:
-            self.assertIn("title", result)
-            self.assertIn("description", result)
-            self.assertIn("date", result)
-            self.assertIn("image_url", result)
-
-if __name__ == "__main__":
-    unittest.main()
+# -*- coding: utf-8 -*-
+"""
+Tests for a whole search of NewsScraper, with the http engine against the saved LA Times pages.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from la_times_http import LATimesSearchClient, CategoryNotFoundError
+from scraper import NewsScraper, run_search
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class LocalSiteHandler(BaseHTTPRequestHandler):
+    """
+    Serve la_times_search_page_<p>.html for /search?p=<p>, with its images served by the same server.
+    """
+    server_url = None
+    image = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 4
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.startswith("/dims4/"):
+            self.send_body(self.image, "image/jpeg")
+            return
+
+        page = parse_qs(url.query).get("p", ["1"])[0]
+        fixture = os.path.join(FIXTURES_PATH, f"la_times_search_page_{page}.html")
+        if url.path != "/search" or not os.path.exists(fixture):
+            self.send_error(404)
+            return
+
+        with open(fixture, encoding="utf-8") as file:
+            body = file.read().replace("https://ca-times.brightspotcdn.com", self.server_url)
+        self.send_body(body.encode("utf-8"), "text/html; charset=utf-8")
+
+    def send_body(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestNewsScraper(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), LocalSiteHandler)
+        LocalSiteHandler.server_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.scraper = NewsScraper()
+        self.scraper.search_client.close()
+        self.scraper.search_client = LATimesSearchClient(base_url=LocalSiteHandler.server_url + "/")
+        self.scraper.reset_search(os.path.join(self.folder, ""))
+        self.scraper.payload = {}
+
+    def tearDown(self):
+        self.scraper.close()
+        shutil.rmtree(self.folder)
+
+    def test_scrape_news(self):
+        results = run_search(self.scraper, "Amazon", 0, "", engine="http", excel_writer="streaming", records=True, keep_results=True)
+
+        # The articles of both pages, each with its image downloaded next to the Excel
+        self.assertGreater(len(results), 0)
+        for result in results:
+            self.assertTrue(result.title)
+            self.assertTrue(result.date)
+            self.assertGreaterEqual(result.search_count, 0)
+            self.assertTrue(os.path.exists(os.path.join(self.folder, result.picture_filename)), result.picture_filename)
+        self.assertTrue(os.path.exists(self.scraper.excel_output_file))
+
+    def test_rows_as_dictionaries(self):
+        rows = run_search(self.scraper, "Amazon", 0, "", engine="http", excel_writer="streaming", keep_results=True)
+        self.assertGreater(len(rows), 0)
+        for row in rows:
+            for column in ["Title", "Date", "Description", "Picture filename"]:
+                self.assertTrue(row[column], column)
+
+    def test_streamed_rows_not_kept(self):
+        from openpyxl import load_workbook
+
+        results = run_search(self.scraper, "Amazon", 0, "", engine="http", excel_writer="streaming", records=True)
+
+        # The rows are only in the Excel, the search keeps their number
+        self.assertEqual(results, [])
+        self.assertGreater(self.scraper.result_count, 0)
+        workbook = load_workbook(self.scraper.excel_output_file, read_only=True)
+        rows = list(workbook.active.values)
+        workbook.close()
+        self.assertEqual(list(rows[0]), self.scraper.output_header())
+        self.assertEqual(len(rows) - 1, self.scraper.result_count)
+
+    def test_unknown_category_skipped(self):
+        with self.assertLogs(level="ERROR") as logs:
+            results = run_search(self.scraper, "Amazon", 0, ["Climate & Environment", "Sports"], engine="http",
+                                 excel_writer="streaming", records=True, keep_results=True)
+
+        # The category found is filtered, the other one is logged like in the browser engine
+        self.assertGreater(len(results), 0)
+        self.assertTrue(any("Couldn't find the category Sports" in line for line in logs.output))
+
+    def test_no_category_found(self):
+        with self.assertRaises(CategoryNotFoundError):
+            next(self.scraper.iter_la_times_http_pages("Amazon", "Sports"))
+
+        # The search ends without rows, and still writes its Excel with only the header
+        with self.assertLogs(level="ERROR"):
+            results = run_search(self.scraper, "Amazon", 0, "Sports", engine="http", excel_writer="streaming", records=True)
+        self.assertEqual(self.scraper.result_count, 0)
+        self.assertEqual(results[0].title, "")
+        self.assertTrue(os.path.exists(self.scraper.excel_output_file))
+
+if __name__ == "__main__":
+    unittest.main()
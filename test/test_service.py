@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the health of the warm sessions of the scraper service.
+"""
+
+import unittest
+
+from service import ScraperService
+
+
+class TestServiceHealth(unittest.TestCase):
+    def setUp(self):
+        self.service = ScraperService(sessions=2)
+        self.probed = []
+        for session in self.service.sessions:
+            session.scraper.is_browser_alive = lambda number=session.number: self.probed.append(number) or True
+            self.service.idle.put(session)
+
+    def test_idle_sessions_probed(self):
+        health = self.service.health()
+        self.assertTrue(health["healthy"])
+        self.assertEqual(self.probed, [1, 2])
+        self.assertEqual([session["alive"] for session in health["sessions"]], [True, True])
+
+    def test_busy_session_not_probed(self):
+        # The first session is searching, its driver isn't touched
+        with self.service.sessions[0].lock:
+            health = self.service.health()
+
+        self.assertTrue(health["healthy"])
+        self.assertEqual(self.probed, [2])
+        self.assertEqual(health["sessions"][0]["busy"], True)
+        self.assertIsNone(health["sessions"][0]["alive"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the site adapters that don't need a browser.
+"""
+
+import unittest
+
+from site_adapters import SiteAdapter, LATimesAdapter, APNewsAdapter, get_site_adapter
+
+
+class TestSiteAdapters(unittest.TestCase):
+    def test_get_site_adapter(self):
+        self.assertIsInstance(get_site_adapter("latimes"), LATimesAdapter)
+        self.assertIsInstance(get_site_adapter("apnews"), APNewsAdapter)
+        with self.assertRaises(ValueError):
+            get_site_adapter("reuters")
+
+    def test_new_adapter_each_time(self):
+        # The adapters keep the state of a search, each scraper needs its own
+        self.assertIsNot(get_site_adapter("apnews"), get_site_adapter("apnews"))
+
+    def test_la_times_page_url(self):
+        adapter = LATimesAdapter()
+        self.assertEqual(adapter.page_url("https://www.latimes.com/search?q=amazon&s=1", 2),
+                         "https://www.latimes.com/search?q=amazon&s=1&p=2")
+        self.assertEqual(adapter.page_url("https://www.latimes.com/search?q=amazon&p=2&s=1#top", 5),
+                         "https://www.latimes.com/search?q=amazon&s=1&p=5")
+
+    def test_sites_without_page_urls(self):
+        self.assertIsNone(APNewsAdapter().page_url("https://apnews.com/search?q=amazon", 2))
+
+    def test_default_filter_ignores_category(self):
+        adapter = APNewsAdapter()
+        with self.assertLogs(level="WARNING"):
+            adapter.filter(None, "Business")
+        adapter.filter(None, "")
+
+    def test_interface(self):
+        self.assertEqual(SiteAdapter.__abstractmethods__, {"search", "sort", "read_page", "next_page"})
+        with self.assertRaises(TypeError):
+            SiteAdapter()
+
+        # An adapter missing a step can't be created
+        class Incomplete(SiteAdapter):
+            def search(self, scraper, search_phrase):
+                pass
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+if __name__ == "__main__":
+    unittest.main()
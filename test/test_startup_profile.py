@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the startup profile and the lazy imports of the scraper.
+"""
+
+import os
+import sys
+import json
+import shutil
+import builtins
+import tempfile
+import unittest
+import subprocess
+
+from startup_profile import StartupProfiler
+
+ROOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+class TestStartupProfiler(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.folder, "profiled_package"))
+        with open(os.path.join(self.folder, "profiled_package", "__init__.py"), "w") as file:
+            file.write("from . import child\n")
+        with open(os.path.join(self.folder, "profiled_package", "child.py"), "w") as file:
+            file.write("import profiled_leaf\n")
+        with open(os.path.join(self.folder, "profiled_leaf.py"), "w") as file:
+            file.write("VALUE = 1\n")
+        sys.path.insert(0, self.folder)
+
+    def tearDown(self):
+        sys.path.remove(self.folder)
+        for name in ["profiled_package", "profiled_package.child", "profiled_leaf"]:
+            sys.modules.pop(name, None)
+        shutil.rmtree(self.folder)
+
+    def test_nested_imports(self):
+        profiler = StartupProfiler()
+        original_import = builtins.__import__
+        profiler.install()
+        try:
+            import profiled_package
+            import profiled_leaf
+        finally:
+            profiler.uninstall()
+        self.assertIs(builtins.__import__, original_import)
+
+        # Each module is recorded once, when it finishes loading, under its importer
+        names = [(depth, name) for depth, name, own, cumulative in profiler.records]
+        self.assertEqual(names, [(2, "profiled_leaf"), (1, "profiled_package.child"), (0, "profiled_package")])
+        for depth, name, own, cumulative in profiler.records:
+            self.assertLessEqual(own, cumulative)
+
+        self.assertEqual(profiler.slowest()[0][0], "profiled_package")
+
+    def test_report(self):
+        profiler = StartupProfiler()
+        profiler.install()
+        try:
+            import profiled_leaf
+        finally:
+            profiler.uninstall()
+        profiler.mark("task started")
+
+        path = os.path.join(self.folder, "startup-profile.txt")
+        profiler.write(path)
+        with open(path) as file:
+            lines = file.read().splitlines()
+        self.assertEqual(lines[0], "import time: self [us] | cumulative | imported package")
+        self.assertTrue(lines[1].endswith("| profiled_leaf"))
+        self.assertTrue(lines[-1].endswith("| task started"))
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_scraper_import_skips_heavy_libraries(self):
+        script = ("import sys, json, scraper; scraper.NewsScraper().close(); "
+                  "print(json.dumps([name for name in ['RPA', 'selenium', 'openpyxl', 'lxml'] if name in sys.modules]))")
+        child = subprocess.run([sys.executable, "-c", script], cwd=ROOT_PATH, capture_output=True, text=True)
+        self.assertEqual(child.returncode, 0, child.stderr)
+        self.assertEqual(json.loads(child.stdout.strip().splitlines()[-1]), [])
+
+if __name__ == "__main__":
+    unittest.main()
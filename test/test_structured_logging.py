@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the non-blocking structured logging.
+"""
+
+import os
+import json
+import shutil
+import logging
+import tempfile
+import threading
+import unittest
+
+from structured_logging import EventSampler, setup_logging, stop_logging
+from tracing import Tracer
+
+
+class FormattedIn:
+    # Argument of a log call keeping the thread that formatted it
+    def __init__(self):
+        self.threads = []
+
+    def __str__(self):
+        self.threads.append(threading.current_thread().name)
+        return "value"
+
+
+class TestStructuredLogging(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, "scraper.log")
+        self.pipeline = setup_logging(self.path, sample_rate=3)
+
+    def tearDown(self):
+        stop_logging()
+        shutil.rmtree(self.folder)
+
+    def read(self):
+        stop_logging()
+        with open(self.path, encoding="utf-8") as file:
+            return [json.loads(line) for line in file]
+
+    def test_json_with_stage(self):
+        with Tracer().span("article"):
+            logging.info("Scraped %s", "Amazon", extra={"event": "scraped", "article": "https://www.latimes.com/story/1"})
+        logging.warning("Outside the spans")
+
+        entries = self.read()
+        self.assertEqual(entries[0]["message"], "Scraped Amazon")
+        self.assertEqual(entries[0]["stage"], "article")
+        self.assertEqual(entries[0]["article"], "https://www.latimes.com/story/1")
+        self.assertEqual(entries[1]["level"], "WARNING")
+        self.assertNotIn("stage", entries[1])
+
+    def test_lazy_formatting(self):
+        filtered = FormattedIn()
+        written = FormattedIn()
+        logging.debug("Filtered %s", filtered)
+        logging.info("Written %s", written)
+
+        # The filtered record is never formatted, the other one is formatted for the file by the listener thread
+        self.assertEqual(self.read()[0]["message"], "Written value")
+        self.assertEqual(filtered.threads, [])
+        self.assertTrue(any(thread != threading.current_thread().name for thread in written.threads))
+
+    def test_sampled_events(self):
+        for number in range(10):
+            logging.info("Downloaded image %s", number, extra={"event": "downloaded"})
+
+        entries = self.read()
+        self.assertEqual([entry["message"] for entry in entries[:3]], [f"Downloaded image {number}" for number in range(3)])
+        self.assertEqual(entries[-1]["message"], "Sampled out 7 downloaded records")
+
+
+class TestEventSampler(unittest.TestCase):
+    def test_suppressed_count_on_next_interval(self):
+        sampler = EventSampler(rate=1, interval=0.05)
+        records = [logging.makeLogRecord({"event": "scraped"}) for _ in range(4)]
+        self.assertEqual([sampler.filter(record) for record in records[:3]], [True, False, False])
+
+        threading.Event().wait(0.06)
+        self.assertTrue(sampler.filter(records[3]))
+        self.assertEqual(records[3].suppressed, 2)
+        self.assertTrue(sampler.filter(logging.makeLogRecord({"msg": "No event"})))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the timed spans, the WebDriver call counting and the trace files.
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+
+from tracing import Tracer
+
+
+class FakeDriver:
+    def execute(self, driver_command, params=None):
+        return {"value": driver_command}
+
+    def get_title(self):
+        return self.execute("getTitle")
+
+
+class TestTracer(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_spans_and_summary(self):
+        tracer = Tracer()
+        for page in range(1, 4):
+            with tracer.span("page", page=page) as span:
+                span["args"]["articles"] = 10
+
+        summary = tracer.summary()
+        self.assertEqual(summary["stages"]["page"]["count"], 3)
+        self.assertGreaterEqual(summary["stages"]["page"]["max"], summary["stages"]["page"]["mean"])
+        self.assertEqual([span["args"] for span in tracer.spans],
+                         [{"page": 1, "articles": 10}, {"page": 2, "articles": 10}, {"page": 3, "articles": 10}])
+
+    def test_spans_capped_per_stage(self):
+        tracer = Tracer(max_spans=2)
+        for index in range(5):
+            with tracer.span("article", index=index):
+                pass
+        with tracer.span("page"):
+            pass
+
+        # The trace keeps the first spans of each stage, the summary counts all of them
+        self.assertEqual([span["args"].get("index") for span in tracer.spans], [0, 1, None])
+        summary = tracer.summary()
+        self.assertEqual(summary["stages"]["article"]["count"], 5)
+        self.assertEqual(summary["stages"]["article"]["dropped"], 3)
+        self.assertNotIn("dropped", summary["stages"]["page"])
+
+    def test_error_is_kept(self):
+        tracer = Tracer()
+        with self.assertRaises(ValueError):
+            with tracer.span("article", index=1):
+                raise ValueError("missing title")
+        self.assertEqual(tracer.spans[0]["args"]["error"], "ValueError: missing title")
+
+    def test_webdriver_calls(self):
+        tracer = Tracer()
+        driver = FakeDriver()
+        tracer.instrument_driver(driver)
+
+        with tracer.span("order_la_times"):
+            self.assertEqual(driver.get_title(), {"value": "getTitle"})
+            driver.get_title()
+
+        # Calls of another thread aren't counted in the span of this one
+        with tracer.span("page"):
+            thread = threading.Thread(target=driver.get_title)
+            thread.start()
+            thread.join()
+
+        self.assertEqual(tracer.spans[0]["args"], {"webdriver_calls": 2})
+        self.assertEqual(tracer.spans[1]["args"], {})
+        self.assertEqual(tracer.counters, {"webdriver_calls": 3, "webdriver:getTitle": 3})
+
+        # A new tracer of the next search takes over the same driver
+        next_tracer = Tracer()
+        next_tracer.instrument_driver(driver)
+        driver.get_title()
+        self.assertEqual(next_tracer.counters["webdriver_calls"], 1)
+        self.assertEqual(tracer.counters["webdriver_calls"], 3)
+
+    def test_write(self):
+        tracer = Tracer()
+        with tracer.span("save_news_data_to_excel", rows=5):
+            pass
+
+        summary_path, trace_path = tracer.write(self.folder)
+        self.assertEqual(os.path.dirname(summary_path), self.folder)
+
+        with open(summary_path) as file:
+            self.assertIn("save_news_data_to_excel", json.load(file)["stages"])
+        with open(trace_path) as file:
+            events = json.load(file)["traceEvents"]
+        self.assertEqual(events[0]["ph"], "X")
+        self.assertEqual(events[0]["args"], {"rows": 5})
+        self.assertEqual(events[-1]["ph"], "M")
+
+if __name__ == "__main__":
+    unittest.main()
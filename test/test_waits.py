@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the event-driven waits, against a fake page answering their scripts.
+"""
+
+import re
+import json
+import unittest
+
+from waits import PageWaiter, WaitTimeout
+
+
+class FakePage:
+    # Browser whose scripts are answered from the visible XPaths of a page, and the elements marked as stale
+    def __init__(self, visible=(), appear_after=None):
+        self.visible = set(visible)
+        self.marked = set()
+        self.appear_after = appear_after or {}
+        self.calls = 0
+
+    def execute_javascript(self, script):
+        self.calls += 1
+        for xpath, calls in list(self.appear_after.items()):
+            if self.calls >= calls:
+                self.visible.add(xpath)
+                self.marked.discard(xpath)
+
+        conditions = re.search(r"var conditions = (.*);\n", script)
+        if conditions:
+            for name, xpath, fresh in json.loads(conditions.group(1)):
+                if xpath in self.visible and not (fresh and xpath in self.marked):
+                    return name
+            return None
+
+        xpath = json.loads(re.search(r"document\.evaluate\((\".*?\"), document", script).group(1))
+        if xpath in self.visible:
+            self.marked.add(xpath)
+            return True
+        return False
+
+
+class TestPageWaiter(unittest.TestCase):
+    def test_first_condition_in_order(self):
+        waiter = PageWaiter(FakePage(visible=["//results", "//no-results"]), poll_interval=0)
+        self.assertEqual(waiter.wait_for_any({"no_results": "//no-results", "results": "//results"}), "no_results")
+        self.assertEqual(waiter.wait_for_any({"results": "//results", "no_results": "//no-results"}), "results")
+
+    def test_race_until_one_appears(self):
+        page = FakePage(appear_after={"//results": 3})
+        waiter = PageWaiter(page, poll_interval=0)
+        self.assertEqual(waiter.wait_for_any({"no_results": "//no-results", "results": "//results"}, label="search"), "results")
+        self.assertEqual(page.calls, 3)
+
+        # The time of the wait is kept with its outcome
+        self.assertEqual(len(waiter.timings), 1)
+        self.assertEqual(waiter.timings[0]["wait"], "search")
+        self.assertEqual(waiter.timings[0]["outcome"], "results")
+        self.assertGreaterEqual(waiter.timings[0]["seconds"], 0)
+
+    def test_fresh_waits_for_replaced_element(self):
+        page = FakePage(visible=["//first"])
+        waiter = PageWaiter(page, poll_interval=0)
+        self.assertTrue(waiter.mark("//first"))
+        self.assertFalse(waiter.mark("//missing"))
+
+        # The marked element is still visible, but only a new one meets the ":fresh" condition
+        self.assertEqual(waiter.wait_for_any({"results": "//first"}), "results")
+        page.appear_after = {"//first": page.calls + 2}
+        self.assertEqual(waiter.wait_for_any({"results:fresh": "//first"}), "results")
+        self.assertEqual(waiter.timings[-1]["wait"], "results")
+
+    def test_timeout(self):
+        page = FakePage(visible=["//first"])
+        waiter = PageWaiter(page, poll_interval=0.01)
+        waiter.mark("//first")
+
+        with self.assertRaises(WaitTimeout):
+            waiter.wait_for_any({"no_results": "//no-results", "results:fresh": "//first"}, timeout=0.05)
+        self.assertEqual(waiter.timings[-1]["outcome"], "timeout")
+        self.assertEqual(waiter.timings[-1]["wait"], "no_results or results")
+        self.assertGreaterEqual(waiter.timings[-1]["seconds"], 0.05)
+
+        # It is an AssertionError, like the timeouts of the browser library
+        self.assertTrue(issubclass(WaitTimeout, AssertionError))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+Timed spans for the stages of a search, exported for diagnosing slow runs.
+
+Each stage (search, filter, order, page, article, image download, Excel) is
+wrapped in a span with its duration, thread and attributes such as the page
+number, the article index or the bytes downloaded. The WebDriver commands sent
+during a span are counted by wrapping the driver. At the end of the search a
+JSON summary (count, total, mean and max time of each stage) and a Chrome
+trace-event file, which can be opened in chrome://tracing or Perfetto, are
+written next to the Excel file. The summary adds up every span as it closes,
+while the trace file only gets the first spans of each stage, so the spans of
+the articles and images don't grow with the length of the search. The innermost span open in a thread is also
+the stage of the log records of that thread (see structured_logging.py).
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+
+from contextlib import contextmanager
+
+
+# Spans open in each thread, the innermost last
+open_spans = threading.local()
+
+
+def current_stage():
+    """
+    Get the stage of the current thread: the name of its innermost open span.
+
+    Returns:
+        str: The name of the span, or None outside the spans.
+    """
+    spans = getattr(open_spans, "spans", None)
+    return spans[-1]["name"] if spans else None
+
+
+class Tracer:
+    def __init__(self, max_spans=1000):
+        """
+        Initialize the Tracer class, the times of the spans are relative to its creation.
+
+        Args:
+            max_spans (int): Spans of each stage kept for the trace file, the next ones are only added to the summary.
+        """
+        self.start = time.perf_counter()
+        self.pid = os.getpid()
+        self.max_spans = max_spans
+        self.spans = []
+        self.counters = {}
+
+        # Count, total and max time of each stage, with the spans left out of the trace
+        self.stages = {}
+        self.lock = threading.Lock()
+
+        # WebDriver commands sent by each thread, so a span only counts the commands of its own thread
+        self.local = threading.local()
+
+
+    def elapsed_us(self):
+        """
+        Get the time since the tracer was created.
+
+        Returns:
+            float: The time in microseconds.
+        """
+        return (time.perf_counter() - self.start) * 1000000
+
+
+    def count(self, name, value=1):
+        """
+        Add to a counter.
+
+        Args:
+            name (str): Name of the counter.
+            value (int): Value added.
+        """
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """
+        Time a stage. The span is kept even if the stage raises, with the error in its attributes.
+
+        Args:
+            name (str): Name of the stage.
+            **attributes: Attributes of the span, more can be added to span["args"] inside the block.
+
+        Yields:
+            dict: The span.
+        """
+        span = {"name": name, "ts": self.elapsed_us(), "tid": threading.get_ident(),
+                "thread": threading.current_thread().name, "args": dict(attributes)}
+        webdriver_calls = getattr(self.local, "webdriver_calls", 0)
+        if getattr(open_spans, "spans", None) is None:
+            open_spans.spans = []
+        stack = open_spans.spans
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span["args"]["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            # A span of a generator can close after a span opened later, it is removed wherever it is
+            for index in range(len(stack) - 1, -1, -1):
+                if stack[index] is span:
+                    del stack[index]
+                    break
+            span["dur"] = self.elapsed_us() - span["ts"]
+            calls = getattr(self.local, "webdriver_calls", 0) - webdriver_calls
+            if calls:
+                span["args"]["webdriver_calls"] = calls
+            self.add(span)
+
+
+    def add(self, span):
+        """
+        Add a closed span to the summary of its stage, and to the trace while its stage has less than max_spans.
+
+        Args:
+            span (dict): The span, with its duration.
+        """
+        seconds = span["dur"] / 1000000
+        with self.lock:
+            stage = self.stages.setdefault(span["name"], {"count": 0, "total": 0.0, "max": 0.0, "dropped": 0})
+            if stage["count"] - stage["dropped"] < self.max_spans:
+                self.spans.append(span)
+            else:
+                stage["dropped"] += 1
+            stage["count"] += 1
+            stage["total"] += seconds
+            stage["max"] = max(stage["max"], seconds)
+
+
+    def instrument_driver(self, driver):
+        """
+        Count the WebDriver commands sent by a driver, in total and by command.
+
+        Args:
+            driver (selenium.webdriver.remote.webdriver.WebDriver): The driver.
+        """
+        if getattr(driver, "traced_by", None) is not None:
+            driver.traced_by = self
+            return
+
+        execute = driver.execute
+
+        def traced_execute(driver_command, params=None):
+            tracer = driver.traced_by
+            tracer.local.webdriver_calls = getattr(tracer.local, "webdriver_calls", 0) + 1
+            tracer.count("webdriver_calls")
+            tracer.count(f"webdriver:{driver_command}")
+            return execute(driver_command, params)
+
+        driver.traced_by = self
+        driver.execute = traced_execute
+
+
+    def summary(self):
+        """
+        Get the count, total, mean and max time of each stage, and the counters.
+        The spans left out of the trace are counted too, "dropped" tells how many of them there are.
+
+        Returns:
+            dict: The summary, with the times in seconds.
+        """
+        with self.lock:
+            stages = {name: dict(stage) for name, stage in self.stages.items()}
+            counters = dict(self.counters)
+
+        for stage in stages.values():
+            stage["mean"] = round(stage["total"] / stage["count"], 6)
+            stage["total"] = round(stage["total"], 6)
+            stage["max"] = round(stage["max"], 6)
+            if not stage["dropped"]:
+                del stage["dropped"]
+
+        return {"wall_time": round(self.elapsed_us() / 1000000, 6), "stages": stages, "counters": counters}
+
+
+    def trace_events(self):
+        """
+        Get the spans as Chrome trace events.
+
+        Returns:
+            dict: The trace, with a complete ("X") event for each span and the names of the threads.
+        """
+        with self.lock:
+            spans = sorted(self.spans, key=lambda span: span["ts"])
+
+        events = []
+        threads = {}
+        for span in spans:
+            threads[span["tid"]] = span["thread"]
+            events.append({"name": span["name"], "cat": "scraper", "ph": "X", "pid": self.pid, "tid": span["tid"],
+                           "ts": round(span["ts"], 3), "dur": round(span["dur"], 3), "args": span["args"]})
+
+        for tid, thread in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": thread}})
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+    def write(self, folder, name="trace"):
+        """
+        Write the JSON summary and the Chrome trace file.
+
+        Args:
+            folder (str): Folder of the files.
+            name (str): Name of the files, written as <name>-summary.json and <name>.json.
+
+        Returns:
+            tuple: The paths of the summary and the trace.
+        """
+        os.makedirs(folder, exist_ok=True)
+        summary_path = os.path.join(folder, f"{name}-summary.json")
+        trace_path = os.path.join(folder, f"{name}.json")
+
+        with open(summary_path, "w") as file:
+            json.dump(self.summary(), file, indent=2, default=str)
+        with open(trace_path, "w") as file:
+            json.dump(self.trace_events(), file, default=str)
+
+        logging.info(f"Trace written to {trace_path}")
+        return summary_path, trace_path
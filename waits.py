@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Event-driven waits for the scraping browser.
+
+Instead of fixed sleeps and sequential timeouts, every wait polls the page with
+a single JavaScript call that checks all its conditions at once, so competing
+outcomes ("results" and "no results") race against each other. A re-render of
+the results list is detected by marking the current first result and waiting
+until the first result is a different, unmarked element. The time each wait
+took is logged and kept.
+"""
+
+import json
+import time
+import logging
+
+
+class WaitTimeout(AssertionError):
+    """
+    Raised when no condition of a wait is met before the timeout.
+    It is an AssertionError, like the timeouts of RPA.Browser.Selenium.
+    """
+
+
+class PageWaiter:
+    # Attribute set on the first result to detect when the list is replaced
+    marker_attribute = "data-scraper-stale"
+
+    def __init__(self, browser, poll_interval=0.1):
+        """
+        Initialize the PageWaiter class.
+
+        Args:
+            browser (RPA.Browser.Selenium.Selenium): The browser library.
+            poll_interval (float): Seconds between two checks of the conditions.
+        """
+        self.browser = browser
+        self.poll_interval = poll_interval
+        self.timings = []
+
+
+    def visible_script(self, conditions):
+        """
+        Build the script returning the name of the first condition met, or null.
+
+        Args:
+            conditions (dict): Name of each condition mapped to the XPath of the element that must be visible.
+                               An XPath ending the name with ":fresh" also requires that the element isn't marked.
+
+        Returns:
+            str: The script.
+        """
+        return """
+            var conditions = %s;
+            var marker = %s;
+            for (var i = 0; i < conditions.length; i++) {
+                var node = document.evaluate(conditions[i][1], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+                if (!node || !(node.offsetWidth || node.offsetHeight || node.getClientRects().length)) {
+                    continue;
+                }
+                if (conditions[i][2] && node.closest("[" + marker + "]")) {
+                    continue;
+                }
+                return conditions[i][0];
+            }
+            return null;
+        """ % (json.dumps([[name.split(":")[0], xpath, name.endswith(":fresh")] for name, xpath in conditions.items()]),
+               json.dumps(self.marker_attribute))
+
+
+    def wait_for_any(self, conditions, timeout=60, label=None):
+        """
+        Wait until the first of several elements is visible.
+
+        Args:
+            conditions (dict): Name of each condition mapped to the XPath of the element that must be visible,
+                               checked in order. A name ending with ":fresh" ignores elements marked by mark().
+            timeout (float): Maximum seconds to wait.
+            label (str): Name of the wait in the timings, the condition names joined if None.
+
+        Returns:
+            str: The name of the condition met.
+
+        Raises:
+            WaitTimeout: If no condition is met before the timeout.
+        """
+        label = label or " or ".join(name.split(":")[0] for name in conditions)
+        script = self.visible_script(conditions)
+
+        start = time.perf_counter()
+        while True:
+            met = self.browser.execute_javascript(script)
+            elapsed = time.perf_counter() - start
+
+            if met is not None:
+                self.record(label, elapsed, met)
+                return met
+
+            if elapsed >= timeout:
+                self.record(label, elapsed, "timeout")
+                raise WaitTimeout(f"None of {label} was visible after {timeout} seconds")
+
+            time.sleep(self.poll_interval)
+
+
+    def mark(self, xpath):
+        """
+        Mark the element found by an XPath, so a later ":fresh" condition waits for its replacement.
+
+        Args:
+            xpath (str): XPath of the element, usually the first result.
+
+        Returns:
+            bool: True if an element was marked.
+        """
+        script = """
+            var node = document.evaluate(%s, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            if (node) { node.setAttribute(%s, "1"); }
+            return node !== null;
+        """ % (json.dumps(xpath), json.dumps(self.marker_attribute))
+        return self.browser.execute_javascript(script)
+
+
+    def record(self, label, seconds, outcome):
+        """
+        Keep and log the time a wait took.
+
+        Args:
+            label (str): Name of the wait.
+            seconds (float): Time waited.
+            outcome (str): The condition met, or "timeout".
+        """
+        self.timings.append({"wait": label, "seconds": round(seconds, 3), "outcome": outcome})
+        logging.info("Waited %.2fs for %s: %s", seconds, label, outcome)